@@ -5,9 +5,40 @@ Enhanced version with blueprint image display for guided manual entry
 Uses the same calculation engine from main.py
 """
 
-from main import FlooringJob, Room, Obstacle, Employee, print_cost_report
+from main import FlooringJob, Room, Obstacle, Employee, print_cost_report, offer_risk_report
+from blueprint_text import extract_room_candidates, format_candidate
+from catalogue import load_default_catalogue, prompt_material_cost
+from roster import Roster, choose_crew_preset, prompt_rate, offer_save_crew
+from pricing_rules import load_default_rules, prompt_rule_inputs
 import os
 import io
+from fractions import Fraction
+from typing import Optional, Tuple
+
+
+# Resolution used when rasterizing PDF blueprints for display
+BLUEPRINT_ZOOM = 2.0
+
+
+def render_pdf_page(blueprint_path: str, zoom: float = BLUEPRINT_ZOOM, page_number: int = 0,
+                    clip: Optional[Tuple[float, float, float, float]] = None):
+    """
+    Rasterize one page of a PDF blueprint (or just the clip rectangle of it,
+    in PDF points). Returns (PIL image, page count); raises ImportError
+    without PyMuPDF/Pillow.
+    """
+    import fitz  # PyMuPDF
+    from PIL import Image
+    
+    pdf_doc = fitz.open(blueprint_path)
+    try:
+        mat = fitz.Matrix(zoom, zoom)
+        pix = pdf_doc[page_number].get_pixmap(matrix=mat, clip=fitz.Rect(*clip) if clip else None)
+        img = Image.open(io.BytesIO(pix.tobytes("ppm")))
+        img.load()
+        return img, len(pdf_doc)
+    finally:
+        pdf_doc.close()
 
 
 def display_blueprint(blueprint_path: str = None):
@@ -30,29 +61,14 @@ def display_blueprint(blueprint_path: str = None):
         if is_pdf:
             # Handle PDF files
             try:
-                import fitz  # PyMuPDF
+                # Convert first page to image
+                img, page_count = render_pdf_page(blueprint_path)
                 print("   File type: PDF")
+                print(f"   Pages: {page_count}")
                 
-                # Open PDF and get first page
-                pdf_doc = fitz.open(blueprint_path)
-                first_page = pdf_doc[0]
-                
-                # Convert to image
-                zoom = 2.0  # Increase resolution
-                mat = fitz.Matrix(zoom, zoom)
-                pix = first_page.get_pixmap(matrix=mat)
-                
-                print(f"   Pages: {len(pdf_doc)}")
-                
-                # Convert to PIL Image
-                from PIL import Image
-                img_data = pix.tobytes("ppm")
-                img = Image.open(io.BytesIO(img_data))
                 width, height = img.size
                 print(f"   Display size: {width} × {height} pixels")
                 
-                pdf_doc.close()
-                
             except ImportError:
                 print("\nPyMuPDF not installed for PDF support.")
                 print("Install with: pip install pymupdf")
@@ -101,16 +117,118 @@ def display_blueprint(blueprint_path: str = None):
         return choice in ['yes', 'y']
 
 
-def get_room_input_with_reference(room_number: int) -> Room:
-    """Get room information with visual reference"""
+def get_rooms_from_blueprint_text(blueprint_path: str = None) -> list:
+    """Offer the rooms found in a PDF's text layer for confirmation"""
+    if not blueprint_path or not blueprint_path.lower().endswith('.pdf') or not os.path.exists(blueprint_path):
+        return []
+    
+    try:
+        candidates = extract_room_candidates(blueprint_path)
+    except ImportError:
+        return []
+    except Exception as e:
+        print(f"\nCould not read blueprint text: {e}")
+        return []
+    
+    if not candidates:
+        return []
+    
+    return choose_candidates(candidates, format_candidate)
+
+
+def choose_candidates(candidates: list, describe) -> list:
+    """List detected rooms and return the ones the user keeps, as Rooms"""
+    print("\n" + "="*60)
+    print("ROOMS FOUND ON BLUEPRINT")
+    print("="*60)
+    for i, candidate in enumerate(candidates, 1):
+        print(f"   {i}. {describe(candidate)}")
+    
+    while True:
+        answer = input("\nKeep which rooms? ('all', 'none', or numbers like 1,3,4): ").strip().lower()
+        if answer in ['all', 'a', 'yes', 'y']:
+            chosen = candidates
+            break
+        if answer in ['none', 'n', 'no']:
+            return []
+        try:
+            numbers = [int(part) for part in answer.replace(' ', ',').split(',') if part]
+            if numbers and all(1 <= n <= len(candidates) for n in numbers):
+                chosen = [candidates[n - 1] for n in numbers]
+                break
+        except ValueError:
+            pass
+        print(f"Please enter 'all', 'none', or numbers between 1 and {len(candidates)}.")
+    
+    rooms = [candidate.to_room() for candidate in chosen]
+    print(f"\nAdded {len(rooms)} rooms from the blueprint.")
+    return rooms
+
+
+def get_rooms_from_scan(blueprint_path: str = None) -> list:
+    """Offer rooms detected on a scanned (image) blueprint"""
+    if not blueprint_path or blueprint_path.lower().endswith('.pdf') or not os.path.exists(blueprint_path):
+        return []
+    
+    while True:
+        answer = input("\nDetect rooms on this scanned blueprint? (yes/no): ").strip().lower()
+        if answer in ['yes', 'y']:
+            break
+        elif answer in ['no', 'n']:
+            return []
+        else:
+            print("Please enter 'yes' or 'no'.")
+    
+    try:
+        from raster_rooms import segment_scan, format_region, feet_per_pixel_from
+    except ImportError:
+        print("\nNumPy not installed for room detection.")
+        print("Install with: pip install numpy")
+        return []
+    
+    while True:
+        try:
+            dpi = float(input("Scan resolution in DPI (e.g. 300): "))
+            paper = input("Drawing scale in inches per foot (1/4 or 0.25 for 1/4\" = 1'): ").strip()
+            inches_per_foot = float(Fraction(paper.rstrip('"').strip()))
+            if dpi > 0 and inches_per_foot > 0:
+                break
+            print("Please enter positive numbers.")
+        except ValueError:
+            print("Invalid input. Please enter a number.")
+    
+    try:
+        candidates = segment_scan(blueprint_path, feet_per_pixel_from(dpi, inches_per_foot))
+    except Exception as e:
+        print(f"\nCould not process scan: {e}")
+        return []
+    if not candidates:
+        print("\nNo enclosed rooms found on the scan.")
+        return []
+    return choose_candidates(candidates, format_region)
+
+
+def get_room_input_with_reference(room_number: int) -> list:
+    """
+    Get room information with visual reference.
+    Returns the new room, or several rooms when a quick-entry block
+    (e.g. Kitchen 12'6x14 -island 3x6) is typed or pasted.
+    """
+    from quick_entry import looks_like_room_line, get_rooms_from_block
+    
     print(f"\n{'─'*60}")
     print(f"ROOM #{room_number} - Refer to your blueprint for dimensions")
     print(f"{'─'*60}")
-    
-    room_name = input("Room name: ").strip()
+    if room_number == 1:
+        print("(a pasted block of rooms ends with an empty line)")
+
+    room_name = input("Room name (or paste rooms like Kitchen 12'6x14 -island 3x6): ").strip()
     if not room_name:
         print("Please enter a room name.")
-        return None
+        return []
+    
+    if looks_like_room_line(room_name):
+        return get_rooms_from_block(room_name)
     
     # Give user choice: L×W or direct area
     print("\nHow would you like to enter the room size?")
@@ -167,7 +285,7 @@ def get_room_input_with_reference(room_number: int) -> Room:
     usable = room.get_usable_area()
     print(f"\n{room_name}: {total_area:.2f} sq ft total, {usable:.2f} sq ft usable")
     
-    return room
+    return [room]
 
 
 def get_employee_input_with_reference() -> list:
@@ -179,6 +297,10 @@ def get_employee_input_with_reference() -> list:
     print("="*60)
     print("Enter each person who will work on this job.")
     
+    roster = Roster()
+    employees = choose_crew_preset(roster)
+    preset = list(employees)
+    
     while True:
         name = input("\nEmployee name (or 'done'): ").strip()
         if name.lower() == 'done':
@@ -186,13 +308,16 @@ def get_employee_input_with_reference() -> list:
         if not name:
             continue
         
+        name = roster.display_name(name)
         try:
-            rate = float(input(f"  Hourly rate for {name} ($): "))
+            rate = prompt_rate(roster, name, f"  Hourly rate for {name} ($): ")
             employees.append(Employee(name, rate))
             print(f"  Added {name}: ${rate:.2f}/hour")
         except ValueError:
             print("  Invalid input. Please enter a number.")
     
+    if employees != preset:
+        offer_save_crew(roster, employees)
     return employees
 
 
@@ -237,9 +362,12 @@ def get_job_parameters_with_reference() -> dict:
             break
         elif provides in ['no', 'n']:
             params['customer_provides_wood'] = False
+            catalogue = load_default_catalogue()
+            if catalogue:
+                print(f"({len(catalogue)} catalogue items: type a number, or a product name to look it up)")
             while True:
                 try:
-                    params['material_cost'] = float(input("Material cost per sq ft ($): "))
+                    params['material_cost'] = prompt_material_cost("Material cost per sq ft ($): ", catalogue)
                     if params['material_cost'] >= 0:
                         break
                     print("Please enter a non-negative number.")
@@ -257,6 +385,10 @@ def get_job_parameters_with_reference() -> dict:
         else:
             print("Please enter 'yes' or 'no'.")
     
+    rules = load_default_rules()
+    if rules:
+        params['extras'] = prompt_rule_inputs(rules)
+    
     return params
 
 
@@ -309,18 +441,24 @@ def create_job_from_blueprint_reference(blueprint_path: str = None) -> FlooringJ
     print("Entering Room Information")
     print("View blueprint as you enter measurements.")
     
-    # Get rooms
-    rooms = []
-    room_num = 1
+    # Get rooms (starting from any found in the blueprint's text)
+    rooms = get_rooms_from_blueprint_text(blueprint_path) or get_rooms_from_scan(blueprint_path)
+    room_num = len(rooms) + 1
     
-    while True:
-        room = get_room_input_with_reference(room_num)
-        if not room:
+    if rooms:
+        more = input("\nAdd rooms manually as well? (yes/no): ").strip().lower()
+        manual = more in ['yes', 'y']
+    else:
+        manual = True
+    
+    while manual:
+        new_rooms = get_room_input_with_reference(room_num)
+        if not new_rooms:
             print("Skipping this room...")
             continue
         
-        rooms.append(room)
-        room_num += 1
+        rooms.extend(new_rooms)
+        room_num += len(new_rooms)
         
         more = input("\nAdd another room? (yes/no): ").strip().lower()
         if more not in ['yes', 'y']:
@@ -348,6 +486,7 @@ def create_job_from_blueprint_reference(blueprint_path: str = None) -> FlooringJ
     job.customer_provides_wood = params['customer_provides_wood']
     job.material_cost_per_sqft = params.get('material_cost', 0.0)
     job.pickup_fee = params.get('pickup_fee', 0.0)
+    job.extras = params.get('extras', {})
     
     # Review and confirm
     if not review_before_calculate(job):
@@ -375,6 +514,7 @@ if __name__ == "__main__":
     if job:
         # Show results
         print_cost_report(job)
+        offer_risk_report(job)
         
         # Ask if another job
         while True:
@@ -383,6 +523,7 @@ if __name__ == "__main__":
                 job = create_job_from_blueprint_reference(blueprint_path)
                 if job:
                     print_cost_report(job)
+                    offer_risk_report(job)
             elif again in ['no', 'n']:
                 print("\nThank you.")
                 break
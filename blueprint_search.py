@@ -0,0 +1,243 @@
+"""
+Owen Moloney
+Blueprint Text Search
+Finds words such as "BEDROOM 3" or "MECH" anywhere in a PDF plan set.
+Every page's words are read once and held in two indexes:
+
+- an inverted index (word -> the lines it is on), with the words kept
+  sorted so a half-typed word is a binary search for its prefix range;
+- a grid over each page's line positions, so the label or dimension
+  string next to a match is found by looking at a few cells, not the page.
+
+Search-as-you-type therefore costs a lookup per keystroke, not a pass over
+the plan set. The words are cached under ~/.flooring_cache/text by the
+PDF's content hash, so an unchanged plan set is never read twice.
+
+    python3 blueprint_search.py plans.pdf "bedroom 3"
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import sys
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+from blueprint_text import (TextLine, DEFAULT_MAX_DISTANCE, extract_lines, find_dimensions,
+                            strip_dimensions)
+from watch_folder import RenderCache, DEFAULT_CACHE_DIR
+
+
+TEXT_CACHE_VERSION = 1
+
+# Grid cell for the per-page line index (PDF points; 72 = one inch)
+GRID_CELL = 72.0
+
+DEFAULT_LIMIT = 200
+
+_PUNCTUATION = ".,:;()[]{}<>*#"
+
+
+def normalise(word: str) -> str:
+    """How words are compared: case and surrounding punctuation ignored"""
+    return word.strip(_PUNCTUATION).lower()
+
+
+@dataclass
+class TextMatch:
+    """Where a search matched"""
+    page: int
+    bbox: Tuple[float, float, float, float]  # the matched words, in PDF points
+    line: int                                # line id in the index
+    text: str                                # the whole line
+
+
+class BlueprintIndex:
+    """Searchable words of every page of a plan set"""
+
+    def __init__(self, pages: List[List[TextLine]]):
+        self.page_count = len(pages)
+        self.lines: List[Tuple[int, TextLine]] = []         # line id -> (page, line)
+        self._tokens: List[List[str]] = []                  # line id -> normalised words
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}  # word -> [(line id, word position)]
+        self._grid: Dict[Tuple[int, int, int], List[int]] = {}  # (page, cx, cy) -> line ids
+        self._centres: List[Tuple[float, float]] = []
+        for page, lines in enumerate(pages):
+            for line in lines:
+                if line.words:
+                    self._add(page, line)
+        self._vocabulary = sorted(self._postings)
+
+    def _add(self, page: int, line: TextLine):
+        line_id = len(self.lines)
+        self.lines.append((page, line))
+        tokens = [normalise(line.text[w[4]:w[5]]) for w in line.words]
+        self._tokens.append(tokens)
+        for position, token in enumerate(tokens):
+            if token:
+                self._postings.setdefault(token, []).append((line_id, position))
+        x0, y0, x1, y1 = line.bbox(0, len(line.text))
+        centre = ((x0 + x1) / 2, (y0 + y1) / 2)
+        self._centres.append(centre)
+        self._grid.setdefault((page, int(centre[0] // GRID_CELL), int(centre[1] // GRID_CELL)), []).append(line_id)
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def _words_starting(self, prefix: str) -> List[str]:
+        start = bisect_left(self._vocabulary, prefix)
+        end = bisect_left(self._vocabulary, prefix + "￿")
+        return self._vocabulary[start:end]
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> Tuple[List[TextMatch], int]:
+        """
+        Lines where the query's words appear in order, each word matching the
+        start of a word on the plan ("bed 3" finds "BEDROOM 3"). Returns up
+        to limit matches in page order and the total number found.
+        """
+        terms = [normalise(term) for term in query.split()]
+        terms = [term for term in terms if term]
+        if not terms:
+            return [], 0
+        postings = [[self._postings[word] for word in self._words_starting(term)] for term in terms]
+        if len(terms) == 1:
+            # Each word's postings are in line order: merge just the first few
+            total = sum(len(p) for p in postings[0])
+            hits = list(islice(heapq.merge(*postings[0]), limit))
+        else:
+            # Drive the phrase check from the rarest word, then look either side of it
+            driver = min(range(len(terms)), key=lambda i: sum(len(p) for p in postings[i]))
+            hits = []
+            for word_postings in postings[driver]:
+                for line_id, position in word_postings:
+                    start = position - driver
+                    tokens = self._tokens[line_id]
+                    if start >= 0 and start + len(terms) <= len(tokens) and all(
+                            tokens[start + i].startswith(term) for i, term in enumerate(terms)):
+                        hits.append((line_id, start))
+            # Line ids run in page order, top to bottom within a page
+            hits.sort()
+            total = len(hits)
+        matches = []
+        for line_id, position in hits[:limit]:
+            page, line = self.lines[line_id]
+            first, last = line.words[position], line.words[position + len(terms) - 1]
+            matches.append(TextMatch(page, line.bbox(first[4], last[5]), line_id, line.text))
+        return matches, total
+
+    def lines_near(self, page: int, x: float, y: float, radius: float) -> List[int]:
+        """Line ids on a page whose centre is within radius of (x, y), nearest first"""
+        reach = max(1, math.ceil(radius / GRID_CELL))
+        cx, cy = int(x // GRID_CELL), int(y // GRID_CELL)
+        found = []
+        for i in range(cx - reach, cx + reach + 1):
+            for j in range(cy - reach, cy + reach + 1):
+                for line_id in self._grid.get((page, i, j), ()):
+                    lx, ly = self._centres[line_id]
+                    d = math.hypot(lx - x, ly - y)
+                    if d <= radius:
+                        found.append((d, line_id))
+        return [line_id for _, line_id in sorted(found)]
+
+    def line_at(self, page: int, x: float, y: float, radius: float = 12.0) -> Optional[int]:
+        """The line under (or just beside) a point, e.g. where the user clicked"""
+        for line_id in self.lines_near(page, x, y, radius * 4):
+            x0, y0, x1, y1 = self.lines[line_id][1].bbox(0, len(self.lines[line_id][1].text))
+            if x0 - radius <= x <= x1 + radius and y0 - radius <= y <= y1 + radius:
+                return line_id
+        return None
+
+    def suggest_room(self, line_id: int, max_distance: float = DEFAULT_MAX_DISTANCE) -> Tuple[str, Optional[float]]:
+        """
+        Room name from a line's label, and the area (sq ft) of a dimension
+        string on the same line or the nearest one below or beside it.
+        """
+        page, line = self.lines[line_id]
+        name = strip_dimensions(line.text) or line.text.strip()
+        if name.isupper():
+            name = name.title()
+        for near_id in self.lines_near(page, *self._centres[line_id], max_distance):
+            dimensions = find_dimensions(self.lines[near_id][1].text)
+            if dimensions:
+                length, width = dimensions[0]
+                return name, round(length * width, 2)
+        return name, None
+
+
+def read_pdf_lines(pdf_path: str) -> List[List[TextLine]]:
+    """Lines of words on every page (needs PyMuPDF; raises ImportError otherwise)"""
+    import fitz  # PyMuPDF
+
+    pdf_doc = fitz.open(pdf_path)
+    try:
+        return [extract_lines(page) for page in pdf_doc]
+    finally:
+        pdf_doc.close()
+
+
+def _lines_to_json(pages: List[List[TextLine]]) -> dict:
+    return {"version": TEXT_CACHE_VERSION,
+            "pages": [[[line.text, [list(w) for w in line.words]] for line in lines] for lines in pages]}
+
+
+def _lines_from_json(data: dict) -> Optional[List[List[TextLine]]]:
+    if data.get("version") != TEXT_CACHE_VERSION:
+        return None
+    return [[TextLine(text, [tuple(w) for w in words]) for text, words in lines] for lines in data["pages"]]
+
+
+def load_index(pdf_path: str, cache_dir: str = DEFAULT_CACHE_DIR) -> BlueprintIndex:
+    """Index of a PDF's text, read from the cache when the file is unchanged"""
+    cache = RenderCache(cache_dir)
+    digest = cache.digest_for(pdf_path)
+    cached = os.path.join(cache_dir, "text", f"{digest}.json")
+    pages = None
+    if os.path.exists(cached):
+        try:
+            with open(cached, encoding="utf-8") as f:
+                pages = _lines_from_json(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError):
+            pages = None
+    if pages is None:
+        pages = read_pdf_lines(pdf_path)
+        try:
+            os.makedirs(os.path.dirname(cached), exist_ok=True)
+            temp_path = cached + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(_lines_to_json(pages), f)
+            os.replace(temp_path, cached)
+            cache.save_index()
+        except OSError:
+            pass  # searching still works, the text is just read again next time
+    return BlueprintIndex(pages)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search the text of a PDF plan set")
+    parser.add_argument("pdf", help="blueprint PDF")
+    parser.add_argument("query", help="words to find, e.g. 'bedroom 3' (word starts are enough)")
+    parser.add_argument("--limit", type=int, default=50, help="most matches to list")
+    args = parser.parse_args()
+    try:
+        started = time.perf_counter()
+        index = load_index(args.pdf)
+        loaded = time.perf_counter()
+        matches, total = index.search(args.query, args.limit)
+        searched = time.perf_counter()
+    except ImportError:
+        print("\nPyMuPDF not installed. Install with: pip install pymupdf")
+        sys.exit(1)
+    except (OSError, RuntimeError) as e:
+        print(f"\nCould not read blueprint: {e}")
+        sys.exit(1)
+    for match in matches:
+        name, area = index.suggest_room(match.line)
+        suggestion = f"  -> {name}" + (f", {area:.2f} sq ft" if area else "")
+        print(f"page {match.page + 1}: {match.text}{suggestion}")
+    print(f"\n{total} match(es) in {index.page_count} page(s); "
+          f"index {1000 * (loaded - started):.0f} ms, search {1000 * (searched - loaded):.1f} ms")
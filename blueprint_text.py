@@ -0,0 +1,199 @@
+"""
+Owen Moloney
+Blueprint Text Extraction
+Reads room labels and dimension strings (KITCHEN 12'-6" x 14'-0", or metric
+5400 X 3150) from a PDF's text layer and pairs each dimension with the
+nearest room label, giving Room candidates to confirm instead of retype.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from main import Room
+from dimensions import parse_length
+
+
+MM_PER_FOOT = 304.8
+
+# Largest gap (PDF points, 1/72") between a label and its dimension string
+DEFAULT_MAX_DISTANCE = 120.0
+
+# Blueprint fonts often use typographic marks for feet and inches
+_QUOTES = str.maketrans({"’": "'", "′": "'", "´": "'",
+                         "”": '"', "″": '"'})
+
+_FEET_INCHES = r"""\d+(?:\.\d+)?\s*'(?:\s*-?\s*\d+(?:\.\d+)?\s*(?:"|'')?)?"""
+
+# Compiled once: imperial feet-inch pairs, whole-millimetre pairs, metre pairs
+_DIMENSION = re.compile(rf"""
+    (?<![\d.'])
+    (?:
+        (?P<ft_a>{_FEET_INCHES})\s*[xX×]\s*(?P<ft_b>{_FEET_INCHES})
+      | (?P<mm_a>\d{{3,5}})\s*(?:mm)?\s*[xX×]\s*(?P<mm_b>\d{{3,5}})(?:\s*mm)?(?![\d.])
+      | (?P<m_a>\d{{1,3}}\.\d{{1,3}})\s*m?\s*[xX×]\s*(?P<m_b>\d{{1,3}}\.\d{{1,3}})\s*m\b
+    )
+""", re.VERBOSE)
+
+# A room label: a few words of letters, optionally ending in a room number
+_LABEL = re.compile(r"^[A-Za-z][A-Za-z.&/'\- ]*[A-Za-z.](?:\s+\d{1,2})?$")
+_MAX_LABEL_WORDS = 4
+
+
+@dataclass
+class TextLine:
+    """One line of words from the PDF text layer"""
+    text: str
+    words: List[Tuple[float, float, float, float, int, int]]  # x0, y0, x1, y1, start, end
+
+    def bbox(self, start: int, end: int) -> Tuple[float, float, float, float]:
+        """Bounding box of the words overlapping text[start:end]"""
+        boxes = [w for w in self.words if w[4] < end and w[5] > start]
+        return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+
+@dataclass
+class RoomCandidate:
+    """A room found on the blueprint, waiting for the estimator to confirm it"""
+    name: str
+    length_ft: float
+    width_ft: float
+    page: int
+    bbox: Tuple[float, float, float, float]
+    source_text: str
+
+    @property
+    def area_sqft(self) -> float:
+        return self.length_ft * self.width_ft
+
+    def to_room(self) -> Room:
+        return Room(self.name, round(self.area_sqft, 2))
+
+
+def _center(bbox) -> Tuple[float, float]:
+    return (bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2
+
+
+def extract_lines(page) -> List[TextLine]:
+    """Group a PyMuPDF page's words into lines, keeping each word's position"""
+    grouped = {}
+    for x0, y0, x1, y1, word, block, line, word_no in page.get_text("words"):
+        grouped.setdefault((block, line), []).append((word_no, x0, y0, x1, y1, word))
+
+    lines = []
+    for key in sorted(grouped):
+        parts = []
+        words = []
+        offset = 0
+        for _, x0, y0, x1, y1, word in sorted(grouped[key]):
+            word = word.translate(_QUOTES)
+            words.append((x0, y0, x1, y1, offset, offset + len(word)))
+            parts.append(word)
+            offset += len(word) + 1
+        lines.append(TextLine(" ".join(parts), words))
+    return lines
+
+
+def parse_dimension(match) -> Tuple[float, float]:
+    """Length and width in feet from a _DIMENSION match"""
+    if match.group("ft_a"):
+        return parse_length(match.group("ft_a")), parse_length(match.group("ft_b"))
+    if match.group("mm_a"):
+        return float(match.group("mm_a")) / MM_PER_FOOT, float(match.group("mm_b")) / MM_PER_FOOT
+    return float(match.group("m_a")) * 1000 / MM_PER_FOOT, float(match.group("m_b")) * 1000 / MM_PER_FOOT
+
+
+def find_dimensions(text: str) -> List[Tuple[float, float]]:
+    """Every (length, width) in feet written in a line of text"""
+    found = []
+    for match in _DIMENSION.finditer(text.translate(_QUOTES)):
+        try:
+            found.append(parse_dimension(match))
+        except ValueError:
+            continue
+    return found
+
+
+def strip_dimensions(text: str) -> str:
+    """A line of text without its dimension strings (what is left is usually the room label)"""
+    return " ".join(_DIMENSION.sub(" ", text.translate(_QUOTES)).split()).strip(" :-")
+
+
+def candidates_from_lines(lines: List[TextLine], page_number: int = 0,
+                          max_distance: float = DEFAULT_MAX_DISTANCE) -> List[RoomCandidate]:
+    """Find dimension strings and attach each to the nearest unused room label"""
+    dimensions = []  # (length, width, bbox, text, same-line label or None)
+    labels = []      # (name, bbox)
+    for line in lines:
+        rest = line.text
+        for match in _DIMENSION.finditer(line.text):
+            try:
+                length, width = parse_dimension(match)
+            except ValueError:
+                continue
+            inline = line.text[:match.start()].strip(" :-")
+            inline = inline if _LABEL.match(inline) else None
+            dimensions.append((length, width, line.bbox(match.start(), match.end()),
+                               match.group(0), inline))
+            rest = rest.replace(match.group(0), " ")
+
+        rest = rest.strip(" :-")
+        if (_LABEL.match(rest) and len(rest.split()) <= _MAX_LABEL_WORDS
+                and sum(c.isalpha() for c in rest) >= 3 and rest not in
+                (d[4] for d in dimensions)):
+            start = line.text.find(rest)
+            labels.append((rest, line.bbox(start, start + len(rest))))
+
+    # Closest label/dimension pairs first, each label used once
+    pairs = []
+    for d_index, (_, _, d_box, _, inline) in enumerate(dimensions):
+        if inline:
+            continue
+        dx, dy = _center(d_box)
+        for l_index, (_, l_box) in enumerate(labels):
+            lx, ly = _center(l_box)
+            distance = ((dx - lx) ** 2 + (dy - ly) ** 2) ** 0.5
+            if distance <= max_distance:
+                pairs.append((distance, d_index, l_index))
+    pairs.sort()
+
+    names = {i: d[4] for i, d in enumerate(dimensions) if d[4]}
+    used_labels = set()
+    for _, d_index, l_index in pairs:
+        if d_index in names or l_index in used_labels:
+            continue
+        names[d_index] = labels[l_index][0]
+        used_labels.add(l_index)
+
+    candidates = []
+    for i, (length, width, bbox, text, _) in enumerate(dimensions):
+        name = names.get(i) or f"Room {i + 1}"
+        candidates.append(RoomCandidate(name.title() if name.isupper() else name,
+                                        length, width, page_number, bbox, text))
+    return candidates
+
+
+def extract_room_candidates(pdf_path: str, pages: Optional[List[int]] = None,
+                            max_distance: float = DEFAULT_MAX_DISTANCE) -> List[RoomCandidate]:
+    """
+    Room candidates from every page (or the given pages) of a PDF.
+    Needs PyMuPDF; raises ImportError if it is not installed.
+    """
+    import fitz  # PyMuPDF
+
+    candidates = []
+    pdf_doc = fitz.open(pdf_path)
+    try:
+        for page_number in (pages if pages is not None else range(len(pdf_doc))):
+            lines = extract_lines(pdf_doc[page_number])
+            candidates.extend(candidates_from_lines(lines, page_number, max_distance))
+    finally:
+        pdf_doc.close()
+    return candidates
+
+
+def format_candidate(candidate: RoomCandidate) -> str:
+    """One-line description used in review screens"""
+    return (f"{candidate.name}: {candidate.length_ft:.2f} × {candidate.width_ft:.2f} ft "
+            f"= {candidate.area_sqft:.2f} sq ft  (page {candidate.page + 1}, \"{candidate.source_text}\")")
@@ -0,0 +1,232 @@
+"""
+Owen Moloney
+Material Price Catalogue
+Local catalogue of flooring SKUs (species / grade / width / cost per sq ft)
+loaded from a CSV price list into a prefix index and a trigram index, so the
+material cost fields can autocomplete on every keystroke.
+"""
+
+import csv
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Set
+
+
+# Price list looked for next to the program when no path is given
+DEFAULT_CATALOGUE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "materials.csv")
+
+COLUMN_ALIASES = {
+    "sku": ["sku", "item", "code", "product code"],
+    "species": ["species", "wood", "material"],
+    "grade": ["grade"],
+    "width": ["width", "board width"],
+    "cost_per_sqft": ["cost_per_sqft", "cost per sq ft", "cost", "price", "$/sq ft", "price per sq ft"],
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+
+
+@dataclass
+class MaterialSku:
+    """One priced product from the catalogue"""
+    sku: str
+    species: str
+    grade: str
+    width: str
+    cost_per_sqft: float
+
+    @property
+    def label(self) -> str:
+        parts = [self.species, self.grade, self.width]
+        return " ".join(part for part in parts if part) + f" ({self.sku})"
+
+    def describe(self) -> str:
+        return f"{self.label} - ${self.cost_per_sqft:.2f}/sq ft"
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class MaterialCatalogue:
+    """SKUs plus the indexes used for search"""
+
+    def __init__(self, items: List[MaterialSku]):
+        self.items = items
+        order = sorted(range(len(items)), key=lambda i: items[i].label.lower())
+
+        # Prefix index: every prefix of every word -> item ids in alphabetical
+        # order, so a search can stop as soon as it has enough results
+        self._prefix: Dict[str, List[int]] = {}
+        for item_id in order:
+            prefixes = set()
+            for token in _tokens(items[item_id].label):
+                prefixes.update(token[:end] for end in range(1, len(token) + 1))
+            for prefix in prefixes:
+                self._prefix.setdefault(prefix, []).append(item_id)
+        # The same ids as sets, for checking the other words of a query
+        self._prefix_sets: Dict[str, FrozenSet[int]] = {p: frozenset(ids) for p, ids in self._prefix.items()}
+
+        # Trigram index: trigram -> item ids, for typo-tolerant matches
+        self._trigrams: Dict[str, List[int]] = {}
+        for item_id, item in enumerate(items):
+            for gram in _trigrams(item.label):
+                self._trigrams.setdefault(gram, []).append(item_id)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def search(self, query: str, limit: int = 10) -> List[MaterialSku]:
+        """
+        Best matches for what has been typed so far.
+        Every word must prefix-match a word of the SKU ("wh oak sel");
+        if that finds too little, trigram similarity fills in near misses.
+        """
+        words = _tokens(query)
+        if not words:
+            return []
+
+        # Walk the rarest word's list and check the others against it
+        words = sorted(words, key=lambda word: len(self._prefix.get(word, ())))
+        others = [self._prefix_sets.get(word, frozenset()) for word in words[1:]]
+        results = []
+        for item_id in self._prefix.get(words[0], ()):
+            if all(item_id in other for other in others):
+                results.append(item_id)
+                if len(results) >= limit:
+                    break
+
+        if len(results) < limit:
+            grams = _trigrams(" ".join(words))
+            scores = Counter()
+            for gram in grams:
+                scores.update(self._trigrams.get(gram, ()))
+            already = set(results)
+            threshold = max(2, len(grams) // 3)
+            for item_id, score in scores.most_common():
+                if score < threshold or len(results) >= limit:
+                    break
+                if item_id not in already:
+                    results.append(item_id)
+                    already.add(item_id)
+
+        return [self.items[i] for i in results]
+
+    def find_sku(self, sku: str) -> Optional[MaterialSku]:
+        for item in self.items:
+            if item.sku.lower() == sku.lower():
+                return item
+        return None
+
+
+def load_catalogue(path: str = DEFAULT_CATALOGUE_PATH) -> MaterialCatalogue:
+    """Load a CSV price list; raises ValueError if required columns are missing"""
+    items = []
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = [name.strip().lower() for name in next(reader, [])]
+        columns = {}
+        for field_name, aliases in COLUMN_ALIASES.items():
+            for alias in aliases:
+                if alias in header:
+                    columns[field_name] = header.index(alias)
+                    break
+        if "cost_per_sqft" not in columns or ("species" not in columns and "sku" not in columns):
+            raise ValueError("Price list needs a cost column and a species or SKU column")
+
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+
+            def cell(name: str) -> str:
+                i = columns.get(name)
+                return row[i].strip() if i is not None and i < len(row) else ""
+
+            try:
+                cost = float(cell("cost_per_sqft").lstrip("$"))
+            except ValueError:
+                raise ValueError(f"Line {reader.line_num}: bad cost '{cell('cost_per_sqft')}'")
+            items.append(MaterialSku(cell("sku") or f"#{len(items) + 1}", cell("species"),
+                                     cell("grade"), cell("width"), cost))
+    return MaterialCatalogue(items)
+
+
+def load_default_catalogue() -> Optional[MaterialCatalogue]:
+    """The catalogue next to the program, or None if there isn't a usable one"""
+    if not os.path.exists(DEFAULT_CATALOGUE_PATH):
+        return None
+    try:
+        return load_catalogue(DEFAULT_CATALOGUE_PATH)
+    except (OSError, ValueError) as e:
+        print(f"\nCould not load material catalogue: {e}")
+        return None
+
+
+def prompt_material_cost(prompt: str, catalogue: Optional[MaterialCatalogue] = None) -> float:
+    """
+    Ask for a material cost per sq ft.
+    A number is used as typed; text is looked up in the catalogue (Tab
+    completes SKU names where readline is available). Raises ValueError when
+    nothing usable was entered, like float(input(...)) does.
+    """
+    if catalogue is None:
+        return float(input(prompt))
+
+    completer_installed = False
+    try:
+        import readline
+
+        matches = []
+
+        def complete(text, state):
+            if state == 0:
+                matches[:] = [item.label for item in catalogue.search(readline.get_line_buffer(), 20)]
+            return matches[state] if state < len(matches) else None
+
+        old_completer = readline.get_completer()
+        old_delims = readline.get_completer_delims()
+        libedit = "libedit" in (readline.__doc__ or "")
+        readline.set_completer(complete)
+        readline.set_completer_delims("")
+        readline.parse_and_bind("bind ^I rl_complete" if libedit else "tab: complete")
+        completer_installed = True
+    except ImportError:
+        pass
+
+    try:
+        answer = input(prompt).strip()
+    finally:
+        if completer_installed:
+            readline.set_completer(old_completer)
+            readline.set_completer_delims(old_delims)
+            if old_completer is None:
+                # Nobody else was completing: Tab goes back to inserting a tab (Python's default)
+                readline.parse_and_bind("bind ^I ed-insert" if libedit else "tab: tab-insert")
+
+    try:
+        return float(answer.lstrip("$"))
+    except ValueError:
+        pass
+
+    results = catalogue.search(answer, limit=9)
+    if not results:
+        print(f"No catalogue match for '{answer}'.")
+        raise ValueError(answer)
+    if len(results) == 1 or results[0].label.lower() == answer.lower():
+        chosen = results[0]
+    else:
+        for i, item in enumerate(results, 1):
+            print(f"   {i}. {item.describe()}")
+        pick = input("Choose a number: ").strip()
+        if not pick.isdigit() or not 1 <= int(pick) <= len(results):
+            raise ValueError(pick)
+        chosen = results[int(pick) - 1]
+    print(f"   {chosen.describe()}")
+    return chosen.cost_per_sqft
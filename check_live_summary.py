@@ -0,0 +1,69 @@
+"""
+Owen Moloney
+Live Cost Summary Check
+Checks that the GUI's live cost summary (JobWorkspace.live_breakdown, worked
+out from running area subtotals) matches job.get_cost_breakdown(). See
+TEST_INSTRUCTIONS.txt.
+"""
+
+import argparse
+import copy
+import sys
+from typing import Dict, List
+
+from main import FlooringJob, Employee, Room, UnitPrototype, UnitPlacement, UnitOverride, load_job
+from workspace import JobWorkspace
+
+
+def breakdown_mismatches(job: FlooringJob) -> List[str]:
+    """Fields where JobWorkspace.live_breakdown() disagrees with job.get_cost_breakdown()"""
+    expected = job.get_cost_breakdown()
+    # JobWorkspace converts the job's collections in place, so it gets a copy
+    live = JobWorkspace("check", copy.deepcopy(job)).live_breakdown()
+    mismatches = []
+    for key, value in expected.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            agrees = live[key] == value
+        else:
+            agrees = abs(live[key] - value) < 0.005
+        if not agrees:
+            mismatches.append(f"{key}: live {live[key]!r}, expected {value!r}")
+    return mismatches
+
+
+def sample_jobs() -> Dict[str, FlooringJob]:
+    """Jobs the live breakdown has to get right: no rooms, crew only, and placed units"""
+    crew_only = FlooringJob(employees=[Employee("John", 35.0), Employee("Mike", 22.0)],
+                            days_required=2, pickup_fee=150.0)
+    plan = UnitPrototype("Type A", [Room("Bedroom", 180.0), Room("Kitchen", 120.0), Room("Bath", 45.0)])
+    with_units = FlooringJob(rooms=[Room("Lobby", 400.0)], employees=[Employee("John", 35.0)],
+                             days_required=5, sanding_cost_per_sqft=1.0, customer_provides_wood=False,
+                             material_cost_per_sqft=8.5, pickup_fee=150.0,
+                             units=[UnitPlacement(plan, 12, "Tower A", [
+                                 UnitOverride(3, {"Kitchen": None}, [Room("Den", 90.0)]),
+                                 UnitOverride(7, {"Bedroom": Room("Bedroom", 210.0)})])])
+    return {"empty job": FlooringJob(), "crew only": crew_only, "with units": with_units}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the GUI's live cost summary against the full calculation")
+    parser.add_argument("jobs", nargs="*", help="job files to check (default: built-in sample jobs)")
+    args = parser.parse_args()
+
+    if args.jobs:
+        try:
+            jobs = {path: load_job(path) for path in args.jobs}
+        except (OSError, ValueError) as e:
+            print(f"\nCould not load job: {e}")
+            sys.exit(1)
+    else:
+        jobs = sample_jobs()
+
+    failed = False
+    for label, checked in jobs.items():
+        mismatches = breakdown_mismatches(checked)
+        print(f"   {label}: {'OK' if not mismatches else 'MISMATCH'}")
+        for line in mismatches:
+            print(f"      {line}")
+        failed = failed or bool(mismatches)
+    sys.exit(1 if failed else 0)
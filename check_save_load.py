@@ -0,0 +1,82 @@
+"""
+Owen Moloney
+Save/Load Round-Trip Check
+Checks that a job saved with save_job comes back from load_job with the same
+rooms, unit placements and cost breakdown. See TEST_INSTRUCTIONS.txt.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from typing import Dict, List
+
+from main import (FlooringJob, Room, UnitPrototype, UnitPlacement, UnitOverride,
+                  job_to_dict, save_job, load_job)
+
+
+def round_trip_mismatches(job: FlooringJob) -> List[str]:
+    """Differences between job and the job read back after saving it"""
+    handle, path = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+    try:
+        save_job(job, path)
+        loaded = load_job(path)
+    finally:
+        os.remove(path)
+
+    mismatches = []
+    expected, actual = job.get_cost_breakdown(), loaded.get_cost_breakdown()
+    for key, value in expected.items():
+        if actual[key] != value and not (isinstance(value, float) and abs(actual[key] - value) < 0.005):
+            mismatches.append(f"{key}: loaded {actual[key]!r}, saved {value!r}")
+    if job_to_dict(loaded) != job_to_dict(job):
+        mismatches.append("job data differs after loading")
+    for number, (saved, read) in enumerate(zip(job.units, loaded.units), 1):
+        if read.prototype.rooms != saved.prototype.rooms:
+            mismatches.append(f"placement {number} ({saved.prototype.name}): loaded with another plan's rooms")
+    # Placements that shared one prototype must still share it
+    saved_groups = [[i for i, p in enumerate(job.units) if p.prototype is u.prototype] for u in job.units]
+    read_groups = [[i for i, p in enumerate(loaded.units) if p.prototype is u.prototype] for u in loaded.units]
+    if saved_groups != read_groups:
+        mismatches.append("placements no longer share the same prototypes")
+    return mismatches
+
+
+def sample_jobs() -> Dict[str, FlooringJob]:
+    """Jobs that have to survive a save: plain rooms, overrides, and two plans with the same name"""
+    plain = FlooringJob(rooms=[Room("Living Room", 240.0), Room("Kitchen", 180.0)], days_required=2)
+    plan = UnitPrototype("Type A", [Room("Bedroom", 180.0), Room("Kitchen", 120.0), Room("Bath", 45.0)])
+    with_units = FlooringJob(rooms=[Room("Lobby", 400.0)], days_required=5,
+                             units=[UnitPlacement(plan, 12, "Tower A", [
+                                        UnitOverride(3, {"Kitchen": None}, [Room("Den", 90.0)])]),
+                                    UnitPlacement(plan, 4, "Tower B")])
+    # New plans in the unit dialog all start out as "Type A"
+    same_names = FlooringJob(units=[
+        UnitPlacement(UnitPrototype("Type A", [Room("Bed", 200.0)]), 10),
+        UnitPlacement(UnitPrototype("Type A", [Room("Studio", 500.0), Room("Bath", 50.0)]), 10)])
+    return {"rooms only": plain, "with units": with_units, "plans with the same name": same_names}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that jobs survive being saved and loaded again")
+    parser.add_argument("jobs", nargs="*", help="job files to check (default: built-in sample jobs)")
+    args = parser.parse_args()
+
+    if args.jobs:
+        try:
+            jobs = {path: load_job(path) for path in args.jobs}
+        except (OSError, ValueError) as e:
+            print(f"\nCould not load job: {e}")
+            sys.exit(1)
+    else:
+        jobs = sample_jobs()
+
+    failed = False
+    for label, checked in jobs.items():
+        mismatches = round_trip_mismatches(checked)
+        print(f"   {label}: {'OK' if not mismatches else 'MISMATCH'}")
+        for line in mismatches:
+            print(f"      {line}")
+        failed = failed or bool(mismatches)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,316 @@
+"""
+Owen Moloney
+Days-Required Predictor
+Suggests days_required from how long finished jobs actually took, instead
+of a guess. When a job is finished, its actual days (and crew hours, if
+known) are recorded next to the estimate. A least-squares fit then predicts
+the crew hours from the floor space, room count and sanded floor space:
+
+    crew hours = base + a * (1,000 sq ft) + b * rooms + c * (1,000 sq ft sanded)
+
+A separate fit is kept for each crew and job type, and one for each crew,
+each job type and all jobs, so a suggestion comes from the most specific
+group with enough finished jobs. Each group keeps only its running sums
+(X'X and X'y). Recording a job updates four small sums, and only those
+groups are solved again, the next time they are asked for. Loading the
+history adds up every group in a few NumPy passes.
+
+    ~/.flooring_outcomes.jsonl    one finished job per line
+
+    python3 days_predictor.py record kitchen_reno.job.json --days 4 --hours 70
+    python3 days_predictor.py suggest new_job.job.json
+    python3 days_predictor.py report
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from dataclasses import dataclass, asdict, fields
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from main import FlooringJob, HOURS_PER_DAY, load_job
+
+
+DEFAULT_OUTCOMES_PATH = os.path.join(os.path.expanduser("~"), ".flooring_outcomes.jsonl")
+
+FEATURES = ("base", "per 1,000 sq ft", "per room", "per 1,000 sq ft sanded")
+
+# Fewer finished jobs than this and a group defers to a broader one
+MIN_JOBS = len(FEATURES) + 1
+
+# Keeps the fit solvable when a group's jobs all look alike (e.g. same size)
+RIDGE = 1e-3
+
+ANY = "*"
+
+# Most specific first: (crew, job type), (crew, any), (any, job type), (any, any)
+_LEVELS = ((True, True), (True, False), (False, True), (False, False))
+
+
+@dataclass
+class JobOutcome:
+    """A finished job: what it was, what was estimated and what it took"""
+    crew: str
+    job_type: str
+    usable_sqft: float
+    rooms: int
+    sanded_sqft: float
+    crew_size: int
+    estimated_days: int
+    actual_days: float
+    actual_hours: float  # crew hours (all workers together)
+    closed: str = ""
+    name: str = ""
+
+
+@dataclass
+class DaysSuggestion:
+    """A suggested days_required and what it was based on"""
+    days: int
+    crew_hours: float
+    jobs: int    # finished jobs in the group it came from
+    basis: str   # e.g. "this crew, refinish jobs"
+
+
+def crew_key(employees) -> str:
+    """The same people give the same key, whatever the order or case"""
+    return ", ".join(sorted(e.name.strip().lower() for e in employees))
+
+
+def job_type(job: FlooringJob) -> str:
+    return str(job.extras.get("job_type", "")).strip().lower()
+
+
+def features(usable_sqft: float, rooms: int, sanded_sqft: float) -> List[float]:
+    return [1.0, usable_sqft / 1000, float(rooms), sanded_sqft / 1000]
+
+
+def outcome_for(job: FlooringJob, actual_days: float, actual_hours: Optional[float] = None,
+                name: str = "") -> JobOutcome:
+    """Outcome of a finished job; hours default to full days for the whole crew"""
+    usable = job.get_total_floor_space()
+    crew_size = max(1, len(job.employees))
+    if actual_hours is None:
+        actual_hours = actual_days * HOURS_PER_DAY * crew_size
+    return JobOutcome(
+        crew=crew_key(job.employees),
+        job_type=job_type(job),
+        usable_sqft=usable,
+        rooms=job.room_count(),
+        sanded_sqft=usable if job.sanding_cost_per_sqft > 0 else 0.0,
+        crew_size=crew_size,
+        estimated_days=job.days_required,
+        actual_days=float(actual_days),
+        actual_hours=float(actual_hours),
+        closed=time.strftime("%Y-%m-%d"),
+        name=name,
+    )
+
+
+def _group(crew: str, kind: str, level: Tuple[bool, bool]) -> Tuple[str, str]:
+    return (crew if level[0] else ANY, kind if level[1] else ANY)
+
+
+def _describe(group: Tuple[str, str]) -> str:
+    crew, kind = group
+    parts = ["this crew" if crew != ANY else ""]
+    if kind != ANY:
+        parts.append(f"{kind} jobs" if kind else "untyped jobs")
+    return ", ".join(p for p in parts if p) or "all jobs"
+
+
+class DaysPredictor:
+    """Finished jobs and the fits made from them"""
+
+    def __init__(self, path: str = DEFAULT_OUTCOMES_PATH):
+        self.path = path
+        self.outcomes: List[JobOutcome] = []
+        self._sums: Dict[Tuple[str, str], list] = {}  # group -> [X'X, X'y, jobs]
+        self._fits: Dict[Tuple[str, str], np.ndarray] = {}  # group -> coefficients (solved lazily)
+        self._offset = 0  # bytes of the file read so far
+        self.refresh()
+
+    def refresh(self) -> int:
+        """Pick up jobs recorded since the last read (e.g. from another window); returns how many"""
+        try:
+            if os.path.getsize(self.path) <= self._offset:
+                return 0
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+        except OSError:
+            return 0
+        # A line still being written is left for next time
+        complete = data[:data.rfind(b"\n") + 1]
+        self._offset += len(complete)
+        names = {f.name for f in fields(JobOutcome)}
+        new = []
+        for line in complete.decode("utf-8").splitlines():
+            try:
+                entry = json.loads(line)
+                new.append(JobOutcome(**{k: v for k, v in entry.items() if k in names}))
+            except (ValueError, TypeError):
+                continue
+        self._add(new)
+        return len(new)
+
+    def _add(self, outcomes: List[JobOutcome]):
+        """Add outcomes to the running sums of every group they belong to"""
+        if not outcomes:
+            return
+        self.outcomes.extend(outcomes)
+        x = np.array([features(o.usable_sqft, o.rooms, o.sanded_sqft) for o in outcomes])
+        y = np.array([o.actual_hours for o in outcomes], dtype=float)
+        outer = x[:, :, None] * x[:, None, :]
+        xy = x * y[:, None]
+        for level in _LEVELS:
+            index: Dict[Tuple[str, str], int] = {}
+            rows = np.array([index.setdefault(_group(o.crew, o.job_type, level), len(index)) for o in outcomes])
+            xtx = np.zeros((len(index), len(FEATURES), len(FEATURES)))
+            xty = np.zeros((len(index), len(FEATURES)))
+            np.add.at(xtx, rows, outer)
+            np.add.at(xty, rows, xy)
+            counts = np.bincount(rows, minlength=len(index))
+            for group, i in index.items():
+                sums = self._sums.get(group)
+                if sums is None:
+                    self._sums[group] = [xtx[i], xty[i], int(counts[i])]
+                else:
+                    sums[0] = sums[0] + xtx[i]
+                    sums[1] = sums[1] + xty[i]
+                    sums[2] += int(counts[i])
+                self._fits.pop(group, None)
+
+    def record(self, outcome: JobOutcome):
+        """Save a finished job and fold it into the fits"""
+        self.refresh()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(asdict(outcome)) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._offset = os.path.getsize(self.path)
+        self._add([outcome])
+
+    def coefficients(self, group: Tuple[str, str]) -> Optional[np.ndarray]:
+        """Least-squares fit of a group, or None with too few jobs"""
+        sums = self._sums.get(group)
+        if sums is None or sums[2] < MIN_JOBS:
+            return None
+        fit = self._fits.get(group)
+        if fit is None:
+            xtx, xty, _ = sums
+            fit = np.linalg.lstsq(xtx + RIDGE * np.eye(len(FEATURES)), xty, rcond=None)[0]
+            self._fits[group] = fit
+        return fit
+
+    def _best_group(self, crew: str, kind: str) -> Optional[Tuple[str, str]]:
+        for level in _LEVELS:
+            group = _group(crew, kind, level)
+            if self.coefficients(group) is not None:
+                return group
+        return None
+
+    def suggest(self, job: FlooringJob, usable_sqft: Optional[float] = None,
+                rooms: Optional[int] = None) -> Optional[DaysSuggestion]:
+        """
+        Suggested days_required for a job, or None until enough jobs are
+        recorded. usable_sqft and rooms can be passed in when already known
+        (the GUI has them as running subtotals).
+        """
+        if not job.employees:
+            return None
+        if usable_sqft is None:
+            usable_sqft = job.get_total_floor_space()
+        if rooms is None:
+            rooms = job.room_count()
+        group = self._best_group(crew_key(job.employees), job_type(job))
+        if group is None or usable_sqft <= 0:
+            return None
+        sanded = usable_sqft if job.sanding_cost_per_sqft > 0 else 0.0
+        hours = max(0.0, float(np.dot(self.coefficients(group), features(usable_sqft, rooms, sanded))))
+        days = max(1, math.ceil(hours / (HOURS_PER_DAY * len(job.employees)) - 1e-9))
+        return DaysSuggestion(days, hours, self._sums[group][2], _describe(group))
+
+    def job_types(self) -> List[str]:
+        return sorted({o.job_type for o in self.outcomes if o.job_type})
+
+    def report(self) -> List[str]:
+        """
+        How the typed estimates and the fits compare with what jobs took,
+        per group with a fit. Each finished job is predicted from the fit
+        it would get now (all at once, as one matrix product).
+        """
+        if not self.outcomes:
+            return ["No finished jobs recorded yet."]
+        x = np.array([features(o.usable_sqft, o.rooms, o.sanded_sqft) for o in self.outcomes])
+        actual = np.array([o.actual_days for o in self.outcomes])
+        estimated = np.array([o.estimated_days for o in self.outcomes], dtype=float)
+        crew_size = np.array([o.crew_size for o in self.outcomes], dtype=float)
+        groups = [self._best_group(o.crew, o.job_type) for o in self.outcomes]
+        fitted = np.array([g is not None for g in groups])
+        coefs = np.array([self.coefficients(g) if g is not None else np.zeros(len(FEATURES)) for g in groups])
+        predicted = np.maximum(1, np.ceil(np.einsum("ij,ij->i", x, coefs) / (HOURS_PER_DAY * crew_size) - 1e-9))
+
+        lines = [f"{len(self.outcomes)} finished job(s), {int(fitted.sum())} covered by a fit "
+                 f"(a group needs {MIN_JOBS} jobs)", ""]
+        lines.append(f"{'Crew':<30} {'Type':<14} {'Jobs':>5} {'Typed off by':>13} {'Fit off by':>11}   "
+                     + ", ".join(f"hrs {name}" for name in FEATURES[1:]))
+        for group in sorted({g for g in groups if g is not None}):
+            mask = np.array([g == group for g in groups])
+            typed = np.abs(estimated[mask] - actual[mask]).mean()
+            model = np.abs(predicted[mask] - actual[mask]).mean()
+            coef = self.coefficients(group)
+            crew = "(any crew)" if group[0] == ANY else group[0]
+            kind = "(any)" if group[1] == ANY else group[1] or "-"
+            lines.append(f"{crew[:30]:<30} {kind[:14]:<14} {self._sums[group][2]:>5} "
+                         f"{typed:>9.1f} day {model:>7.1f} day   "
+                         f"{coef[0]:.1f} base, " + ", ".join(f"{c:.1f}" for c in coef[1:]))
+        return lines
+
+
+def _load(path: str) -> FlooringJob:
+    try:
+        return load_job(path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"\nCould not open job: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Suggest days required from finished jobs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="record how long a finished job took")
+    record.add_argument("job", help="job file (.job.json)")
+    record.add_argument("--days", type=float, required=True, help="days the job actually took")
+    record.add_argument("--hours", type=float, help="crew hours it took (default: days x 8 x crew size)")
+    record.add_argument("--type", help="job type, e.g. refinish or install (saved in the job file too)")
+    suggest = commands.add_parser("suggest", help="suggest days required for a job")
+    suggest.add_argument("job", help="job file (.job.json)")
+    commands.add_parser("report", help="estimates and fits against what jobs took")
+    args = parser.parse_args()
+
+    predictor = DaysPredictor()
+    if args.command == "record":
+        job = _load(args.job)
+        if args.type:
+            job.extras["job_type"] = args.type.strip().lower()
+            from main import save_job
+            save_job(job, args.job)
+        predictor.record(outcome_for(job, args.days, args.hours, os.path.basename(args.job)))
+        print(f"Recorded: estimated {job.days_required} day(s), took {args.days:g}. "
+              f"{len(predictor.outcomes)} finished job(s) on file.")
+    elif args.command == "suggest":
+        job = _load(args.job)
+        suggestion = predictor.suggest(job)
+        if suggestion is None:
+            print(f"Not enough finished jobs yet (a group needs {MIN_JOBS}; {len(predictor.outcomes)} on file).")
+        else:
+            print(f"Suggested: {suggestion.days} day(s) ({suggestion.crew_hours:.0f} crew hours), "
+                  f"from {suggestion.jobs} finished jobs ({suggestion.basis}). Typed: {job.days_required}.")
+    else:
+        print("\n".join(predictor.report()))
@@ -0,0 +1,47 @@
+"""
+Owen Moloney
+Dimension Parsing
+Shared parsers for the measurement text estimators type or paste:
+plain feet (12.5), feet-inch (12'6", 12' 6, 12-6) and areas (300, 12'6x14).
+"""
+
+import re
+
+
+# 12'6"  12' 6  12'-6"  12ft 6in  12-6  12.5  6"  (feet are optional only when inches are marked)
+_LENGTH = re.compile(r"""
+    ^\s*(?:
+        (?P<feet>\d+(?:\.\d+)?)\s*(?:'|ft\.?|feet|foot)?
+        (?:\s*-?\s*(?P<inches>\d+(?:\.\d+)?)\s*(?:"|''|in\.?|inch(?:es)?)?)?
+      |
+        (?P<only_inches>\d+(?:\.\d+)?)\s*(?:"|''|in\.?|inch(?:es)?)
+    )\s*$
+""", re.VERBOSE | re.IGNORECASE)
+
+_BY = re.compile(r"\s*(?:x|×|\*|by)\s*", re.IGNORECASE)
+
+
+def parse_length(text: str) -> float:
+    """Parse a length in feet; raises ValueError if it is not a length"""
+    match = _LENGTH.match(text)
+    if not match:
+        raise ValueError(f"not a length: {text!r}")
+    if match.group("only_inches") is not None:
+        return float(match.group("only_inches")) / 12
+    feet = float(match.group("feet"))
+    inches = match.group("inches")
+    if inches is not None:
+        if float(inches) >= 12:
+            raise ValueError(f"inches must be under 12: {text!r}")
+        feet += float(inches) / 12
+    return feet
+
+
+def parse_area(text: str) -> float:
+    """Parse an area in sq ft: either a plain number or 'length x width'"""
+    parts = _BY.split(text.strip())
+    if len(parts) == 2:
+        return parse_length(parts[0]) * parse_length(parts[1])
+    if len(parts) == 1:
+        return float(parts[0])
+    raise ValueError(f"not an area: {text!r}")
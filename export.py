@@ -0,0 +1,237 @@
+"""
+Owen Moloney
+Priced Quote Export
+Writes priced jobs as two typed, compressed, columnar tables - one row per
+job and one row per room - for margin analysis. Rows are buffered and
+written a chunk at a time, so memory stays flat however many jobs are
+exported, and readers load only the columns they ask for.
+
+Parquet is used when pyarrow is installed; otherwise each chunk is a
+compressed NumPy .npz file (one array per column).
+"""
+
+import argparse
+import glob
+import os
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from main import FlooringJob, JOB_FILE_EXTENSION, load_job
+from hierarchy import share_costs
+
+
+DEFAULT_CHUNK_ROWS = 50_000
+
+# Column name -> type ("str", "float", "int" or "bool")
+JOB_COLUMNS = {
+    "job": "str",
+    "rooms": "int",
+    "employees": "int",
+    "days_required": "int",
+    "usable_sqft": "float",
+    "material_cost": "float",
+    "labor_cost": "float",
+    "sanding_cost": "float",
+    "total_cost": "float",
+    "customer_provides_wood": "bool",
+    "sanding_cost_per_sqft": "float",
+    "material_cost_per_sqft": "float",
+}
+
+# Room costs are the job's costs shared out by usable area, so the rooms
+# of a job add up to its total. A placed unit plan is one row for all its
+# copies (room = the plan's name, copies = how many).
+ROOM_COLUMNS = {
+    "job": "str",
+    "room": "str",
+    "location": "str",
+    "copies": "int",
+    "total_area_sqft": "float",
+    "obstacle_sqft": "float",
+    "usable_sqft": "float",
+    "material_cost": "float",
+    "labor_cost": "float",
+    "sanding_cost": "float",
+    "total_cost": "float",
+}
+
+
+def job_row(job_id: str, job: FlooringJob) -> dict:
+    breakdown = job.get_cost_breakdown()
+    return {
+        "job": job_id,
+        "rooms": job.room_count(),
+        "employees": len(job.employees),
+        "days_required": job.days_required,
+        "usable_sqft": breakdown["total_floor_space_sqft"],
+        "material_cost": breakdown["material_cost"],
+        "labor_cost": breakdown["labor_cost"],
+        "sanding_cost": breakdown["sanding_cost"],
+        "total_cost": breakdown["total_cost"],
+        "customer_provides_wood": job.customer_provides_wood,
+        "sanding_cost_per_sqft": job.sanding_cost_per_sqft,
+        "material_cost_per_sqft": job.material_cost_per_sqft,
+    }
+
+
+def room_rows(job_id: str, job: FlooringJob, labor_cost: float) -> List[dict]:
+    usable_total = job.get_total_floor_space()
+    rows = []
+    areas = [(room.name, room.location, 1, room.total_area_sqft, room.get_usable_area()) for room in job.rooms]
+    areas += [(p.prototype.name, p.location, p.count, p.get_total_area(), p.get_usable_area()) for p in job.units]
+    for name, location, copies, total_area, usable in areas:
+        costs = share_costs(job, usable, usable / usable_total if usable_total else 0.0, labor_cost)
+        rows.append({
+            "job": job_id,
+            "room": name,
+            "location": location,
+            "copies": copies,
+            "total_area_sqft": total_area,
+            "obstacle_sqft": total_area - usable,
+            "usable_sqft": usable,
+            "material_cost": costs["material"],
+            "labor_cost": costs["labor"],
+            "sanding_cost": costs["sanding"],
+            "total_cost": costs["total"],
+        })
+    return rows
+
+
+def _default_format() -> str:
+    try:
+        import pyarrow  # noqa: F401
+        return "parquet"
+    except ImportError:
+        return "npz"
+
+
+class ColumnarWriter:
+    """Buffers rows column by column and writes one chunk at a time"""
+
+    def __init__(self, path: str, columns: Dict[str, str], fmt: str, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        self.path = path
+        self.columns = columns
+        self.fmt = fmt
+        self.chunk_rows = chunk_rows
+        self.buffer: Dict[str, list] = {name: [] for name in columns}
+        self.rows_written = 0
+        self.chunks_written = 0
+        self._parquet = None
+
+        if fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            types = {"str": pa.string(), "float": pa.float64(), "int": pa.int64(), "bool": pa.bool_()}
+            self._schema = pa.schema([(name, types[kind]) for name, kind in columns.items()])
+            self._parquet = pq.ParquetWriter(path, self._schema, compression="zstd")
+        elif fmt == "npz":
+            import numpy  # noqa: F401  (fail early rather than at the first flush)
+            os.makedirs(path, exist_ok=True)
+        else:
+            raise ValueError(f"Unknown export format '{fmt}'")
+
+    def write(self, row: dict):
+        for name in self.columns:
+            self.buffer[name].append(row[name])
+        if len(self.buffer["job"]) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        count = len(self.buffer["job"])
+        if not count:
+            return
+        if self.fmt == "parquet":
+            import pyarrow as pa
+            self._parquet.write_table(pa.Table.from_pydict(self.buffer, schema=self._schema))
+        else:
+            import numpy as np
+            dtypes = {"str": str, "float": np.float64, "int": np.int64, "bool": np.bool_}
+            arrays = {name: np.asarray(values, dtype=dtypes[self.columns[name]])
+                      for name, values in self.buffer.items()}
+            chunk_path = os.path.join(self.path, f"part-{self.chunks_written:05d}.npz")
+            np.savez_compressed(chunk_path, **arrays)
+        self.rows_written += count
+        self.chunks_written += 1
+        self.buffer = {name: [] for name in self.columns}
+
+    def close(self):
+        self.flush()
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def export_jobs(jobs: Iterable[Tuple[str, FlooringJob]], out_dir: str,
+                fmt: Optional[str] = None, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Tuple[int, int]:
+    """
+    Price (job id, job) pairs and write jobs and rooms tables into out_dir.
+    Returns (jobs written, rooms written).
+    """
+    fmt = fmt or _default_format()
+    os.makedirs(out_dir, exist_ok=True)
+    suffix = ".parquet" if fmt == "parquet" else ""
+    job_writer = ColumnarWriter(os.path.join(out_dir, "jobs" + suffix), JOB_COLUMNS, fmt, chunk_rows)
+    room_writer = ColumnarWriter(os.path.join(out_dir, "rooms" + suffix), ROOM_COLUMNS, fmt, chunk_rows)
+    try:
+        for job_id, job in jobs:
+            row = job_row(job_id, job)
+            job_writer.write(row)
+            for room in room_rows(job_id, job, row["labor_cost"]):
+                room_writer.write(room)
+    finally:
+        job_writer.close()
+        room_writer.close()
+    return job_writer.rows_written, room_writer.rows_written
+
+
+def read_columns(path: str, columns: Optional[List[str]] = None) -> dict:
+    """
+    Load columns from an exported table (jobs.parquet / rooms.parquet or a
+    jobs / rooms chunk folder) as NumPy arrays. Columns not asked for are
+    never decompressed.
+    """
+    import numpy as np
+
+    if os.path.isdir(path):
+        parts = sorted(glob.glob(os.path.join(path, "part-*.npz")))
+        chunks: Dict[str, list] = {}
+        for part in parts:
+            with np.load(part) as data:
+                for name in columns or data.files:
+                    chunks.setdefault(name, []).append(data[name])
+        return {name: np.concatenate(arrays) for name, arrays in chunks.items()}
+
+    import pyarrow.parquet as pq
+    table = pq.read_table(path, columns=columns)
+    return {name: table.column(name).to_numpy() for name in table.column_names}
+
+
+def iter_job_files(paths: List[str]) -> Iterable[Tuple[str, FlooringJob]]:
+    """(file name, job) for every job file in the given files/folders"""
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(glob.glob(os.path.join(path, "**", "*" + JOB_FILE_EXTENSION), recursive=True))
+        else:
+            files = [path]
+        for file_path in files:
+            try:
+                yield os.path.relpath(file_path), load_job(file_path)
+            except (OSError, ValueError) as e:
+                print(f"   Skipped {file_path}: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export priced jobs to columnar per-job and per-room tables")
+    parser.add_argument("paths", nargs="+", help="job files or folders of job files")
+    parser.add_argument("--out", default="priced_export", help="output folder (default priced_export)")
+    parser.add_argument("--format", choices=["parquet", "npz"], help="default: parquet if pyarrow is installed")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="rows per written chunk")
+    args = parser.parse_args()
+
+    try:
+        job_count, room_count = export_jobs(iter_job_files(args.paths), args.out, args.format, args.chunk_rows)
+    except ImportError as e:
+        print(f"\n{e.name or 'A required package'} not installed. "
+              "Install with: pip install pyarrow (or pip install numpy for the .npz format)")
+        sys.exit(1)
+    print(f"\nExported {job_count} jobs and {room_count} rooms to {args.out}")
@@ -5,11 +5,43 @@ Desktop application using Tkinter
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-from main import FlooringJob, Room, Obstacle, Employee
+from tkinter import ttk, messagebox, filedialog, simpledialog
+from main import (FlooringJob, Room, Employee, UnitPrototype, UnitPlacement, JOB_FILE_EXTENSION,
+                  save_job, load_job)
+from history import PersistentList, JobState
+from room_grid import RoomGrid
+from workspace import Workspace, JobWorkspace
+from schedule_import import read_room_schedule
+from blueprint_text import extract_room_candidates, format_candidate
+from blueprint_search import load_index
+from blueprint_mode import render_pdf_page
+from watch_folder import RenderCache
+from catalogue import load_catalogue, load_default_catalogue
+from roster import Roster
+from pricing_rules import load_default_rules, input_label
+from measure import PageGeometry, SnapIndex, Trace, load_page_geometry, polygon_area, distance
+from dimensions import parse_length
+from quote_diff import diff_jobs, format_diff
+from latency import LatencyMonitor
+from hierarchy import node_costs, parse_location, format_location
+from journal import JournalWriter, JobJournal, find_unsaved, replay, remove_journal
+from dataclasses import replace
+from types import MappingProxyType
 from typing import List, Optional
 import os
-import io
+import threading
+import time
+
+
+# Methods also called directly from other handlers, timed on their own
+INSTRUMENTED_METHODS = ["update_cost_summary", "update_rooms_list", "update_employees_list",
+                        "display_blueprint_window", "activate_job", "commit_edit"]
+
+# How close (in screen pixels) a click must be to a drawing corner to snap to it
+SNAP_PIXELS = 10
+
+# How often (ms) to look for finished jobs recorded by another window
+FINISHED_JOBS_POLL_MS = 5000
 
 
 class FlooringCalculatorGUI:
@@ -18,16 +50,64 @@ class FlooringCalculatorGUI:
         self.root.title("Flooring Cost Calculator")
         self.root.geometry("1000x700")
         
-        # Initialize job data
-        self.job = FlooringJob()
+        # Open jobs; self.job/self.history always point at the active tab's
+        self.workspace = Workspace()
+        self.job = None
+        self.history = None
         self.blueprint_path = None
         self.blueprint_window = None
+        self.blueprint_scales = {}  # blueprint path -> feet per page unit
+        self.blueprint_indexes = {}  # blueprint path -> BlueprintIndex of its text
+        self.render_cache = RenderCache()  # previews from the watch-folder service
+        self.render_lookups = set()  # blueprint paths being hashed in the background
+        self._closing_tab = False
+        
+        # Material price catalogue (optional; materials.csv next to the program)
+        self.catalogue = load_default_catalogue()
+        self.material_matches = []
+        
+        # Saved employees and crew presets (shared with the terminal versions)
+        self.roster = Roster()
+        
+        # Surcharges/discounts (optional; pricing_rules.json next to the program)
+        self.pricing_rules = load_default_rules()
+        
+        # Days required suggested from finished jobs (needs NumPy; none without it)
+        try:
+            from days_predictor import DaysPredictor
+            self.days_predictor = DaysPredictor()
+        except ImportError:
+            self.days_predictor = None
+        self.days_suggestion = None
+        
+        # Event-loop lag and handler timings; installed before any widget
+        # exists so that every button/key callback is timed
+        self.latency = LatencyMonitor(root)
+        self.latency.install()
+        self.latency.instrument(self, INSTRUMENTED_METHODS)
+        
+        # Every edit is journaled in the background for crash recovery
+        self.journal_writer = JournalWriter()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # Create main layout
         self.create_widgets()
         
-        # Update display
-        self.update_cost_summary()
+        # Typing in a job field changes the active job, so its cached summary is stale
+        for var in (self.days_var, self.sanding_var, self.material_source_var,
+                    self.material_cost_var, self.pickup_fee_var):
+            var.trace_add("write", lambda *args: self.field_changed())
+        
+        self.root.bind_all('<Control-z>', lambda e: self.undo())
+        self.root.bind_all('<Control-y>', lambda e: self.redo())
+        
+        # Reopen jobs a crash left unsaved, else start with one empty job
+        # (this also updates the display)
+        if not self.recover_unsaved_jobs():
+            self.new_job_tab()
+        
+        if self.days_predictor is not None:
+            self.root.after(FINISHED_JOBS_POLL_MS, self.poll_finished_jobs)
     
     def create_widgets(self):
         """Create all UI widgets"""
@@ -37,6 +117,22 @@ class FlooringCalculatorGUI:
         menu_frame.columnconfigure(0, weight=1)
         
         ttk.Button(menu_frame, text="Load Blueprint", command=self.load_blueprint).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(menu_frame, text="Compare", command=self.compare_quotes_window).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(menu_frame, text="Subtotals", command=self.subtotals_window).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(menu_frame, text="Responsiveness", command=self.show_responsiveness_window).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(menu_frame, text="Close Job", command=self.close_job_tab).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(menu_frame, text="Save Job", command=self.save_job_file).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(menu_frame, text="Open Job", command=self.open_job_file).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(menu_frame, text="New Job", command=self.new_job_tab).pack(side=tk.RIGHT, padx=5)
+        self.undo_button = ttk.Button(menu_frame, text="Undo", command=self.undo, state="disabled")
+        self.undo_button.pack(side=tk.LEFT, padx=5)
+        self.redo_button = ttk.Button(menu_frame, text="Redo", command=self.redo, state="disabled")
+        self.redo_button.pack(side=tk.LEFT, padx=5)
+        
+        # Job tabs: each tab page is an empty frame, all tabs share the panels below
+        self.notebook = ttk.Notebook(menu_frame)
+        self.notebook.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=10)
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_job_tab_changed)
         
         # Main container
         main_frame = ttk.Frame(self.root, padding="10")
@@ -63,25 +159,23 @@ class FlooringCalculatorGUI:
         frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=5, pady=5)
         frame.columnconfigure(0, weight=1)
         
-        # Room list
-        list_frame = ttk.Frame(frame)
-        list_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
-        list_frame.columnconfigure(0, weight=1)
+        frame.rowconfigure(0, weight=1)
         
-        scrollbar = ttk.Scrollbar(list_frame)
-        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        
-        self.rooms_listbox = tk.Listbox(list_frame, height=8, yscrollcommand=scrollbar.set)
-        self.rooms_listbox.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        scrollbar.config(command=self.rooms_listbox.yview)
+        # Room grid: rooms and obstacles are typed straight into the cells
+        self.room_grid = RoomGrid(frame, self.commit_edit, lambda index: self.unit_dialog(unit_index=index),
+                                  self.remove_units)
+        self.room_grid.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
         
         # Buttons
         btn_frame = ttk.Frame(frame)
         btn_frame.grid(row=1, column=0, pady=5)
         
-        ttk.Button(btn_frame, text="Add Room", command=self.add_room_dialog).pack(side=tk.LEFT, padx=2)
-        ttk.Button(btn_frame, text="Edit Room", command=self.edit_room_dialog).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Add Room", command=self.room_grid.start_new_room).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Add Obstacle", command=self.room_grid.start_new_obstacle).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Edit Room", command=self.edit_room).pack(side=tk.LEFT, padx=2)
         ttk.Button(btn_frame, text="Remove Room", command=self.remove_room).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Import Schedule", command=self.import_schedule).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Repeat as Unit", command=self.repeat_as_unit).pack(side=tk.LEFT, padx=2)
     
     def create_employees_panel(self, parent):
         """Create employees input panel"""
@@ -108,6 +202,7 @@ class FlooringCalculatorGUI:
         ttk.Button(btn_frame, text="Add Employee", command=self.add_employee_dialog).pack(side=tk.LEFT, padx=2)
         ttk.Button(btn_frame, text="Edit Employee", command=self.edit_employee_dialog).pack(side=tk.LEFT, padx=2)
         ttk.Button(btn_frame, text="Remove Employee", command=self.remove_employee).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Save Crew", command=self.save_crew_preset).pack(side=tk.LEFT, padx=2)
     
     def create_job_details_panel(self, parent):
         """Create job details input panel"""
@@ -118,9 +213,15 @@ class FlooringCalculatorGUI:
         # Days required
         ttk.Label(frame, text="Days Required:").grid(row=0, column=0, sticky=tk.W, pady=5)
         self.days_var = tk.StringVar(value="0")
-        days_entry = ttk.Entry(frame, textvariable=self.days_var, width=10)
-        days_entry.grid(row=0, column=1, sticky=tk.W, pady=5, padx=5)
+        days_frame = ttk.Frame(frame)
+        days_frame.grid(row=0, column=1, sticky=tk.W, pady=5, padx=5)
+        days_entry = ttk.Entry(days_frame, textvariable=self.days_var, width=10)
+        days_entry.pack(side=tk.LEFT)
         days_entry.bind('<KeyRelease>', lambda e: self.update_cost_summary())
+        # Suggestion from finished jobs, updated as rooms and crew change
+        self.use_days_button = ttk.Button(days_frame, text="Use", width=5, command=self.use_suggested_days)
+        self.days_suggestion_label = ttk.Label(days_frame, text="", font=("", 9))
+        self.days_suggestion_label.pack(side=tk.LEFT, padx=5)
         
         # Sanding cost per sq ft
         ttk.Label(frame, text="Sanding Cost ($/sq ft):").grid(row=1, column=0, sticky=tk.W, pady=5)
@@ -156,6 +257,36 @@ class FlooringCalculatorGUI:
         self.pickup_fee_entry.grid(row=4, column=1, sticky=tk.W, pady=5, padx=5)
         self.pickup_fee_entry.bind('<KeyRelease>', lambda e: self.update_cost_summary())
         
+        # Material catalogue search (fills in the cost per sq ft)
+        ttk.Label(frame, text="Material Search:").grid(row=5, column=0, sticky=tk.W, pady=5)
+        search_frame = ttk.Frame(frame)
+        search_frame.grid(row=5, column=1, sticky=tk.W, pady=5, padx=5)
+        self.material_search_var = tk.StringVar()
+        self.material_search_entry = ttk.Entry(search_frame, textvariable=self.material_search_var, width=30)
+        self.material_search_entry.pack(side=tk.LEFT)
+        ttk.Button(search_frame, text="Load Catalogue", command=self.load_catalogue_file).pack(side=tk.LEFT, padx=5)
+        
+        self.material_suggestions = tk.Listbox(frame, height=6)
+        self.material_suggestions.grid(row=6, column=1, sticky=(tk.W, tk.E), padx=5)
+        self.material_suggestions.grid_remove()
+        
+        self.material_search_entry.bind('<KeyRelease>', self.update_material_suggestions)
+        self.material_search_entry.bind('<Down>', self.focus_material_suggestions)
+        self.material_search_entry.bind('<Return>', lambda e: self.choose_material(0))
+        self.material_search_entry.bind('<Escape>', lambda e: self.material_suggestions.grid_remove())
+        self.material_suggestions.bind('<Return>', lambda e: self.choose_material(self.selected_suggestion()))
+        self.material_suggestions.bind('<Double-Button-1>', lambda e: self.choose_material(self.selected_suggestion()))
+        self.material_suggestions.bind('<Escape>', lambda e: self.material_suggestions.grid_remove())
+        
+        # Job type (install, refinish, ...): finished jobs of the same type shape the days suggestion
+        ttk.Label(frame, text="Job Type:").grid(row=7, column=0, sticky=tk.W, pady=5)
+        self.job_type_var = tk.StringVar()
+        self.job_type_combo = ttk.Combobox(frame, textvariable=self.job_type_var, width=20,
+                                           values=self.days_predictor.job_types() if self.days_predictor else [])
+        self.job_type_combo.grid(row=7, column=1, sticky=tk.W, pady=5, padx=5)
+        self.job_type_combo.bind('<<ComboboxSelected>>', lambda e: self.set_job_type())
+        self.job_type_combo.bind('<KeyRelease>', lambda e: self.set_job_type())
+        
         # Initialize material fields state
         self.toggle_material_fields()
     
@@ -198,270 +329,327 @@ class FlooringCalculatorGUI:
         self.total_cost_label = ttk.Label(display_frame, text="$0.00", font=("", 14, "bold"))
         self.total_cost_label.grid(row=5, column=1, sticky=tk.W, padx=10, pady=3)
         
+        # Pricing rule adjustments and the quoted price (only with a rules file)
+        self.rules_label = ttk.Label(display_frame, text="", font=("", 9), justify=tk.LEFT)
+        self.quoted_caption = ttk.Label(display_frame, text="QUOTED PRICE:", font=("", 12, "bold"))
+        self.quoted_price_label = ttk.Label(display_frame, text="$0.00", font=("", 14, "bold"))
+        if self.pricing_rules:
+            self.rules_label.grid(row=6, column=0, columnspan=2, sticky=tk.W, pady=3)
+            self.quoted_caption.grid(row=7, column=0, sticky=tk.W, pady=3)
+            self.quoted_price_label.grid(row=7, column=1, sticky=tk.W, padx=10, pady=3)
+        
         # Action buttons
         btn_frame = ttk.Frame(frame)
         btn_frame.grid(row=1, column=0, columnspan=2, pady=10)
         
         ttk.Button(btn_frame, text="Calculate", command=self.calculate_costs).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Risk Range", command=self.show_risk_window).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Record Actuals", command=self.record_actuals_dialog).pack(side=tk.LEFT, padx=5)
+        if self.pricing_rules and self.pricing_rules.inputs:
+            ttk.Button(btn_frame, text="Rule Details", command=self.rule_details_dialog).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Clear All", command=self.clear_all).pack(side=tk.LEFT, padx=5)
     
+    def rule_details_dialog(self):
+        """Edit the job extras the pricing rules use (stair treads, pattern, ...)"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Rule Details")
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        variables = {}
+        for row, (name, kind) in enumerate(self.pricing_rules.inputs.items()):
+            ttk.Label(dialog, text=f"{input_label(name)}:").grid(row=row, column=0, sticky=tk.W, padx=10, pady=5)
+            value = self.job.extras.get(name, "" if kind == "text" else 0)
+            variables[name] = tk.StringVar(value=str(value))
+            ttk.Entry(dialog, textvariable=variables[name], width=20).grid(row=row, column=1, padx=10, pady=5)
+        
+        def save_details():
+            extras = dict(self.job.extras)
+            for name, kind in self.pricing_rules.inputs.items():
+                text = variables[name].get().strip()
+                if kind == "text":
+                    extras[name] = text
+                    continue
+                try:
+                    extras[name] = float(text) if text else 0.0
+                except ValueError:
+                    messagebox.showerror("Error", f"{input_label(name)} must be a number.", parent=dialog)
+                    return
+            dialog.destroy()
+            if extras != self.job.extras:
+                self.commit_edit("Edit rule details", extras=extras)
+        
+        btn_frame = ttk.Frame(dialog)
+        btn_frame.grid(row=len(variables), column=0, columnspan=2, pady=15)
+        ttk.Button(btn_frame, text="Save", command=save_details).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Cancel", command=dialog.destroy).pack(side=tk.LEFT, padx=5)
+    
     def toggle_material_fields(self):
         """Enable/disable material cost fields based on source"""
         if self.material_source_var.get() == "customer":
             self.material_cost_entry.config(state="disabled")
             self.pickup_fee_entry.config(state="disabled")
+            self.material_search_entry.config(state="disabled")
+            self.material_suggestions.grid_remove()
         else:
             self.material_cost_entry.config(state="normal")
             self.pickup_fee_entry.config(state="normal")
+            self.material_search_entry.config(state="normal")
         self.update_cost_summary()
     
-    def add_room_dialog(self):
-        """Open dialog to add a new room"""
+    def load_catalogue_file(self):
+        """Load a material price list (CSV) for the material search"""
+        filepath = filedialog.askopenfilename(
+            title="Select Material Price List",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if not filepath:
+            return
+        try:
+            self.catalogue = load_catalogue(filepath)
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            messagebox.showerror("Error", f"Could not load price list: {e}")
+            return
+        messagebox.showinfo("Catalogue Loaded", f"{len(self.catalogue)} materials loaded.")
+    
+    def update_material_suggestions(self, event=None):
+        """Refresh the autocomplete list as the user types"""
+        if event is not None and event.keysym in ('Down', 'Up', 'Return', 'Escape', 'Tab'):
+            return
+        query = self.material_search_var.get()
+        self.material_matches = self.catalogue.search(query) if self.catalogue and query.strip() else []
+        
+        self.material_suggestions.delete(0, tk.END)
+        if not self.material_matches:
+            self.material_suggestions.grid_remove()
+            return
+        self.material_suggestions.insert(tk.END, *(item.describe() for item in self.material_matches))
+        self.material_suggestions.grid()
+    
+    def focus_material_suggestions(self, event=None):
+        """Move from the search box into the suggestion list"""
+        if self.material_matches:
+            self.material_suggestions.focus_set()
+            self.material_suggestions.selection_clear(0, tk.END)
+            self.material_suggestions.selection_set(0)
+            self.material_suggestions.activate(0)
+    
+    def selected_suggestion(self) -> int:
+        selection = self.material_suggestions.curselection()
+        return selection[0] if selection else 0
+    
+    def choose_material(self, index: int):
+        """Use a catalogue item's price as the material cost"""
+        if not 0 <= index < len(self.material_matches):
+            return
+        item = self.material_matches[index]
+        self.material_search_var.set(item.label)
+        self.material_cost_var.set(f"{item.cost_per_sqft:.2f}")
+        self.material_suggestions.grid_remove()
+        self.material_cost_entry.focus_set()
+        self.update_cost_summary()
+    
+    def edit_room(self):
+        """Edit the selected room in place (or the selected unit placement)"""
+        unit_index = self.room_grid.selected_unit()
+        if unit_index is not None:
+            self.unit_dialog(unit_index=unit_index)
+            return
+        item = self.room_grid.tree.focus()
+        if not item:
+            messagebox.showinfo("Info", "Please select a room to edit.")
+            return
+        self.room_grid.edit(item, "#0")
+    
+    def remove_room(self):
+        """Remove the selected rooms/obstacles (or unit placement)"""
+        unit_index = self.room_grid.selected_unit()
+        if unit_index is not None:
+            self.remove_units(unit_index)
+            return
+        if not self.room_grid.tree.selection():
+            messagebox.showinfo("Info", "Please select a room to remove.")
+            return
+        self.room_grid.remove_selected()
+    
+    def remove_units(self, unit_index: int):
+        """Remove one unit placement (all of its copies)"""
+        placement = self.job.units[unit_index]
+        if messagebox.askyesno("Confirm", f"Remove all {placement.count} × {placement.prototype.name}?"):
+            units = tuple(p for p in self.job.units if p is not placement)
+            self.commit_edit(f"Remove {placement.prototype.name} units", units=units)
+    
+    def repeat_as_unit(self):
+        """Turn the selected rooms into a unit plan placed many times"""
+        selection = self.room_grid.selected_rooms()
+        if not selection:
+            messagebox.showinfo("Info", "Select the rooms of one unit (Ctrl/Shift-click), then Repeat as Unit.")
+            return
+        self.unit_dialog(room_indices=selection)
+    
+    def unit_dialog(self, room_indices: Optional[List[int]] = None, unit_index: Optional[int] = None):
+        """Place a new unit plan (from rooms) or change an existing placement"""
+        existing = self.job.units[unit_index] if unit_index is not None else None
+        
         dialog = tk.Toplevel(self.root)
-        dialog.title("Add Room")
-        dialog.geometry("450x450")
+        dialog.title("Edit Units" if existing else "Repeat as Unit")
+        dialog.geometry("400x200")
         dialog.transient(self.root)
         dialog.grab_set()
         
-        # Room name
-        ttk.Label(dialog, text="Room Name:").grid(row=0, column=0, sticky=tk.W, padx=10, pady=10)
-        name_var = tk.StringVar()
-        ttk.Entry(dialog, textvariable=name_var, width=30).grid(row=0, column=1, padx=10, pady=10)
-        
-        # Area input method
-        ttk.Label(dialog, text="Enter Area:").grid(row=1, column=0, sticky=tk.W, padx=10, pady=10)
-        method_var = tk.StringVar(value="total")
-        method_frame = ttk.Frame(dialog)
-        method_frame.grid(row=1, column=1, padx=10, pady=10)
-        
-        ttk.Radiobutton(method_frame, text="Length × Width", variable=method_var, value="lengthwidth").pack(side=tk.LEFT)
-        ttk.Radiobutton(method_frame, text="Total sq ft", variable=method_var, value="total").pack(side=tk.LEFT)
-        
-        # Length and Width fields
-        length_var = tk.StringVar()
-        width_var = tk.StringVar()
-        total_var = tk.StringVar()
-        
-        length_frame = ttk.Frame(dialog)
-        length_frame.grid(row=2, column=0, columnspan=2, padx=10, pady=5)
-        
-        ttk.Label(length_frame, text="Length (ft):").pack(side=tk.LEFT, padx=5)
-        length_entry = ttk.Entry(length_frame, textvariable=length_var, width=10)
-        length_entry.pack(side=tk.LEFT, padx=5)
-        
-        ttk.Label(length_frame, text="Width (ft):").pack(side=tk.LEFT, padx=5)
-        width_entry = ttk.Entry(length_frame, textvariable=width_var, width=10)
-        width_entry.pack(side=tk.LEFT, padx=5)
-        
-        total_frame = ttk.Frame(dialog)
-        total_frame.grid(row=3, column=0, columnspan=2, padx=10, pady=5)
-        
-        ttk.Label(total_frame, text="Total Area (sq ft):").pack(side=tk.LEFT, padx=5)
-        total_entry = ttk.Entry(total_frame, textvariable=total_var, width=10)
-        total_entry.pack(side=tk.LEFT, padx=5)
-        
-        # Obstacles
-        ttk.Label(dialog, text="Obstacles:").grid(row=4, column=0, sticky=tk.W, padx=10, pady=10)
-        obstacles = []
-        
-        obstacle_list_frame = ttk.Frame(dialog)
-        obstacle_list_frame.grid(row=5, column=0, columnspan=2, padx=10, pady=5)
-        
-        obstacle_list = tk.Listbox(obstacle_list_frame, height=4, width=40)
-        obstacle_list.pack(side=tk.LEFT)
+        name_var = tk.StringVar(value=existing.prototype.name if existing else "Type A")
+        count_var = tk.StringVar(value=str(existing.count) if existing else "")
+        location_var = tk.StringVar(value=existing.location if existing else "")
+        for row, (label, var) in enumerate([("Unit plan name:", name_var), ("Number of copies:", count_var),
+                                            ("Location:", location_var)]):
+            ttk.Label(dialog, text=label).grid(row=row, column=0, sticky=tk.W, padx=10, pady=8)
+            ttk.Entry(dialog, textvariable=var, width=25).grid(row=row, column=1, padx=10, pady=8)
         
-        obstacle_scroll = ttk.Scrollbar(obstacle_list_frame, orient=tk.VERTICAL)
-        obstacle_scroll.pack(side=tk.RIGHT, fill=tk.Y)
-        obstacle_list.config(yscrollcommand=obstacle_scroll.set)
-        obstacle_scroll.config(command=obstacle_list.yview)
-        
-        def add_obstacle():
-            obstacle_dialog = tk.Toplevel(dialog)
-            obstacle_dialog.title("Add Obstacle")
-            obstacle_dialog.geometry("400x280")
-            obstacle_dialog.transient(dialog)
-            obstacle_dialog.grab_set()
-            
-            # Obstacle name
-            ttk.Label(obstacle_dialog, text="Obstacle Name:").grid(row=0, column=0, sticky=tk.W, padx=10, pady=10)
-            obs_name_var = tk.StringVar()
-            ttk.Entry(obstacle_dialog, textvariable=obs_name_var, width=25).grid(row=0, column=1, padx=10, pady=10)
-            
-            # Area input method
-            ttk.Label(obstacle_dialog, text="Enter Area:").grid(row=1, column=0, sticky=tk.W, padx=10, pady=10)
-            obs_method_var = tk.StringVar(value="total")
-            obs_method_frame = ttk.Frame(obstacle_dialog)
-            obs_method_frame.grid(row=1, column=1, padx=10, pady=10)
-            
-            ttk.Radiobutton(obs_method_frame, text="Length × Width", variable=obs_method_var, value="lengthwidth").pack(side=tk.LEFT, padx=5)
-            ttk.Radiobutton(obs_method_frame, text="Total sq ft", variable=obs_method_var, value="total").pack(side=tk.LEFT, padx=5)
-            
-            # Length and Width fields
-            obs_length_var = tk.StringVar()
-            obs_width_var = tk.StringVar()
-            obs_total_var = tk.StringVar()
-            
-            obs_length_frame = ttk.Frame(obstacle_dialog)
-            obs_length_frame.grid(row=2, column=0, columnspan=2, padx=10, pady=5)
-            
-            ttk.Label(obs_length_frame, text="Length (ft):").pack(side=tk.LEFT, padx=5)
-            obs_length_entry = ttk.Entry(obs_length_frame, textvariable=obs_length_var, width=10)
-            obs_length_entry.pack(side=tk.LEFT, padx=5)
-            
-            ttk.Label(obs_length_frame, text="Width (ft):").pack(side=tk.LEFT, padx=5)
-            obs_width_entry = ttk.Entry(obs_length_frame, textvariable=obs_width_var, width=10)
-            obs_width_entry.pack(side=tk.LEFT, padx=5)
-            
-            obs_total_frame = ttk.Frame(obstacle_dialog)
-            obs_total_frame.grid(row=3, column=0, columnspan=2, padx=10, pady=5)
-            
-            ttk.Label(obs_total_frame, text="Total Area (sq ft):").pack(side=tk.LEFT, padx=5)
-            obs_total_entry = ttk.Entry(obs_total_frame, textvariable=obs_total_var, width=10)
-            obs_total_entry.pack(side=tk.LEFT, padx=5)
-            
-            def toggle_obstacle_inputs():
-                if obs_method_var.get() == "lengthwidth":
-                    obs_length_entry.config(state="normal")
-                    obs_width_entry.config(state="normal")
-                    obs_total_entry.config(state="disabled")
-                else:
-                    obs_length_entry.config(state="disabled")
-                    obs_width_entry.config(state="disabled")
-                    obs_total_entry.config(state="normal")
-            
-            obs_method_var.trace('w', lambda *args: toggle_obstacle_inputs())
-            toggle_obstacle_inputs()
-            
-            def save_obstacle():
-                try:
-                    name = obs_name_var.get().strip()
-                    if not name:
-                        messagebox.showerror("Error", "Please enter an obstacle name.")
-                        return
-                    
-                    # Calculate area
-                    if obs_method_var.get() == "lengthwidth":
-                        length = float(obs_length_var.get())
-                        width = float(obs_width_var.get())
-                        area = length * width
-                    else:
-                        area = float(obs_total_var.get())
-                    
-                    if area >= 0:
-                        obstacles.append({"name": name, "area": area})
-                        obstacle_list.insert(tk.END, f"{name}: {area} sq ft")
-                        obstacle_dialog.destroy()
-                    else:
-                        messagebox.showerror("Error", "Area must be a positive number.")
-                except ValueError:
-                    messagebox.showerror("Error", "Please enter valid numbers for dimensions.")
-            
-            btn_frame = ttk.Frame(obstacle_dialog)
-            btn_frame.grid(row=4, column=0, columnspan=2, pady=15)
-            ttk.Button(btn_frame, text="Save", command=save_obstacle).pack(side=tk.LEFT, padx=5)
-            ttk.Button(btn_frame, text="Cancel", command=obstacle_dialog.destroy).pack(side=tk.LEFT, padx=5)
-        
-        obstacle_btn_frame = ttk.Frame(dialog)
-        obstacle_btn_frame.grid(row=6, column=0, columnspan=2, pady=5)
-        ttk.Button(obstacle_btn_frame, text="Add Obstacle", command=add_obstacle).pack(side=tk.LEFT, padx=5)
-        
-        def toggle_area_inputs():
-            if method_var.get() == "lengthwidth":
-                length_entry.config(state="normal")
-                width_entry.config(state="normal")
-                total_entry.config(state="disabled")
-            else:
-                length_entry.config(state="disabled")
-                width_entry.config(state="disabled")
-                total_entry.config(state="normal")
-        
-        method_var.trace('w', lambda *args: toggle_area_inputs())
-        toggle_area_inputs()
-        
-        def save_room():
+        def save_units():
+            name = name_var.get().strip()
             try:
-                name = name_var.get().strip()
-                if not name:
-                    messagebox.showerror("Error", "Please enter a room name.")
-                    return
-                
-                # Calculate total area
-                if method_var.get() == "lengthwidth":
-                    length = float(length_var.get())
-                    width = float(width_var.get())
-                    total_area = length * width
-                else:
-                    total_area = float(total_var.get())
-                
-                # Create room
-                room = Room(name, total_area)
-                for obs in obstacles:
-                    room.obstacles.append(Obstacle(obs["name"], obs["area"]))
-                
-                self.job.rooms.append(room)
-                self.update_rooms_list()
-                self.update_cost_summary()
-                dialog.destroy()
+                count = int(count_var.get())
+                if count < 1:
+                    raise ValueError
             except ValueError:
-                messagebox.showerror("Error", "Please enter valid numbers for dimensions.")
-        
-        room_btn_frame = ttk.Frame(dialog)
-        room_btn_frame.grid(row=7, column=0, columnspan=2, pady=20)
-        ttk.Button(room_btn_frame, text="Save", command=save_room).pack(side=tk.LEFT, padx=5)
-        ttk.Button(room_btn_frame, text="Cancel", command=dialog.destroy).pack(side=tk.LEFT, padx=5)
+                messagebox.showerror("Error", "Please enter a whole number of copies (1 or more).")
+                return
+            if not name:
+                messagebox.showerror("Error", "Please enter a unit plan name.")
+                return
+            location = format_location(parse_location(location_var.get()))
+            
+            if existing:
+                prototype = existing.prototype
+                if name != prototype.name:
+                    prototype = UnitPrototype(name, prototype.rooms)
+                # Fewer copies drops the overrides of the copies that went away
+                overrides = [o for o in existing.overrides if o.instance <= count]
+                placement = UnitPlacement(prototype, count, location, overrides)
+                units = tuple(placement if p is existing else p for p in self.job.units)
+                self.commit_edit(f"Edit {name} units", units=units)
+            else:
+                # The plan keeps the rooms; where they are comes from the placement
+                plan_rooms = [replace(self.job.rooms[i], location="") for i in room_indices]
+                rooms = self.job.rooms
+                for i in sorted(room_indices, reverse=True):
+                    rooms = rooms.delete(i)
+                placement = UnitPlacement(UnitPrototype(name, plan_rooms), count, location)
+                self.commit_edit(f"Repeat {name} × {count}", rooms=rooms,
+                                 units=tuple(self.job.units) + (placement,))
+            dialog.destroy()
+        
+        btn_frame = ttk.Frame(dialog)
+        btn_frame.grid(row=3, column=0, columnspan=2, pady=15)
+        ttk.Button(btn_frame, text="Save", command=save_units).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Cancel", command=dialog.destroy).pack(side=tk.LEFT, padx=5)
     
-    def edit_room_dialog(self):
-        """Edit selected room"""
-        selection = self.rooms_listbox.curselection()
-        if not selection:
-            messagebox.showinfo("Info", "Please select a room to edit.")
+    def import_schedule(self):
+        """Import rooms from a CSV room schedule"""
+        filepath = filedialog.askopenfilename(
+            title="Select Room Schedule",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if not filepath:
             return
         
-        index = selection[0]
-        room = self.job.rooms[index]
+        try:
+            rooms, errors = read_room_schedule(filepath)
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            messagebox.showerror("Error", f"Could not read schedule: {e}")
+            return
         
-        # For now, just remove and re-add (can be enhanced later)
-        self.job.rooms.pop(index)
-        self.update_rooms_list()
-        self.add_room_dialog()
-    
-    def remove_room(self):
-        """Remove selected room"""
-        selection = self.rooms_listbox.curselection()
-        if not selection:
-            messagebox.showinfo("Info", "Please select a room to remove.")
+        if errors:
+            shown = "\n".join(errors[:20])
+            if len(errors) > 20:
+                shown += f"\n... and {len(errors) - 20} more"
+            messagebox.showerror("Schedule Errors",
+                                 f"{len(errors)} problem(s) found, nothing imported:\n\n{shown}")
             return
         
-        if messagebox.askyesno("Confirm", "Remove this room?"):
-            index = selection[0]
-            self.job.rooms.pop(index)
-            self.update_rooms_list()
-            self.update_cost_summary()
+        # One O(n) rebuild and one undo step for the whole schedule
+        all_rooms = PersistentList(list(self.job.rooms) + rooms)
+        self.commit_edit(f"Import {len(rooms)} rooms", rooms=all_rooms)
+    
+    def save_roster(self):
+        try:
+            self.roster.save()
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not save roster:\n{e}")
+    
+    def save_crew_preset(self):
+        """Save this job's employees as a named crew preset"""
+        if not len(self.job.employees):
+            messagebox.showinfo("Info", "Add employees to the job first.")
+            return
+        crew_name = simpledialog.askstring("Save Crew", "Crew name:", parent=self.root)
+        if crew_name and crew_name.strip():
+            self.roster.save_crew(crew_name, list(self.job.employees))
+            self.save_roster()
     
     def add_employee_dialog(self):
         """Open dialog to add a new employee"""
         dialog = tk.Toplevel(self.root)
         dialog.title("Add Employee")
-        dialog.geometry("350x180")
+        dialog.geometry("420x220")
         dialog.transient(self.root)
         dialog.grab_set()
         
-        ttk.Label(dialog, text="Name:").grid(row=0, column=0, padx=10, pady=10)
+        # Whole crew in one pick
+        ttk.Label(dialog, text="Crew:").grid(row=0, column=0, padx=10, pady=10)
+        crew_var = tk.StringVar()
+        crew_combo = ttk.Combobox(dialog, textvariable=crew_var, values=sorted(self.roster.crews),
+                                  state="readonly", width=22)
+        crew_combo.grid(row=0, column=1, padx=10, pady=10)
+        
+        def add_crew(event=None):
+            crew = self.roster.crew(crew_var.get())
+            if crew:
+                employees = self.job.employees
+                for emp in crew:
+                    employees = employees.append(emp)
+                self.commit_edit(f"Add crew {crew_var.get()}", employees=employees)
+                dialog.destroy()
+        
+        crew_combo.bind('<<ComboboxSelected>>', add_crew)
+        if not self.roster.crews:
+            crew_combo.set("(no saved crews)")
+            crew_combo.config(state="disabled")
+        
+        # Single person; names autocomplete from the roster and fill in the rate
+        ttk.Label(dialog, text="Name:").grid(row=1, column=0, padx=10, pady=10)
         name_var = tk.StringVar()
-        ttk.Entry(dialog, textvariable=name_var, width=25).grid(row=0, column=1, padx=10, pady=10)
+        name_combo = ttk.Combobox(dialog, textvariable=name_var, values=self.roster.all_names(), width=22)
+        name_combo.grid(row=1, column=1, padx=10, pady=10)
         
-        ttk.Label(dialog, text="Hourly Rate ($):").grid(row=1, column=0, padx=10, pady=10)
+        ttk.Label(dialog, text="Hourly Rate ($):").grid(row=2, column=0, padx=10, pady=10)
         rate_var = tk.StringVar()
-        ttk.Entry(dialog, textvariable=rate_var, width=25).grid(row=1, column=1, padx=10, pady=10)
+        ttk.Entry(dialog, textvariable=rate_var, width=25).grid(row=2, column=1, padx=10, pady=10)
+        
+        def fill_rate(event=None):
+            known = self.roster.rate_for(name_var.get())
+            if known is not None:
+                rate_var.set(f"{known:.2f}")
+        
+        def filter_names(event=None):
+            if event is not None and event.keysym in ('Up', 'Down', 'Return', 'Tab'):
+                return
+            name_combo.config(values=self.roster.find(name_var.get()))
+            fill_rate()
+        
+        name_combo.bind('<<ComboboxSelected>>', fill_rate)
+        name_combo.bind('<KeyRelease>', filter_names)
+        name_combo.focus_set()
         
         def save_employee():
             try:
                 name = name_var.get().strip()
                 rate = float(rate_var.get())
                 if name and rate >= 0:
-                    self.job.employees.append(Employee(name, rate))
-                    self.update_employees_list()
-                    self.update_cost_summary()
+                    self.commit_edit(f"Add employee {name}",
+                                     employees=self.job.employees.append(Employee(name, rate)))
+                    self.roster.set_rate(name, rate)
+                    self.save_roster()
                     dialog.destroy()
                 else:
                     messagebox.showerror("Error", "Please enter valid name and rate.")
@@ -469,7 +657,7 @@ class FlooringCalculatorGUI:
                 messagebox.showerror("Error", "Please enter a valid number for hourly rate.")
         
         emp_btn_frame = ttk.Frame(dialog)
-        emp_btn_frame.grid(row=2, column=0, columnspan=2, pady=20)
+        emp_btn_frame.grid(row=3, column=0, columnspan=2, pady=20)
         ttk.Button(emp_btn_frame, text="Save", command=save_employee).pack(side=tk.LEFT, padx=5)
         ttk.Button(emp_btn_frame, text="Cancel", command=dialog.destroy).pack(side=tk.LEFT, padx=5)
     
@@ -502,10 +690,11 @@ class FlooringCalculatorGUI:
                 name = name_var.get().strip()
                 rate = float(rate_var.get())
                 if name and rate >= 0:
-                    self.job.employees[index].name = name
-                    self.job.employees[index].hourly_rate = rate
-                    self.update_employees_list()
-                    self.update_cost_summary()
+                    # Replace rather than mutate: older snapshots share this Employee
+                    self.commit_edit(f"Edit employee {name}",
+                                     employees=self.job.employees.set(index, Employee(name, rate)))
+                    self.roster.set_rate(name, rate)
+                    self.save_roster()
                     dialog.destroy()
                 else:
                     messagebox.showerror("Error", "Please enter valid name and rate.")
@@ -526,16 +715,398 @@ class FlooringCalculatorGUI:
         
         if messagebox.askyesno("Confirm", "Remove this employee?"):
             index = selection[0]
-            self.job.employees.pop(index)
-            self.update_employees_list()
-            self.update_cost_summary()
+            name = self.job.employees[index].name
+            self.commit_edit(f"Remove employee {name}", employees=self.job.employees.delete(index))
+    
+    def commit_edit(self, label: str, rooms: Optional[PersistentList] = None,
+                    employees: Optional[PersistentList] = None, units: Optional[tuple] = None,
+                    extras: Optional[dict] = None, coalesce: bool = False):
+        """Apply an edit to the room/employee/unit collections or the extras as one undo step"""
+        # Pull the latest job parameters from the entry fields so that
+        # parameter changes typed since the last edit are part of the snapshot
+        self.update_cost_summary()
+        self.history.current = JobState.from_job(self.job)
+        
+        state = self.history.current
+        if rooms is not None:
+            state = replace(state, rooms=rooms)
+        if employees is not None:
+            state = replace(state, employees=employees)
+        if units is not None:
+            state = replace(state, units=units)
+        if extras is not None:
+            state = replace(state, extras=MappingProxyType(dict(extras)))
+        
+        self.history.record(state, label, coalesce)
+        state.apply_to(self.job)
+        self.workspace.active.mark_changed()
+        self.update_rooms_list()
+        self.update_employees_list()
+        self.update_cost_summary()
+        self.update_history_buttons()
+    
+    def restore_state(self, state: JobState):
+        """Show a snapshot from the undo/redo history"""
+        state.apply_to(self.job)
+        self.workspace.active.mark_changed()
+        self.days_var.set(str(state.days_required))
+        self.sanding_var.set(f"{state.sanding_cost_per_sqft:.2f}")
+        self.material_source_var.set("customer" if state.customer_provides_wood else "company")
+        self.material_cost_var.set(f"{state.material_cost_per_sqft:.2f}")
+        self.pickup_fee_var.set(f"{state.pickup_fee:.2f}")
+        self.job_type_var.set(state.extras.get("job_type", ""))
+        self.update_rooms_list()
+        self.update_employees_list()
+        self.toggle_material_fields()
+        self.update_history_buttons()
+        self.update_cost_summary()  # also journals the restored state
+    
+    def field_changed(self):
+        """A job field was typed in or set: the active job's summary must be recomputed"""
+        if self.workspace.active is not None:
+            self.workspace.active.mark_changed()
+    
+    def journal_changes(self):
+        """Queue the active job's edits for the autosave journal (never waits on the disk)"""
+        self.workspace.active.journal.record(self.job)
+        if self.journal_writer.error:
+            error, self.journal_writer.error = self.journal_writer.error, None
+            messagebox.showwarning("Autosave", error)
+    
+    def recover_unsaved_jobs(self) -> bool:
+        """Offer to reopen jobs from a session that ended without closing; True if any were"""
+        paths = find_unsaved()
+        if not paths:
+            return False
+        recovered = 0
+        if messagebox.askyesno("Recover Jobs",
+                               f"{len(paths)} job(s) from the last session were not closed normally. "
+                               "Recover them?\n\n(No discards them.)"):
+            for path in paths:
+                try:
+                    job, name = replay(path)
+                except ValueError as e:
+                    messagebox.showerror("Error", f"Could not recover a job: {e}")
+                    continue
+                self.new_job_tab(job, f"{name} (recovered)")
+                recovered += 1
+        # Recovered jobs are journaled afresh under their new tabs
+        for path in paths:
+            remove_journal(path)
+        return recovered > 0
+    
+    def on_close(self):
+        """Normal exit: the journals are only needed after a crash"""
+        for ws in self.workspace.jobs:
+            ws.journal.discard()
+        self.journal_writer.close()
+        self.root.destroy()
+    
+    def undo(self):
+        """Undo the last room/employee edit"""
+        self.room_grid.cancel_edit()
+        state = self.history.undo()
+        if state is not None:
+            self.restore_state(state)
+    
+    def redo(self):
+        """Redo the last undone edit"""
+        self.room_grid.cancel_edit()
+        state = self.history.redo()
+        if state is not None:
+            self.restore_state(state)
+    
+    def update_history_buttons(self):
+        """Enable/disable Undo and Redo and show what they will do"""
+        undo_label = self.history.undo_label()
+        redo_label = self.history.redo_label()
+        self.undo_button.config(text=f"Undo {undo_label}" if undo_label else "Undo",
+                                state="normal" if undo_label else "disabled")
+        self.redo_button.config(text=f"Redo {redo_label}" if redo_label else "Redo",
+                                state="normal" if redo_label else "disabled")
+    
+    def new_job_tab(self, job: Optional[FlooringJob] = None, name: Optional[str] = None) -> JobWorkspace:
+        """Open a job in a new tab and switch to it"""
+        if self.workspace.active is not None:
+            self.save_active_job()
+        ws = self.workspace.new_job(job, name)
+        ws.journal = JobJournal(self.journal_writer, ws.job, ws.name)
+        self.notebook.add(ttk.Frame(self.notebook, height=1), text=ws.name)
+        self.activate_job(len(self.workspace.jobs) - 1)
+        return ws
+    
+    def close_job_tab(self):
+        """Close the active job tab"""
+        if not messagebox.askyesno("Confirm", f"Close {self.workspace.active.name}?"):
+            return
+        index = self.workspace.active_index
+        if len(self.workspace.jobs) == 1:
+            # Always keep one job open
+            self.new_job_tab()
+        
+        self._closing_tab = True
+        try:
+            self.workspace.close(index).journal.discard()
+            self.notebook.forget(index)
+            self.activate_job(self.workspace.active_index)
+        finally:
+            self._closing_tab = False
+    
+    def open_job_file(self):
+        """Open a saved job in a new tab"""
+        filepath = filedialog.askopenfilename(
+            title="Open Job",
+            filetypes=[("Job files", f"*{JOB_FILE_EXTENSION}"), ("All files", "*.*")]
+        )
+        if not filepath:
+            return
+        try:
+            job = load_job(filepath)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Could not open job: {e}")
+            return
+        name = os.path.basename(filepath)
+        if name.lower().endswith(JOB_FILE_EXTENSION):
+            name = name[:-len(JOB_FILE_EXTENSION)]
+        self.new_job_tab(job, name)
+    
+    def save_job_file(self):
+        """Save the active job to a file"""
+        filepath = filedialog.asksaveasfilename(
+            title="Save Job",
+            initialfile=f"{self.workspace.active.name}{JOB_FILE_EXTENSION}",
+            defaultextension=JOB_FILE_EXTENSION,
+            filetypes=[("Job files", f"*{JOB_FILE_EXTENSION}"), ("All files", "*.*")]
+        )
+        if not filepath:
+            return
+        self.update_cost_summary()
+        try:
+            save_job(self.job, filepath)
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not save job: {e}")
+            return
+        self.workspace.active.saved = JobState.from_job(self.job)
+    
+    def on_job_tab_changed(self, event=None):
+        """Swap the active job when the user picks another tab"""
+        if self._closing_tab or not self.notebook.tabs():
+            return
+        index = self.notebook.index(self.notebook.select())
+        if index != self.workspace.active_index:
+            self.save_active_job()
+            self.activate_job(index)
+    
+    def subtotals_window(self):
+        """Area and cost by building, floor and unit; follows edits as they happen"""
+        window = tk.Toplevel(self.root)
+        window.title("Subtotals")
+        window.geometry("620x480")
+        
+        top = ttk.Frame(window, padding="10")
+        top.pack(fill=tk.X)
+        ttk.Label(top, text="Show:").pack(side=tk.LEFT)
+        level_var = tk.StringVar(value="Everything")
+        ttk.Combobox(top, textvariable=level_var, values=["Everything", "Building", "Floor", "Unit"],
+                     state="readonly", width=12).pack(side=tk.LEFT, padx=5)
+        
+        columns = ("rooms", "area", "cost")
+        tree_view = ttk.Treeview(window, columns=columns)
+        tree_view.heading("#0", text="Location")
+        tree_view.heading("rooms", text="Rooms")
+        tree_view.heading("area", text="Usable sq ft")
+        tree_view.heading("cost", text="Cost")
+        for column in columns:
+            tree_view.column(column, anchor=tk.E, width=110)
+        tree_view.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        
+        shown = {"key": None}
+        
+        def refresh():
+            if not window.winfo_exists():
+                return
+            ws = self.workspace.active
+            key = (id(ws), ws.version, level_var.get())
+            if key != shown["key"]:
+                shown["key"] = key
+                # Only rooms changed since the last refresh are visited
+                tree = ws.location_tree()
+                usable = tree.root.usable_sqft
+                tree_view.delete(*tree_view.get_children())
+                
+                def row(node):
+                    costs = node_costs(node, self.job, usable)
+                    return (node.rooms, f"{node.usable_sqft:,.2f}", f"${costs['total']:,.2f}")
+                
+                if level_var.get() == "Everything":
+                    parents = {}
+                    for depth, node in tree.walk():
+                        parent = parents.get(id(node.parent), "")
+                        parents[id(node)] = tree_view.insert(parent, tk.END, text=node.name, values=row(node),
+                                                             open=depth < 2)
+                else:
+                    for node in tree.nodes_at(level_var.get().lower()):
+                        tree_view.insert("", tk.END, text=format_location(node.path), values=row(node))
+            window.after(500, refresh)
+        
+        refresh()
+    
+    def compare_quotes_window(self):
+        """Show what changed between an earlier quote (last saved version, open tab or job file) and this one"""
+        self.update_cost_summary()
+        active = self.workspace.active
+        others = [ws for ws in self.workspace.jobs if ws is not active]
+        
+        window = tk.Toplevel(self.root)
+        window.title(f"Compare with {active.name}")
+        window.geometry("640x480")
+        
+        top = ttk.Frame(window, padding="10")
+        top.pack(fill=tk.X)
+        ttk.Label(top, text="Earlier quote:").pack(side=tk.LEFT)
+        choice_var = tk.StringVar()
+        choice = ttk.Combobox(top, textvariable=choice_var, values=["Last saved version"] + [ws.name for ws in others],
+                              state="readonly", width=25)
+        choice.pack(side=tk.LEFT, padx=5)
+        
+        text = tk.Text(window, wrap=tk.NONE, font=("Courier", 10))
+        text.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        
+        def show(old_job: FlooringJob, old_usable: Optional[float] = None):
+            diff = diff_jobs(old_job, self.job, old_usable)
+            text.config(state="normal")
+            text.delete("1.0", tk.END)
+            text.insert(tk.END, "\n".join(format_diff(diff)))
+            text.config(state="disabled")
+        
+        def compare_tab(event=None):
+            if choice.current() == 0:
+                # Shares structure with this job, so only the edited rooms are looked at
+                saved = FlooringJob()
+                active.saved.apply_to(saved)
+                show(saved)
+                return
+            ws = others[choice.current() - 1]
+            # The tab's cached summary (if current) saves re-adding its rooms
+            show(ws.job, ws.cost_summary()["total_floor_space_sqft"])
+        
+        def compare_file():
+            path = filedialog.askopenfilename(
+                title="Select Earlier Quote",
+                filetypes=[("Job files", f"*{JOB_FILE_EXTENSION}"), ("All files", "*.*")],
+                parent=window
+            )
+            if not path:
+                return
+            try:
+                old_job = load_job(path)
+            except (OSError, ValueError) as e:
+                messagebox.showerror("Error", f"Could not open job file:\n{e}", parent=window)
+                return
+            choice_var.set(os.path.basename(path))
+            show(old_job)
+        
+        choice.bind('<<ComboboxSelected>>', compare_tab)
+        ttk.Button(top, text="From File...", command=compare_file).pack(side=tk.LEFT, padx=5)
+        choice.current(0)
+        compare_tab()
+    
+    def show_responsiveness_window(self):
+        """Rolling event-loop lag histogram, slowest handlers and recent stalls"""
+        window = tk.Toplevel(self.root)
+        window.title("Responsiveness")
+        window.geometry("620x560")
+        
+        summary_var = tk.StringVar()
+        ttk.Label(window, textvariable=summary_var, padding="10").pack(anchor=tk.W)
+        canvas = tk.Canvas(window, width=580, height=180, bg="white")
+        canvas.pack(padx=10)
+        text = tk.Text(window, height=16, wrap=tk.NONE, font=("Courier", 9))
+        text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        def refresh():
+            if not window.winfo_exists():
+                return
+            monitor = self.latency
+            summary_var.set(f"Event-loop lag over the last {len(monitor.lags)} heartbeats "
+                            f"(every {monitor.heartbeat_ms} ms): P50 {monitor.percentile(50):.0f} ms, "
+                            f"P99 {monitor.percentile(99):.0f} ms, max {max(monitor.lags, default=0):.0f} ms")
+            
+            canvas.delete("all")
+            buckets = monitor.histogram()
+            peak = max((count for _, count in buckets), default=0) or 1
+            bar_width = 580 / len(buckets)
+            for i, (label, count) in enumerate(buckets):
+                height = count / peak * 140
+                x0 = i * bar_width + 4
+                canvas.create_rectangle(x0, 155 - height, x0 + bar_width - 8, 155,
+                                        fill="#d9534f" if i >= 5 else "#4a90d9", outline="")
+                canvas.create_text(x0 + bar_width / 2 - 4, 168, text=label, font=("", 8))
+                canvas.create_text(x0 + bar_width / 2 - 4, 148 - height, text=str(count), font=("", 8))
+            
+            lines = [f"{'Handler':<40}{'calls':>7}{'mean ms':>9}{'max ms':>9}{'stalls':>7}"]
+            for name, stats in monitor.slowest_handlers():
+                lines.append(f"{name[:39]:<40}{stats.calls:>7}{stats.mean_ms:>9.1f}{stats.max_ms:>9.1f}{stats.stalls:>7}")
+            if monitor.stalls:
+                lines.append("")
+                lines.append(f"Recent stalls (over {monitor.stall_ms:.0f} ms):")
+                for when, what, ms in reversed(monitor.stalls):
+                    lines.append(f"  {time.strftime('%H:%M:%S', time.localtime(when))}  {ms:>6.0f} ms  {what}")
+            text.config(state="normal")
+            text.delete("1.0", tk.END)
+            text.insert(tk.END, "\n".join(lines))
+            text.config(state="disabled")
+            window.after(1000, refresh)
+        
+        refresh()
+    
+    def save_active_job(self):
+        """Park the active job: keep its model and field text, drop nothing else"""
+        ws = self.workspace.active
+        ws.fields = {
+            "days": self.days_var.get(),
+            "sanding": self.sanding_var.get(),
+            "material_source": self.material_source_var.get(),
+            "material_cost": self.material_cost_var.get(),
+            "pickup_fee": self.pickup_fee_var.get(),
+        }
+        ws.blueprint_path = self.blueprint_path
+        self.notebook.tab(self.workspace.active_index, text=ws.tab_title())
+    
+    def activate_job(self, index: int):
+        """Build the panels from the job at index"""
+        self.workspace.active_index = index
+        ws = self.workspace.active
+        self.job = ws.job
+        self.history = ws.history
+        self.blueprint_path = ws.blueprint_path
+        
+        self.days_var.set(ws.fields["days"])
+        self.sanding_var.set(ws.fields["sanding"])
+        self.material_source_var.set(ws.fields["material_source"])
+        self.material_cost_var.set(ws.fields["material_cost"])
+        self.pickup_fee_var.set(ws.fields["pickup_fee"])
+        self.job_type_var.set(self.job.extras.get("job_type", ""))
+        
+        self.notebook.tab(index, text=ws.name)
+        selected = self.notebook.select()
+        if not selected or self.notebook.index(selected) != index:
+            self.notebook.select(index)
+        
+        self.update_rooms_list()
+        self.update_employees_list()
+        self.toggle_material_fields()
+        self.update_history_buttons()
+    
+    def show_job(self, ws: JobWorkspace):
+        """Switch to ws's tab unless it is already the active one"""
+        if ws is not self.workspace.active:
+            self.save_active_job()
+            self.activate_job(self.workspace.jobs.index(ws))
     
     def update_rooms_list(self):
-        """Update rooms listbox display"""
-        self.rooms_listbox.delete(0, tk.END)
-        for room in self.job.rooms:
-            usable = room.get_usable_area()
-            self.rooms_listbox.insert(tk.END, f"{room.name}: {usable:.2f} sq ft")
+        """Update the room grid (only the rows of changed rooms are redrawn)"""
+        self.room_grid.refresh(self.job.rooms, self.job.units)
     
     def update_employees_list(self):
         """Update employees listbox display"""
@@ -545,47 +1116,242 @@ class FlooringCalculatorGUI:
     
     def update_cost_summary(self):
         """Update cost summary display"""
+        if self.job is None:
+            return  # widgets are still being created
+        
+        # Update job from UI inputs (a field that is not a number yet counts as 0)
         try:
-            # Update job from UI inputs
-            try:
-                self.job.days_required = int(self.days_var.get())
-            except ValueError:
-                self.job.days_required = 0
-            
-            try:
-                self.job.sanding_cost_per_sqft = float(self.sanding_var.get())
-            except ValueError:
-                self.job.sanding_cost_per_sqft = 0.0
-            
-            self.job.customer_provides_wood = (self.material_source_var.get() == "customer")
-            
+            self.job.days_required = int(self.days_var.get())
+        except ValueError:
+            self.job.days_required = 0
+        
+        try:
+            self.job.sanding_cost_per_sqft = float(self.sanding_var.get())
+        except ValueError:
+            self.job.sanding_cost_per_sqft = 0.0
+        
+        self.job.customer_provides_wood = (self.material_source_var.get() == "customer")
+        
+        try:
+            self.job.material_cost_per_sqft = float(self.material_cost_var.get())
+        except ValueError:
+            self.job.material_cost_per_sqft = 0.0
+        
+        try:
+            self.job.pickup_fee = float(self.pickup_fee_var.get())
+        except ValueError:
+            self.job.pickup_fee = 0.0
+        
+        # Calculate and display (recomputed only if the job changed since last time,
+        # and then only the rooms edited since are added up)
+        active = self.workspace.active
+        breakdown = active.cost_summary()
+        self.journal_changes()
+        
+        self.total_space_label.config(text=f"{breakdown['total_floor_space_sqft']:.2f} sq ft")
+        self.sanding_cost_label.config(text=f"${breakdown['sanding_cost']:,.2f}")
+        self.labor_cost_label.config(text=f"${breakdown['labor_cost']:,.2f}")
+        self.material_cost_label.config(text=f"${breakdown['material_cost']:,.2f}")
+        self.total_cost_label.config(text=f"${breakdown['total_cost']:,.2f}")
+        self.update_days_suggestion(breakdown['total_floor_space_sqft'], active.location_tree().root.rooms)
+        
+        if self.pricing_rules:
+            quote = self.pricing_rules.price(self.job, breakdown)
+            lines = [f"{name}: {'-' if amount < 0 else '+'}${abs(amount):,.2f}"
+                     for name, amount in quote.adjustments]
+            self.rules_label.config(text="\n".join(lines) or "No pricing rules apply")
+            self.quoted_price_label.config(text=f"${quote.total:,.2f}")
+    
+    def poll_finished_jobs(self):
+        """Pick up finished jobs another window recorded (on a timer, not on every keystroke)"""
+        if self.days_predictor.refresh() and self.job is not None:
+            self.update_cost_summary()
+        self.root.after(FINISHED_JOBS_POLL_MS, self.poll_finished_jobs)
+    
+    def update_days_suggestion(self, usable_sqft: float, rooms: int):
+        """Show the days suggested by finished jobs of this crew and type (a dot product per call)"""
+        if self.days_predictor is None:
+            return
+        suggestion = self.days_predictor.suggest(self.job, usable_sqft, rooms)
+        self.days_suggestion = suggestion
+        if suggestion is None:
+            self.days_suggestion_label.config(text="")
+            self.use_days_button.pack_forget()
+            return
+        self.days_suggestion_label.config(
+            text=f"suggested {suggestion.days} (from {suggestion.jobs} finished jobs, {suggestion.basis})")
+        if suggestion.days != self.job.days_required:
+            self.use_days_button.pack(side=tk.LEFT, before=self.days_suggestion_label)
+        else:
+            self.use_days_button.pack_forget()
+    
+    def use_suggested_days(self):
+        """Put the suggested days in the Days Required field"""
+        if self.days_suggestion is not None:
+            self.days_var.set(str(self.days_suggestion.days))
+            self.update_cost_summary()
+    
+    def set_job_type(self):
+        """Store the job type with the job (kept in the job file's extras)"""
+        kind = self.job_type_var.get().strip().lower()
+        extras = dict(self.job.extras)
+        if kind:
+            extras["job_type"] = kind
+        else:
+            extras.pop("job_type", None)
+        if extras != self.job.extras:
+            # Typing a type is one undo step, not one per keystroke
+            self.commit_edit("Set job type", extras=extras, coalesce=True)
+    
+    def record_actuals_dialog(self):
+        """Record how long the finished job took, so later suggestions learn from it"""
+        if self.days_predictor is None:
+            messagebox.showerror("Error", "NumPy not installed. Install with: pip install numpy")
+            return
+        if not (self.job.rooms or self.job.units) or not self.job.employees:
+            messagebox.showerror("Error", "The job needs rooms and employees first.")
+            return
+        from days_predictor import outcome_for
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Record Actuals")
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        ttk.Label(dialog, text=f"Estimated: {self.job.days_required} day(s) for a crew of "
+                               f"{len(self.job.employees)}").grid(row=0, column=0, columnspan=2, padx=10, pady=10)
+        ttk.Label(dialog, text="Actual days:").grid(row=1, column=0, sticky=tk.W, padx=10, pady=5)
+        days_var = tk.StringVar()
+        days_entry = ttk.Entry(dialog, textvariable=days_var, width=12)
+        days_entry.grid(row=1, column=1, sticky=tk.W, padx=10, pady=5)
+        ttk.Label(dialog, text="Crew hours (optional):").grid(row=2, column=0, sticky=tk.W, padx=10, pady=5)
+        hours_var = tk.StringVar()
+        ttk.Entry(dialog, textvariable=hours_var, width=12).grid(row=2, column=1, sticky=tk.W, padx=10, pady=5)
+        ttk.Label(dialog, text="Job type:").grid(row=3, column=0, sticky=tk.W, padx=10, pady=5)
+        type_var = tk.StringVar(value=self.job.extras.get("job_type", ""))
+        ttk.Combobox(dialog, textvariable=type_var, width=18,
+                     values=self.days_predictor.job_types()).grid(row=3, column=1, sticky=tk.W, padx=10, pady=5)
+        days_entry.focus_set()
+        
+        def save_actuals():
             try:
-                self.job.material_cost_per_sqft = float(self.material_cost_var.get())
+                days = float(days_var.get())
+                hours = float(hours_var.get()) if hours_var.get().strip() else None
             except ValueError:
-                self.job.material_cost_per_sqft = 0.0
-            
+                messagebox.showerror("Error", "Days and hours must be numbers.", parent=dialog)
+                return
+            if days <= 0 or (hours is not None and hours <= 0):
+                messagebox.showerror("Error", "Days and hours must be more than zero.", parent=dialog)
+                return
+            self.job_type_var.set(type_var.get())
+            self.set_job_type()
             try:
-                self.job.pickup_fee = float(self.pickup_fee_var.get())
-            except ValueError:
-                self.job.pickup_fee = 0.0
-            
-            # Calculate and display
-            breakdown = self.job.get_cost_breakdown()
-            
-            self.total_space_label.config(text=f"{breakdown['total_floor_space_sqft']:.2f} sq ft")
-            self.sanding_cost_label.config(text=f"${breakdown['sanding_cost']:,.2f}")
-            self.labor_cost_label.config(text=f"${breakdown['labor_cost']:,.2f}")
-            self.material_cost_label.config(text=f"${breakdown['material_cost']:,.2f}")
-            self.total_cost_label.config(text=f"${breakdown['total_cost']:,.2f}")
-        except Exception as e:
-            # Silent error handling - just don't update if calculation fails
-            pass
+                self.days_predictor.record(outcome_for(self.job, days, hours, self.workspace.active.name))
+            except OSError as e:
+                messagebox.showerror("Error", f"Could not save: {e}", parent=dialog)
+                return
+            self.job_type_combo.config(values=self.days_predictor.job_types())
+            dialog.destroy()
+            self.update_cost_summary()
+            messagebox.showinfo("Recorded", f"Recorded. {len(self.days_predictor.outcomes)} finished job(s) "
+                                            "now shape the suggested days.")
+        
+        btn_frame = ttk.Frame(dialog)
+        btn_frame.grid(row=4, column=0, columnspan=2, pady=15)
+        ttk.Button(btn_frame, text="Save", command=save_actuals).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Cancel", command=dialog.destroy).pack(side=tk.LEFT, padx=5)
+        dialog.bind('<Return>', lambda e: save_actuals())
     
     def calculate_costs(self):
         """Explicitly calculate and show costs"""
         self.update_cost_summary()
         messagebox.showinfo("Calculation Complete", "Costs have been calculated. See the Cost Summary panel.")
     
+    def show_risk_window(self):
+        """Monte Carlo P50/P90 cost range with a histogram"""
+        try:
+            from risk import simulate_job, default_uncertainty, Triangular, Uncertainty
+        except ImportError:
+            messagebox.showerror("Error", "NumPy not installed. Install with: pip install numpy")
+            return
+        
+        self.update_cost_summary()
+        job = self.job
+        defaults = default_uncertainty(job)
+        
+        window = tk.Toplevel(self.root)
+        window.title("Cost Risk Range")
+        window.geometry("620x520")
+        window.transient(self.root)
+        
+        # Editable spreads (low / most likely / high)
+        inputs = ttk.LabelFrame(window, text="Uncertainty (low / likely / high)", padding="10")
+        inputs.pack(fill=tk.X, padx=10, pady=10)
+        
+        rows = [
+            ("Days required", defaults.days),
+            ("Waste factor", defaults.waste_factor),
+            ("Sanding ($/sq ft)", defaults.sanding_cost_per_sqft),
+            ("Material ($/sq ft)", defaults.material_cost_per_sqft),
+        ]
+        row_vars = []
+        for row, (label, dist) in enumerate(rows):
+            ttk.Label(inputs, text=f"{label}:").grid(row=row, column=0, sticky=tk.W, pady=2)
+            variables = []
+            for column, value in enumerate((dist.low, dist.mode, dist.high), 1):
+                var = tk.StringVar(value=f"{value:.2f}")
+                ttk.Entry(inputs, textvariable=var, width=10).grid(row=row, column=column, padx=5, pady=2)
+                variables.append(var)
+            row_vars.append(variables)
+        
+        result_label = ttk.Label(window, text="", font=("", 10), justify=tk.LEFT)
+        result_label.pack(anchor=tk.W, padx=10)
+        
+        canvas = tk.Canvas(window, width=600, height=220, bg="white")
+        canvas.pack(padx=10, pady=10)
+        
+        def draw_histogram(quote):
+            canvas.delete("all")
+            counts = quote.histogram_counts
+            peak = max(counts) if counts else 0
+            if not peak:
+                return
+            width, height, margin = 600, 220, 20
+            bar_width = (width - 2 * margin) / len(counts)
+            low, high = quote.histogram_edges[0], quote.histogram_edges[-1]
+            span = (high - low) or 1.0
+            for i, count in enumerate(counts):
+                x0 = margin + i * bar_width
+                bar_height = count / peak * (height - 2 * margin)
+                canvas.create_rectangle(x0, height - margin - bar_height, x0 + bar_width - 1,
+                                        height - margin, fill="#7a9cc6", outline="")
+            for p in (50, 90):
+                x = margin + (quote.percentiles[p] - low) / span * (width - 2 * margin)
+                canvas.create_line(x, margin, x, height - margin, fill="#c0392b", dash=(4, 2))
+                canvas.create_text(x, margin - 8, text=f"P{p}", fill="#c0392b", font=("", 9))
+            canvas.create_text(margin, height - 8, text=f"${low:,.0f}", anchor=tk.W, font=("", 8))
+            canvas.create_text(width - margin, height - 8, text=f"${high:,.0f}", anchor=tk.E, font=("", 8))
+        
+        def run_simulation():
+            try:
+                dists = [Triangular(*(float(var.get()) for var in variables)) for variables in row_vars]
+                uncertainty = Uncertainty(*dists)
+                quote = simulate_job(job, uncertainty)
+            except ValueError as e:
+                messagebox.showerror("Error", f"Please enter low <= likely <= high for each row.\n\n{e}",
+                                     parent=window)
+                return
+            lines = [f"Single estimate: ${quote.base_cost:,.2f}    Mean: ${quote.mean:,.2f}"]
+            lines.append("    ".join(f"P{p}: ${v:,.2f}" for p, v in quote.percentiles.items()))
+            lines.append(f"Chance of exceeding the single estimate: {quote.probability_over_base * 100:.0f}%"
+                         f"  ({quote.samples:,} samples)")
+            result_label.config(text="\n".join(lines))
+            draw_histogram(quote)
+        
+        ttk.Button(inputs, text="Simulate", command=run_simulation).grid(row=len(rows), column=0,
+                                                                        columnspan=4, pady=(10, 0))
+        run_simulation()
+    
     def load_blueprint(self):
         """Load and display blueprint file"""
         filetypes = [
@@ -603,6 +1369,28 @@ class FlooringCalculatorGUI:
         if filepath:
             self.blueprint_path = filepath
             self.display_blueprint_window()
+            if filepath.lower().endswith('.pdf'):
+                self.offer_blueprint_rooms()
+    
+    def offer_blueprint_rooms(self):
+        """Offer the rooms found in the blueprint's text layer"""
+        try:
+            candidates = extract_room_candidates(self.blueprint_path)
+        except ImportError:
+            return
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not read blueprint text: {e}")
+            return
+        if not candidates:
+            return
+        
+        listing = "\n".join(format_candidate(c) for c in candidates[:25])
+        if len(candidates) > 25:
+            listing += f"\n... and {len(candidates) - 25} more"
+        if messagebox.askyesno("Rooms Found on Blueprint",
+                               f"Found {len(candidates)} room dimensions:\n\n{listing}\n\nAdd them to the job?"):
+            rooms = PersistentList(list(self.job.rooms) + [c.to_room() for c in candidates])
+            self.commit_edit(f"Add {len(candidates)} blueprint rooms", rooms=rooms)
     
     def display_blueprint_window(self):
         """Display blueprint in a separate window"""
@@ -614,90 +1402,487 @@ class FlooringCalculatorGUI:
         if self.blueprint_window:
             self.blueprint_window.destroy()
         
-        # Create new window
+        # Create new window; it keeps showing this file whichever tab is active later
+        path = self.blueprint_path
         self.blueprint_window = tk.Toplevel(self.root)
-        self.blueprint_window.title(f"Blueprint: {os.path.basename(self.blueprint_path)}")
-        self.blueprint_window.geometry("800x600")
-        
+        self.blueprint_window.title(f"Blueprint: {os.path.basename(path)}")
+        is_pdf = path.lower().endswith('.pdf')
+        self.blueprint_window.geometry("1140x680" if is_pdf else "820x680")
+        
+        # PDFs get a search panel on the right; the page itself is redrawn in page_frame
+        page_frame = ttk.Frame(self.blueprint_window)
+        page_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        handlers = {"pick_label": None}
+        # Rooms measured on this window belong to this job, even if another tab is active by then
+        owner = self.workspace.active
+        show_page = lambda page_number: self.show_blueprint_page(page_frame, owner, path, page_number,
+                                                                 handlers["pick_label"])
+        if is_pdf:
+            show_page, handlers["pick_label"] = self.build_blueprint_search(self.blueprint_window, path, show_page)
+        if show_page(0) is None:
+            self.blueprint_window.destroy()
+    
+    def show_blueprint_page(self, page_frame, owner: JobWorkspace, path: str, page_number: int = 0,
+                            pick_label=None):
+        """Draw one page of the blueprint with the measure tool; returns (canvas, zoom) or None"""
+        for child in page_frame.winfo_children():
+            child.destroy()
         try:
-            is_pdf = self.blueprint_path.lower().endswith('.pdf')
+            is_pdf = path.lower().endswith('.pdf')
+            
+            # Preview already rendered by the watch-folder service? Only files the
+            # index knows unchanged are checked here; others are hashed off the event loop
+            cached_preview = self.render_cache.indexed_lookup(path) if page_number == 0 else None
+            if page_number == 0 and cached_preview is None:
+                self.start_render_lookup(path)
             
-            if is_pdf:
+            if cached_preview:
+                from PIL import Image, ImageTk
+                img = Image.open(cached_preview)
+            elif is_pdf:
                 # Handle PDF
                 try:
-                    import fitz  # PyMuPDF
-                    pdf_doc = fitz.open(self.blueprint_path)
-                    first_page = pdf_doc[0]
-                    
-                    zoom = 1.5
-                    mat = fitz.Matrix(zoom, zoom)
-                    pix = first_page.get_pixmap(matrix=mat)
-                    
                     from PIL import Image, ImageTk
-                    img_data = pix.tobytes("ppm")
-                    img = Image.open(io.BytesIO(img_data))
-                    
-                    pdf_doc.close()
+                    img, _ = render_pdf_page(path, zoom=1.5, page_number=page_number)
                 except ImportError:
                     messagebox.showinfo("Info", "PyMuPDF not installed. Install with: pip install pymupdf to view PDFs in the GUI.\n\nOpening in system viewer instead.")
                     import subprocess
                     import platform
                     if platform.system() == 'Darwin':
-                        subprocess.Popen(['open', self.blueprint_path])
+                        subprocess.Popen(['open', path])
                     elif platform.system() == 'Windows':
-                        os.startfile(self.blueprint_path)
+                        os.startfile(path)
                     else:
-                        subprocess.Popen(['xdg-open', self.blueprint_path])
-                    self.blueprint_window.destroy()
-                    return
+                        subprocess.Popen(['xdg-open', path])
+                    return None
                 except Exception as e:
                     messagebox.showerror("Error", f"Could not load PDF: {e}")
-                    self.blueprint_window.destroy()
-                    return
+                    return None
             else:
                 # Handle image files
                 from PIL import Image, ImageTk
-                img = Image.open(self.blueprint_path)
+                img = Image.open(path)
+            
+            # Page size and vector corners for the measure tool
+            try:
+                geometry = load_page_geometry(path, page_number)
+            except ImportError:
+                geometry = PageGeometry(float(img.size[0]), float(img.size[1]))
             
             # Resize image to fit window while maintaining aspect ratio
             window_width = 780
-            window_height = 560
+            window_height = 520
             img.thumbnail((window_width, window_height), Image.Resampling.LANCZOS)
             
             # Convert to PhotoImage for Tkinter
             photo = ImageTk.PhotoImage(img)
-            
-            # Display image
-            label = tk.Label(self.blueprint_window, image=photo)
-            label.image = photo  # Keep a reference
-            label.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+            zoom = img.size[0] / geometry.width
+            canvas = self.build_measure_canvas(page_frame, owner, path, photo, geometry, zoom, pick_label)
             
             # Add info label
-            info_text = f"File: {os.path.basename(self.blueprint_path)}\nUse this as reference while entering room measurements."
-            info_label = ttk.Label(self.blueprint_window, text=info_text, font=("", 9))
+            page_text = f"  (page {page_number + 1})" if is_pdf else ""
+            info_text = (f"File: {os.path.basename(path)}{page_text}\n"
+                         "Use this as reference, or Set Scale then Measure Room to trace a room's corners.")
+            info_label = ttk.Label(page_frame, text=info_text, font=("", 9))
             info_label.pack(pady=5)
+            return canvas, zoom
             
         except ImportError:
             messagebox.showerror("Error", "PIL/Pillow not installed. Install with: pip install pillow")
-            self.blueprint_window.destroy()
         except Exception as e:
             messagebox.showerror("Error", f"Could not load blueprint: {e}")
-            if self.blueprint_window:
-                self.blueprint_window.destroy()
+        return None
+    
+    def start_render_lookup(self, path: str):
+        """Hash a blueprint in the background so its next view finds any cached preview"""
+        if path in self.render_lookups:
+            return
+        self.render_lookups.add(path)
+        
+        def work():
+            try:
+                self.render_cache.lookup(path)
+            except OSError:
+                pass
+            finally:
+                self.render_lookups.discard(path)
+        
+        threading.Thread(target=work, daemon=True).start()
+    
+    def build_blueprint_search(self, window, path: str, show_page):
+        """
+        Find panel for a PDF plan set: matches on every page are listed as you
+        type, the selected one is highlighted on its page and shown enlarged.
+        Returns (function showing a page, handler for clicking a label on the page).
+        """
+        panel = ttk.Frame(window)
+        panel.pack(side=tk.RIGHT, fill=tk.Y, padx=(0, 10), pady=10)
+        
+        ttk.Label(panel, text="Find on plans (e.g. bedroom 3, mech):").pack(anchor=tk.W)
+        query_var = tk.StringVar()
+        entry = ttk.Entry(panel, textvariable=query_var, width=40)
+        entry.pack(fill=tk.X, pady=2)
+        count_var = tk.StringVar(value="Reading plan text...")
+        ttk.Label(panel, textvariable=count_var, foreground="#606060").pack(anchor=tk.W)
+        results = tk.Listbox(panel, height=14, width=44, exportselection=False)
+        results.pack(fill=tk.BOTH, expand=True, pady=2)
+        zoom_label = ttk.Label(panel)
+        zoom_label.pack(pady=5)
+        
+        state = {"index": self.blueprint_indexes.get(path), "matches": [], "page": 0, "view": None}
+        
+        def highlight(selected=None):
+            if state["view"] is None:
+                return
+            canvas, zoom = state["view"]
+            canvas.delete("match")
+            for match in state["matches"]:
+                if match.page != state["page"]:
+                    continue
+                x0, y0, x1, y1 = (v * zoom for v in match.bbox)
+                chosen = match is selected
+                canvas.create_rectangle(x0 - 3, y0 - 3, x1 + 3, y1 + 3, tags="match",
+                                        outline="red" if chosen else "orange", width=3 if chosen else 2)
+        
+        def go_to_page(page: int):
+            if state["view"] is None or page != state["page"]:
+                state["page"] = page
+                state["view"] = show_page(page)
+            return state["view"]
+        
+        def show_zoomed(match):
+            """The area around a match, enlarged"""
+            x0, y0, x1, y1 = match.bbox
+            try:
+                from PIL import Image, ImageTk
+                img, _ = render_pdf_page(path, zoom=3.0, page_number=match.page,
+                                         clip=(x0 - 80, y0 - 50, x1 + 80, y1 + 50))
+            except Exception:
+                zoom_label.config(image="")
+                return
+            img.thumbnail((320, 200), Image.Resampling.LANCZOS)
+            zoom_label.image = ImageTk.PhotoImage(img)
+            zoom_label.config(image=zoom_label.image)
+        
+        def run_search(*args):
+            index = state["index"]
+            if index is None:
+                return
+            matches, total = index.search(query_var.get())
+            state["matches"] = matches
+            results.delete(0, tk.END)
+            if matches:
+                results.insert(tk.END, *[f"p.{m.page + 1}  {m.text}" for m in matches])
+            shown = f" (first {len(matches)})" if total > len(matches) else ""
+            count_var.set(f"{total} match{'es' if total != 1 else ''}{shown}" if query_var.get().strip()
+                          else f"{len(index)} lines of text on {index.page_count} page(s)")
+            if matches:
+                results.selection_set(0)
+                show_match()
+            else:
+                zoom_label.config(image="")
+                highlight()
+        
+        def show_match(event=None):
+            selection = results.curselection()
+            if not selection:
+                return
+            match = state["matches"][selection[0]]
+            go_to_page(match.page)
+            highlight(match)
+            show_zoomed(match)
+        
+        def use_match(event=None):
+            selection = results.curselection()
+            if state["index"] is None or not selection:
+                return
+            name, area = state["index"].suggest_room(state["matches"][selection[0]].line)
+            self.prefill_room(name, area)
+        
+        def pick_label(x: float, y: float):
+            """A click on the page (view mode) takes the label under it as a room name"""
+            if state["index"] is None:
+                return
+            line_id = state["index"].line_at(state["page"], x, y)
+            if line_id is not None:
+                name, area = state["index"].suggest_room(line_id)
+                self.prefill_room(name, area)
+        
+        def focus_results(event=None):
+            if state["matches"]:
+                results.focus_set()
+                results.selection_clear(0, tk.END)
+                results.selection_set(0)
+                results.activate(0)
+            return "break"
+        
+        query_var.trace_add("write", run_search)
+        entry.bind('<Down>', focus_results)
+        entry.bind('<Return>', use_match)
+        results.bind('<<ListboxSelect>>', show_match)
+        results.bind('<Return>', use_match)
+        results.bind('<Double-1>', use_match)
+        ttk.Button(panel, text="Use as Room Name", command=use_match).pack(pady=2)
+        
+        # The plan text is read once (then cached on disk), off the event loop
+        if state["index"] is None:
+            outcome = {}
+            
+            def work():
+                try:
+                    outcome["index"] = load_index(path)
+                except Exception as e:
+                    outcome["error"] = e
+            
+            worker = threading.Thread(target=work, daemon=True)
+            worker.start()
+            
+            def check():
+                if not window.winfo_exists():
+                    return
+                if worker.is_alive():
+                    window.after(100, check)
+                    return
+                if "error" in outcome:
+                    count_var.set(f"Text search unavailable: {outcome['error']}")
+                    return
+                state["index"] = self.blueprint_indexes[path] = outcome["index"]
+                run_search()
+            
+            window.after(100, check)
+        else:
+            run_search()
+        entry.focus_set()
+        return go_to_page, pick_label
+    
+    def prefill_room(self, name: str, area: Optional[float] = None):
+        """Start a new room row in the grid with a name (and area) taken from the blueprint"""
+        self.root.lift()
+        self.root.focus_force()
+        self.room_grid.start_new_room(name, area)
+    
+    def build_measure_canvas(self, window, owner: JobWorkspace, path: str, photo, geometry: PageGeometry,
+                             zoom: float, pick_label=None):
+        """
+        Blueprint canvas with the measure tool; returns the canvas. Measured
+        rooms are added to owner, the job the blueprint window was opened from,
+        and path is the blueprint file the window shows.
+        zoom converts page units (PDF points) to canvas pixels. pick_label(x, y)
+        is called with page units for clicks outside the measure modes.
+        """
+        snap_radius = SNAP_PIXELS / zoom
+        snap_index = SnapIndex(geometry.snap_points, snap_radius)
+        trace = Trace()
+        mode = {"value": "view"}  # view / measure / scale
+        
+        toolbar = ttk.Frame(window)
+        toolbar.pack(fill=tk.X, padx=10, pady=(10, 0))
+        status_var = tk.StringVar()
+        
+        canvas = tk.Canvas(window, width=photo.width(), height=photo.height(),
+                           highlightthickness=0, cursor="crosshair")
+        canvas.create_image(0, 0, image=photo, anchor=tk.NW)
+        canvas.image = photo  # Keep a reference
+        canvas.pack(padx=10, pady=10)
+        
+        def to_page(event) -> tuple:
+            x, y = event.x / zoom, event.y / zoom
+            snapped = snap_index.nearest(x, y, snap_radius)
+            return snapped if snapped else (x, y)
+        
+        def scale() -> Optional[float]:
+            return self.blueprint_scales.get(path)
+        
+        def redraw(cursor=None):
+            canvas.delete("trace")
+            screen = [(x * zoom, y * zoom) for x, y in trace.points]
+            if trace.closed and len(screen) >= 3:
+                canvas.create_polygon(*[c for p in screen for c in p], outline="red",
+                                      fill="red", stipple="gray25", width=2, tags="trace")
+            elif screen:
+                path_points = screen + ([cursor] if cursor else [])
+                if len(path_points) >= 2:
+                    canvas.create_line(*[c for p in path_points for c in p], fill="red", width=2, tags="trace")
+            for x, y in screen:
+                canvas.create_oval(x - 3, y - 3, x + 3, y + 3, outline="red", tags="trace")
+            update_status()
+        
+        def update_status():
+            if mode["value"] == "scale":
+                status_var.set("Click both ends of a dimension you know.")
+            elif mode["value"] == "measure":
+                area = polygon_area(trace.points)
+                if scale():
+                    area_text = f"{area * scale() ** 2:.2f} sq ft"
+                else:
+                    area_text = "set the scale to get sq ft"
+                action = "Click the first corner to close." if not trace.closed else "Add the room or clear."
+                status_var.set(f"{len(trace.points)} corners, {area_text}. {action}")
+            elif scale():
+                status_var.set(f"Scale: 1 ft = {1 / scale():.1f} page units")
+            else:
+                status_var.set("Scale not set")
+        
+        def on_motion(event):
+            canvas.delete("snap")
+            if mode["value"] == "view":
+                return
+            x, y = to_page(event)
+            sx, sy = x * zoom, y * zoom
+            canvas.create_oval(sx - 5, sy - 5, sx + 5, sy + 5, outline="blue", width=2, tags="snap")
+            if mode["value"] == "measure" and not trace.closed:
+                redraw((sx, sy))
+        
+        def on_click(event):
+            if mode["value"] == "view":
+                if pick_label:
+                    pick_label(event.x / zoom, event.y / zoom)
+                return
+            point = to_page(event)
+            if mode["value"] == "scale":
+                trace.add(point, 0)
+                redraw()
+                if len(trace.points) == 2:
+                    finish_scale()
+                return
+            trace.add(point, snap_radius)
+            redraw()
+        
+        def finish_scale():
+            units = distance(trace.points[0], trace.points[1])
+            answer = simpledialog.askstring("Set Scale", "Real length between the two points (e.g. 12'6\" or 12.5):",
+                                            parent=window)
+            trace.points.clear()
+            set_mode("view")
+            if not answer:
+                return
+            try:
+                feet = parse_length(answer)
+            except ValueError:
+                messagebox.showerror("Error", f"Could not read length '{answer}'.", parent=window)
+                return
+            if units <= 0 or feet <= 0:
+                messagebox.showerror("Error", "Pick two different points and a positive length.", parent=window)
+                return
+            self.blueprint_scales[path] = feet / units
+            update_status()
+        
+        def set_mode(value: str):
+            mode["value"] = value
+            trace.points.clear()
+            trace.closed = False
+            canvas.delete("snap")
+            redraw()
+        
+        def undo_point():
+            trace.undo()
+            redraw()
+        
+        def add_traced_room():
+            if not trace.closed:
+                messagebox.showinfo("Info", "Close the outline by clicking its first corner.", parent=window)
+                return
+            if not scale():
+                messagebox.showinfo("Info", "Set the scale first.", parent=window)
+                return
+            area = trace.area_sqft(scale())
+            name = simpledialog.askstring("Add Room", f"Room name ({area:.2f} sq ft):", parent=window)
+            if name and name.strip():
+                if owner not in self.workspace.jobs:
+                    messagebox.showinfo("Info", f"{owner.name} has been closed.", parent=window)
+                    return
+                self.show_job(owner)
+                self.commit_edit(f"Add room {name.strip()}",
+                                 rooms=self.job.rooms.append(Room(name.strip(), round(area, 2))))
+                set_mode("measure")
+        
+        ttk.Button(toolbar, text="Set Scale", command=lambda: set_mode("scale")).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="Measure Room", command=lambda: set_mode("measure")).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="Undo Point", command=undo_point).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="Clear", command=lambda: set_mode(mode["value"])).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="Add as Room", command=add_traced_room).pack(side=tk.LEFT, padx=2)
+        
+        def detect_rooms():
+            """Find enclosed rooms on a scanned blueprint (runs off the event loop)"""
+            if not scale():
+                messagebox.showinfo("Info", "Set the scale first.", parent=window)
+                return
+            try:
+                from raster_rooms import segment_scan, format_region
+            except ImportError:
+                messagebox.showerror("Error", "NumPy not installed. Install with: pip install numpy", parent=window)
+                return
+            
+            outcome = {}
+            
+            def work():
+                try:
+                    outcome["regions"] = segment_scan(path, scale())
+                except Exception as e:
+                    outcome["error"] = e
+            
+            worker = threading.Thread(target=work, daemon=True)
+            worker.start()
+            status_var.set("Detecting rooms...")
+            
+            def check():
+                if not window.winfo_exists():
+                    return  # blueprint window closed while detecting
+                if worker.is_alive():
+                    window.after(100, check)
+                    return
+                update_status()
+                if "error" in outcome:
+                    messagebox.showerror("Error", f"Could not process scan: {outcome['error']}", parent=window)
+                    return
+                regions = outcome["regions"]
+                canvas.delete("regions")
+                for region in regions:
+                    x0, y0, x1, y1 = (v * zoom for v in region.bbox)
+                    canvas.create_rectangle(x0, y0, x1, y1, outline="green", width=2, tags="regions")
+                    canvas.create_text((x0 + x1) / 2, (y0 + y1) / 2, text=region.name,
+                                       fill="green", tags="regions")
+                if not regions:
+                    messagebox.showinfo("Detect Rooms", "No enclosed rooms found.", parent=window)
+                    return
+                listing = "\n".join(format_region(r) for r in regions[:25])
+                if len(regions) > 25:
+                    listing += f"\n... and {len(regions) - 25} more"
+                if owner not in self.workspace.jobs:
+                    messagebox.showinfo("Detect Rooms", f"Found {len(regions)} rooms, but {owner.name} "
+                                                        "has been closed.", parent=window)
+                    canvas.delete("regions")
+                    return
+                if messagebox.askyesno("Rooms Found on Scan",
+                                       f"Found {len(regions)} rooms:\n\n{listing}\n\nAdd them to {owner.name}?",
+                                       parent=window):
+                    self.show_job(owner)
+                    rooms = self.job.rooms
+                    for region in regions:
+                        rooms = rooms.append(region.to_room())
+                    self.commit_edit(f"Add {len(regions)} scanned rooms", rooms=rooms)
+                canvas.delete("regions")
+            
+            check()
+        
+        if not path.lower().endswith('.pdf'):
+            ttk.Button(toolbar, text="Detect Rooms", command=detect_rooms).pack(side=tk.LEFT, padx=2)
+        ttk.Label(toolbar, textvariable=status_var).pack(side=tk.LEFT, padx=10)
+        
+        canvas.bind('<Motion>', on_motion)
+        canvas.bind('<Button-1>', on_click)
+        window.winfo_toplevel().bind('<Escape>', lambda e: set_mode("view"))
+        update_status()
+        return canvas
     
     def clear_all(self):
         """Clear all inputs"""
-        if messagebox.askyesno("Confirm", "Clear all data? This cannot be undone."):
-            self.job = FlooringJob()
-            self.days_var.set("0")
-            self.sanding_var.set("0.00")
-            self.material_source_var.set("customer")
-            self.material_cost_var.set("0.00")
-            self.pickup_fee_var.set("0.00")
-            self.update_rooms_list()
-            self.update_employees_list()
+        if messagebox.askyesno("Confirm", "Clear all data? (Use Undo to bring it back.)"):
             self.update_cost_summary()
-            self.toggle_material_fields()
+            self.history.current = JobState.from_job(self.job)
+            empty = JobState(PersistentList(), PersistentList())
+            self.history.record(empty, "Clear all")
+            self.restore_state(empty)
 
 
 def main():
@@ -0,0 +1,212 @@
+"""
+Owen Moloney
+Site Hierarchy and Subtotals
+Multi-building bids group rooms by where they are: site -> building ->
+floor -> unit -> room. A room's location is a path such as
+"Tower A / Level 3 / Unit 301" (shorter paths are fine, e.g. "Level 2").
+
+Every node of the tree keeps the area subtotal of the rooms below it. Adding,
+changing or removing a room only adjusts that room's ancestors, so subtotals
+stay current on a 20,000-room project without re-adding anything, and a
+per-floor report is a walk over the floors alone. Costs that scale with
+area (material, sanding) follow from a node's usable area; labor and the
+pickup fee are shared out by usable area, so the subtotals of any level
+add up to the job total.
+"""
+
+import argparse
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from main import FlooringJob, Room, UnitPlacement, WASTE_FACTOR, load_job
+from history import PersistentList
+
+
+LEVELS = ("site", "building", "floor", "unit")
+LOCATION_SEPARATOR = "/"
+
+
+def parse_location(text: str) -> Tuple[str, ...]:
+    """'Tower A / Level 3 / Unit 301' -> ('Tower A', 'Level 3', 'Unit 301')"""
+    parts = tuple(part.strip() for part in (text or "").split(LOCATION_SEPARATOR) if part.strip())
+    return parts[:len(LEVELS) - 1]
+
+
+def format_location(parts: Tuple[str, ...]) -> str:
+    return f" {LOCATION_SEPARATOR} ".join(parts)
+
+
+class AreaNode:
+    """One site/building/floor/unit with the subtotals of everything below it"""
+    __slots__ = ("name", "level", "parent", "children", "rooms", "total_sqft", "usable_sqft")
+
+    def __init__(self, name: str, level: str, parent: Optional["AreaNode"] = None):
+        self.name = name
+        self.level = level
+        self.parent = parent
+        self.children: Dict[str, AreaNode] = {}
+        self.rooms = 0
+        self.total_sqft = 0.0
+        self.usable_sqft = 0.0
+
+    @property
+    def path(self) -> Tuple[str, ...]:
+        parts = []
+        node = self
+        while node.parent is not None:
+            parts.append(node.name)
+            node = node.parent
+        return tuple(reversed(parts))
+
+    def _adjust(self, rooms: int, total: float, usable: float):
+        """Apply a change to this node and its ancestors (O(depth))"""
+        node = self
+        while node is not None:
+            node.rooms += rooms
+            node.total_sqft += total
+            node.usable_sqft += usable
+            parent = node.parent
+            if node.rooms == 0 and parent is not None:
+                # Nothing left below: drop the node and any float residue
+                del parent.children[node.name]
+                node.total_sqft = node.usable_sqft = 0.0
+            node = parent
+
+
+class ProjectTree:
+    """Rooms of a job arranged by location, with incremental rollups"""
+
+    def __init__(self, name: str = "Site"):
+        self.root = AreaNode(name, LEVELS[0])
+        self._synced = None  # the PersistentList the tree last matched
+        self._units = []     # unit placements currently added
+
+    def _node(self, location: str) -> AreaNode:
+        node = self.root
+        for depth, part in enumerate(parse_location(location), 1):
+            child = node.children.get(part)
+            if child is None:
+                child = node.children[part] = AreaNode(part, LEVELS[depth], node)
+            node = child
+        return node
+
+    def add(self, room: Room):
+        self._node(room.location)._adjust(1, room.total_area_sqft, room.get_usable_area())
+
+    def remove(self, room: Room):
+        self._node(room.location)._adjust(-1, -room.total_area_sqft, -room.get_usable_area())
+
+    def _add_units(self, placement: UnitPlacement, sign: int):
+        # A placement counts as a whole at its location (its copies are not expanded)
+        self._node(placement.location)._adjust(sign * placement.room_count(), sign * placement.get_total_area(),
+                                               sign * placement.get_usable_area())
+
+    def sync(self, rooms, units: List[UnitPlacement] = ()):
+        """
+        Bring the tree up to date with a job's rooms and placed units. For a
+        PersistentList edited since the last sync only the changed rooms are
+        visited.
+        """
+        for placement in self._units:
+            self._add_units(placement, -1)
+        if isinstance(rooms, PersistentList) and self._synced is not None:
+            start, removed, inserted = rooms.splice_from(self._synced)
+            for room in self._synced[start:start + removed]:
+                self.remove(room)
+            for room in inserted:
+                self.add(room)
+        else:
+            self.root = AreaNode(self.root.name, LEVELS[0])
+            for room in rooms:
+                self.add(room)
+        self._synced = rooms if isinstance(rooms, PersistentList) else None
+        self._units = list(units)
+        for placement in self._units:
+            self._add_units(placement, 1)
+
+    def walk(self) -> Iterator[Tuple[int, AreaNode]]:
+        """(depth, node) for every node, parents first, children by name"""
+        stack = [(0, self.root)]
+        while stack:
+            depth, node = stack.pop()
+            yield depth, node
+            for child in sorted(node.children.values(), key=lambda c: c.name, reverse=True):
+                stack.append((depth + 1, child))
+
+    def nodes_at(self, level: str) -> List[AreaNode]:
+        """Every node of one level ('building', 'floor' or 'unit'), in path order"""
+        depth = LEVELS.index(level)
+        nodes = [self.root]
+        for _ in range(depth):
+            nodes = [child for node in nodes for child in sorted(node.children.values(), key=lambda c: c.name)]
+        return nodes
+
+
+def share_costs(job: FlooringJob, usable: float, share: float,
+                labor_cost: Optional[float] = None) -> Dict[str, float]:
+    """
+    Costs of the part of a job with `usable` sq ft: material and sanding by
+    area, and `share` (0-1) of the labor and pickup fee. Also used for the
+    per-room rows of export.py, so subtotals and exports agree.
+    """
+    if labor_cost is None:
+        labor_cost = job.calculate_labor_cost()
+    material = 0.0
+    if not job.customer_provides_wood:
+        material = usable * WASTE_FACTOR * job.material_cost_per_sqft + job.pickup_fee * share
+    sanding = usable * job.sanding_cost_per_sqft
+    labor = labor_cost * share
+    return {"material": material, "labor": labor, "sanding": sanding, "total": material + labor + sanding}
+
+
+def node_costs(node: AreaNode, job: FlooringJob, job_usable: float) -> Dict[str, float]:
+    """
+    A node's share of the job cost (job_usable: the whole job's usable area).
+    The root is the whole job, so it carries all of the labor and pickup fee
+    (even before any room is entered) and matches get_cost_breakdown().
+    """
+    if node.parent is None:
+        share = 1.0
+    else:
+        share = node.usable_sqft / job_usable if job_usable else 0.0
+    return share_costs(job, node.usable_sqft, share)
+
+
+def rollup_lines(tree: ProjectTree, job: FlooringJob, level: Optional[str] = None) -> List[str]:
+    """Report lines: one level ('floor'...) or, by default, the whole tree indented"""
+    usable = tree.root.usable_sqft
+    if level:
+        nodes = [(0, node) for node in tree.nodes_at(level)]
+    else:
+        nodes = list(tree.walk())
+    lines = []
+    for depth, node in nodes:
+        label = format_location(node.path) if level else node.name
+        costs = node_costs(node, job, usable)
+        lines.append(f"{'   ' * depth}{label}: {node.rooms} rooms, {node.usable_sqft:,.2f} sq ft, "
+                     f"${costs['total']:,.2f}")
+    return lines
+
+
+def print_rollup(job: FlooringJob, level: Optional[str] = None):
+    tree = ProjectTree()
+    tree.sync(job.rooms, job.units)
+    print("\n" + "="*60)
+    print(f"           SUBTOTALS BY {(level or 'location').upper()}")
+    print("="*60 + "\n")
+    for line in rollup_lines(tree, job, level):
+        print(line)
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Area and cost subtotals by building, floor and unit")
+    parser.add_argument("job", help="job file")
+    parser.add_argument("--level", choices=LEVELS[1:], help="list one level only (default: the whole tree)")
+    args = parser.parse_args()
+    try:
+        loaded = load_job(args.job)
+    except (OSError, ValueError) as e:
+        print(f"\nCould not load job: {e}")
+        sys.exit(1)
+    print_rollup(loaded, args.level)
@@ -0,0 +1,331 @@
+"""
+Owen Moloney
+Undo/Redo History
+Persistent (structurally shared) snapshots of a FlooringJob for undo/redo.
+Each edit copies only the few tree nodes on the path to the changed room or
+employee, so undo and redo are O(1) pointer swaps even on very large jobs.
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Iterable, Iterator, Mapping, Optional, Tuple
+
+from main import FlooringJob
+
+
+class _Node:
+    """Immutable tree node holding one list item"""
+    __slots__ = ("value", "left", "right", "size", "height")
+
+    def __init__(self, value, left, right):
+        self.value = value
+        self.left = left
+        self.right = right
+        self.size = _size(left) + _size(right) + 1
+        self.height = max(_height(left), _height(right)) + 1
+
+
+def _size(node) -> int:
+    return node.size if node else 0
+
+
+def _height(node) -> int:
+    return node.height if node else 0
+
+
+def _balance(value, left, right) -> _Node:
+    """Build a node, rotating if the AVL height invariant is broken"""
+    if _height(left) > _height(right) + 1:
+        if _height(left.left) >= _height(left.right):
+            return _Node(left.value, left.left, _Node(value, left.right, right))
+        pivot = left.right
+        return _Node(pivot.value,
+                     _Node(left.value, left.left, pivot.left),
+                     _Node(value, pivot.right, right))
+    if _height(right) > _height(left) + 1:
+        if _height(right.right) >= _height(right.left):
+            return _Node(right.value, _Node(value, left, right.left), right.right)
+        pivot = right.left
+        return _Node(pivot.value,
+                     _Node(value, left, pivot.left),
+                     _Node(right.value, pivot.right, right.right))
+    return _Node(value, left, right)
+
+
+def _build(items: list, lo: int, hi: int):
+    """Build a perfectly balanced tree from items[lo:hi]"""
+    if lo >= hi:
+        return None
+    mid = (lo + hi) // 2
+    return _Node(items[mid], _build(items, lo, mid), _build(items, mid + 1, hi))
+
+
+def _get(node, index: int):
+    while True:
+        left_size = _size(node.left)
+        if index < left_size:
+            node = node.left
+        elif index == left_size:
+            return node.value
+        else:
+            index -= left_size + 1
+            node = node.right
+
+
+def _set(node, index: int, value) -> _Node:
+    left_size = _size(node.left)
+    if index < left_size:
+        return _Node(node.value, _set(node.left, index, value), node.right)
+    if index == left_size:
+        return _Node(value, node.left, node.right)
+    return _Node(node.value, node.left, _set(node.right, index - left_size - 1, value))
+
+
+def _insert(node, index: int, value) -> _Node:
+    if node is None:
+        return _Node(value, None, None)
+    left_size = _size(node.left)
+    if index <= left_size:
+        return _balance(node.value, _insert(node.left, index, value), node.right)
+    return _balance(node.value, node.left, _insert(node.right, index - left_size - 1, value))
+
+
+def _pop_first(node) -> Tuple[object, Optional[_Node]]:
+    if node.left is None:
+        return node.value, node.right
+    value, left = _pop_first(node.left)
+    return value, _balance(node.value, left, node.right)
+
+
+def _delete(node, index: int):
+    left_size = _size(node.left)
+    if index < left_size:
+        return _balance(node.value, _delete(node.left, index), node.right)
+    if index > left_size:
+        return _balance(node.value, node.left, _delete(node.right, index - left_size - 1))
+    if node.left is None:
+        return node.right
+    if node.right is None:
+        return node.left
+    successor, right = _pop_first(node.right)
+    return _balance(successor, node.left, right)
+
+
+def _shared_run(a, b, from_end: bool) -> int:
+    """
+    How many leading (or trailing) items two trees hold as the very same
+    objects. Subtrees the trees share are skipped whole, so after a small
+    edit this costs O(log² n) rather than a walk over every item.
+    """
+    count = 0
+    stack_a = [a] if a else []
+    stack_b = [b] if b else []
+    while stack_a and stack_b:
+        x, y = stack_a.pop(), stack_b.pop()
+        if x is y:
+            count += x.size if isinstance(x, _Node) else 1
+            continue
+        if not isinstance(x, _Node) and not isinstance(y, _Node):
+            break
+        # Open up whichever side is a subtree and compare again
+        for stack, item in ((stack_a, x), (stack_b, y)):
+            if not isinstance(item, _Node):
+                stack.append(item)
+                continue
+            first, last = (item.right, item.left) if from_end else (item.left, item.right)
+            if last:
+                stack.append(last)
+            stack.append(item.value)
+            if first:
+                stack.append(first)
+    return count
+
+
+class PersistentList:
+    """
+    Immutable list backed by a size-balanced AVL tree.
+    append/insert/set/delete return a new list in O(log n) time and memory,
+    sharing every untouched node with the original.
+    """
+    __slots__ = ("_root",)
+
+    def __init__(self, items: Iterable = ()):
+        items = list(items)
+        self._root = _build(items, 0, len(items))
+
+    @classmethod
+    def _from_root(cls, root) -> "PersistentList":
+        plist = cls.__new__(cls)
+        plist._root = root
+        return plist
+
+    def __len__(self) -> int:
+        return _size(self._root)
+
+    def _check_index(self, index: int) -> int:
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("PersistentList index out of range")
+        return index
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return _get(self._root, self._check_index(index))
+
+    def __iter__(self) -> Iterator:
+        # In-order walk with an explicit stack (no recursion limit on big jobs)
+        stack = []
+        node = self._root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.value
+            node = node.right
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PersistentList) and other._root is self._root:
+            return True
+        try:
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"PersistentList({list(self)!r})"
+
+    def append(self, value) -> "PersistentList":
+        """Return a new list with value added at the end"""
+        return self.insert(len(self), value)
+
+    def insert(self, index: int, value) -> "PersistentList":
+        """Return a new list with value inserted before index"""
+        length = len(self)
+        if index < 0:
+            index = max(index + length, 0)
+        return self._from_root(_insert(self._root, min(index, length), value))
+
+    def set(self, index: int, value) -> "PersistentList":
+        """Return a new list with the item at index replaced"""
+        return self._from_root(_set(self._root, self._check_index(index), value))
+
+    def delete(self, index: int) -> "PersistentList":
+        """Return a new list with the item at index removed"""
+        return self._from_root(_delete(self._root, self._check_index(index)))
+
+    def splice_from(self, old: "PersistentList") -> Tuple[int, int, list]:
+        """
+        The single edit that turns old into this list: (index, number of
+        items removed there, items inserted there). Items are compared by
+        identity, which is how edits replace rooms and employees.
+        """
+        old_length, length = len(old), len(self)
+        prefix = _shared_run(old._root, self._root, from_end=False)
+        if prefix == old_length == length:
+            return prefix, 0, []
+        suffix = min(_shared_run(old._root, self._root, from_end=True), min(old_length, length) - prefix)
+        return prefix, old_length - prefix - suffix, self[prefix:length - suffix]
+
+
+@dataclass(frozen=True)
+class JobState:
+    """Snapshot of everything the user can edit on a FlooringJob"""
+    rooms: PersistentList
+    employees: PersistentList
+    days_required: int = 0
+    sanding_cost_per_sqft: float = 0.0
+    material_cost_per_sqft: float = 0.0
+    customer_provides_wood: bool = True
+    pickup_fee: float = 0.0
+    units: tuple = ()  # UnitPlacements (replaced, never changed in place)
+    extras: Mapping = field(default_factory=lambda: MappingProxyType({}))  # read-only copy
+
+    @classmethod
+    def from_job(cls, job: FlooringJob) -> "JobState":
+        """Capture a job, converting its collections to persistent lists once"""
+        rooms = job.rooms if isinstance(job.rooms, PersistentList) else PersistentList(job.rooms)
+        employees = (job.employees if isinstance(job.employees, PersistentList)
+                     else PersistentList(job.employees))
+        units = job.units if isinstance(job.units, tuple) else tuple(job.units)
+        return cls(rooms, employees, job.days_required, job.sanding_cost_per_sqft,
+                   job.material_cost_per_sqft, job.customer_provides_wood, job.pickup_fee, units,
+                   MappingProxyType(dict(job.extras)))
+
+    def apply_to(self, job: FlooringJob):
+        """Point a job at this snapshot (only the few extras are copied)"""
+        job.rooms = self.rooms
+        job.employees = self.employees
+        job.days_required = self.days_required
+        job.sanding_cost_per_sqft = self.sanding_cost_per_sqft
+        job.material_cost_per_sqft = self.material_cost_per_sqft
+        job.customer_provides_wood = self.customer_provides_wood
+        job.pickup_fee = self.pickup_fee
+        job.units = self.units
+        job.extras = dict(self.extras)
+
+
+class EditHistory:
+    """
+    Undo/redo stacks of JobState snapshots.
+    Rooms and employees inside a snapshot must be treated as immutable:
+    an edit replaces the Room/Employee object instead of mutating it.
+    """
+
+    def __init__(self, initial: JobState, limit: Optional[int] = 500):
+        self.current = initial
+        self._undo = deque(maxlen=limit)
+        self._redo = deque(maxlen=limit)
+
+    def record(self, new_state: JobState, label: str, coalesce: bool = False):
+        """
+        Make new_state current, remembering the previous state for undo.
+        With coalesce, an edit with the same label as the last one (typing
+        into one field) replaces it rather than adding another undo step.
+        """
+        if coalesce and self._undo and not self._redo and self._undo[-1][0] == label:
+            self.current = new_state
+            return
+        self._undo.append((label, self.current))
+        self._redo.clear()
+        self.current = new_state
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def undo_label(self) -> Optional[str]:
+        return self._undo[-1][0] if self._undo else None
+
+    def redo_label(self) -> Optional[str]:
+        return self._redo[-1][0] if self._redo else None
+
+    def undo(self) -> Optional[JobState]:
+        """Step back one edit; returns the restored state or None"""
+        if not self._undo:
+            return None
+        label, previous = self._undo.pop()
+        self._redo.append((label, self.current))
+        self.current = previous
+        return previous
+
+    def redo(self) -> Optional[JobState]:
+        """Re-apply the last undone edit; returns the restored state or None"""
+        if not self._redo:
+            return None
+        label, following = self._redo.pop()
+        self._undo.append((label, self.current))
+        self.current = following
+        return following
+
+    def clear(self, state: JobState):
+        """Forget all history and start over from state"""
+        self._undo.clear()
+        self._redo.clear()
+        self.current = state
@@ -0,0 +1,369 @@
+"""
+Owen Moloney
+Autosave Journal
+Crash recovery for the GUI. Every edit to an open job is appended to a
+write-ahead journal as a small operation - rooms or employees spliced in or
+out (which covers adding, editing and removing rooms, obstacles, employees
+and rates), changed job parameters, extras or placed units. The GUI only queues the
+operation; a background thread encodes it, writes it and fsyncs, one fsync
+per batch of whatever has queued up meanwhile, so the Tk loop never waits
+on the disk.
+
+Every COMPACT_EVERY operations the journal is compacted: the whole job is
+written as a snapshot (the .job.json format) and a fresh operation log is
+started. Recovery loads the latest snapshot and replays the operations
+logged after it.
+
+    ~/.flooring_journal/<id>/meta.json        tab name, owning process
+                             snapshot.json    generation N + job
+                             ops-N.log        JSON lines logged since
+"""
+
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import fields
+from typing import List, Optional, Tuple
+
+from main import (FlooringJob, job_to_dict, job_from_dict, room_to_dict, room_from_dict,
+                  employee_to_dict, employee_from_dict, units_to_dict, units_from_dict)
+from history import JobState
+
+
+DEFAULT_JOURNAL_DIR = os.path.join(os.path.expanduser("~"), ".flooring_journal")
+
+# Operations between compactions
+COMPACT_EVERY = 500
+
+# Most operations written per fsync
+BATCH_MAX = 1000
+
+PARAMETERS = [f.name for f in fields(JobState) if f.name not in ("rooms", "employees", "units", "extras")]
+
+_ENCODERS = {"rooms": room_to_dict, "employees": employee_to_dict}
+_DECODERS = {"rooms": room_from_dict, "employees": employee_from_dict}
+
+
+def _fsync_dir(path: str):
+    """Make a rename durable (not possible, nor needed, on Windows)"""
+    if os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_json(path: str, data: dict):
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    _fsync_dir(os.path.dirname(path))
+
+
+class JournalWriter:
+    """Background thread that does all journal file work"""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self.error: Optional[str] = None
+        self._thread = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, task: tuple):
+        self._queue.put(task)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued so far is on disk"""
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Whatever queued up during the last fsync goes out in this one
+            while len(batch) < BATCH_MAX:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not self._process(batch):
+                return
+
+    def _process(self, batch: List[Optional[tuple]]) -> bool:
+        dirty = {}  # journal -> its log file, to fsync at the end of the batch
+        running = True
+        for task in batch:
+            if task is None:
+                running = False
+                continue
+            kind, journal = task[0], task[1]
+            try:
+                if kind == "flush":
+                    self._sync(dirty)
+                    journal.set()  # the Event waiting in flush()
+                elif kind == "op":
+                    journal._log(task[2])
+                    if journal._file is not None:
+                        dirty[journal] = journal._file
+                elif kind == "snapshot":
+                    journal._write_snapshot(task[2], task[3])
+                    # The old log was closed; a new one may hold operations that waited for this
+                    if journal._file is not None:
+                        dirty[journal] = journal._file
+                    else:
+                        dirty.pop(journal, None)
+                elif kind == "meta":
+                    os.makedirs(journal.directory, exist_ok=True)
+                    _write_json(os.path.join(journal.directory, "meta.json"), task[2])
+                elif kind == "discard":
+                    dirty.pop(journal, None)
+                    journal._close_file()
+                    shutil.rmtree(journal.directory, ignore_errors=True)
+            except Exception as e:
+                # Anything (a full disk, an extras value JSON cannot encode) only
+                # fails this task; the writer keeps running for the next ones
+                self.error = f"Autosave failed: {e}"
+        self._sync(dirty)
+        return running
+
+    def _sync(self, dirty: dict):
+        for f in dirty.values():
+            try:
+                f.flush()
+                os.fsync(f.fileno())
+            except (OSError, ValueError) as e:
+                self.error = f"Autosave failed: {e}"
+        dirty.clear()
+
+
+def _encode(op: dict) -> dict:
+    """Operation with its Room/Employee objects turned into plain data"""
+    if op["op"] == "splice":
+        op = dict(op, insert=[_ENCODERS[op["list"]](item) for item in op["insert"]])
+    elif op["op"] == "units":
+        op = dict(op, values=units_to_dict(list(op["values"])))
+    return op
+
+
+class JobJournal:
+    """
+    Journal of one open job. Used from the GUI thread: record() works out
+    what changed since the last call and queues it for the writer.
+    """
+
+    def __init__(self, writer: JournalWriter, job: FlooringJob, name: str,
+                 journal_dir: str = DEFAULT_JOURNAL_DIR):
+        self.writer = writer
+        self.directory = os.path.join(journal_dir, uuid.uuid4().hex)
+        self.state = JobState.from_job(job)
+        self.pending = 0  # operations since the last snapshot
+        self.generation = 0
+        # Only touched by the writer thread
+        self._file = None
+        self._disk_generation = None  # generation of the snapshot on disk (None until one is written)
+        self._unwritten = None        # first snapshot, while writing it keeps failing
+        self._backlog = []            # operations made since then, logged once it is written
+
+        writer.submit(("meta", self, {"name": name, "pid": os.getpid(), "started": time.time()}))
+        self.snapshot()
+
+    def record(self, job: FlooringJob) -> int:
+        """Journal whatever changed in job since the last call; returns the operation count"""
+        new = JobState.from_job(job)
+        ops = []
+        for name in ("rooms", "employees"):
+            old_items, new_items = getattr(self.state, name), getattr(new, name)
+            if old_items is not new_items:
+                index, removed, inserted = new_items.splice_from(old_items)
+                if removed or inserted:
+                    ops.append({"op": "splice", "list": name, "at": index,
+                                "remove": removed, "insert": inserted})
+        changed = {name: getattr(new, name) for name in PARAMETERS
+                   if getattr(new, name) != getattr(self.state, name)}
+        if changed:
+            ops.append({"op": "params", "values": changed})
+        if new.units is not self.state.units and new.units != self.state.units:
+            ops.append({"op": "units", "values": new.units})
+        if new.extras != self.state.extras:
+            ops.append({"op": "extras", "values": dict(new.extras)})
+
+        self.state = new
+        for op in ops:
+            self.writer.submit(("op", self, op))
+        self.pending += len(ops)
+        if self.pending >= COMPACT_EVERY:
+            self.snapshot()
+        return len(ops)
+
+    def snapshot(self):
+        """Queue a compacted copy of the job; later operations start a new log"""
+        self.generation += 1
+        job = FlooringJob()
+        self.state.apply_to(job)  # the state is immutable, so the writer can read it later
+        self.writer.submit(("snapshot", self, self.generation, job))
+        self.pending = 0
+
+    def discard(self):
+        """The job was closed (or saved and closed): forget its journal"""
+        self.writer.submit(("discard", self))
+
+    # --- writer thread ---
+
+    def _log(self, op: dict):
+        """Append an operation to the log of the snapshot on disk"""
+        if self._disk_generation is None:
+            # Nothing on disk to replay it onto: hold it back and retry the snapshot
+            self._backlog.append(op)
+            if self._unwritten is not None:
+                self._store_snapshot(*self._unwritten)
+            return
+        self._log_file().write(json.dumps(_encode(op)) + "\n")
+
+    def _log_file(self):
+        if self._file is None:
+            self._file = open(self._log_path(self._disk_generation), "a", encoding="utf-8")
+        return self._file
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _log_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"ops-{generation}.log")
+
+    def _write_snapshot(self, generation: int, job: FlooringJob):
+        """
+        Replace the snapshot on disk. If that fails, operations keep going to
+        the log of the last snapshot that was written, or are held back until
+        there is one.
+        """
+        if self._disk_generation is None:
+            # This snapshot already includes every operation held back so far
+            self._unwritten, self._backlog = (generation, job), []
+        self._store_snapshot(generation, job)
+
+    def _store_snapshot(self, generation: int, job: FlooringJob):
+        os.makedirs(self.directory, exist_ok=True)
+        _write_json(os.path.join(self.directory, "snapshot.json"),
+                    {"generation": generation, "job": job_to_dict(job)})
+        # Once the snapshot is in place the older log is no longer needed
+        self._close_file()
+        previous, self._disk_generation = self._disk_generation, generation
+        self._unwritten = None
+        if previous is not None:
+            try:
+                os.remove(self._log_path(previous))
+            except FileNotFoundError:
+                pass
+        held, self._backlog = self._backlog, []
+        for op in held:
+            self._log_file().write(json.dumps(_encode(op)) + "\n")
+
+
+def _apply(op: dict, lists: dict, values: dict, extras: dict):
+    if op["op"] == "splice":
+        start = op["at"]
+        decode = _DECODERS[op["list"]]
+        lists[op["list"]][start:start + op["remove"]] = [decode(item) for item in op["insert"]]
+    elif op["op"] == "params":
+        values.update(op["values"])
+    elif op["op"] == "units":
+        values["units"] = units_from_dict(op["values"])
+    elif op["op"] == "extras":
+        extras.clear()
+        extras.update(op["values"])
+
+
+def replay(directory: str) -> Tuple[FlooringJob, str]:
+    """
+    Rebuild a journaled job: its last snapshot plus the operations logged
+    after it. Returns (job, tab name); raises ValueError if unreadable.
+    """
+    try:
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            name = json.load(f).get("name", "Recovered job")
+        with open(os.path.join(directory, "snapshot.json"), encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Unreadable journal: {e}")
+    job = job_from_dict(snapshot["job"])
+    lists = {"rooms": list(job.rooms), "employees": list(job.employees)}
+    values = {}
+
+    log_path = os.path.join(directory, f"ops-{snapshot['generation']}.log")
+    if os.path.exists(log_path):
+        with open(log_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    break  # the write in progress when the program died
+                try:
+                    _apply(op, lists, values, job.extras)
+                except (KeyError, TypeError, AttributeError) as e:
+                    raise ValueError(f"Invalid journal entry: {e}")
+
+    job.rooms, job.employees = lists["rooms"], lists["employees"]
+    for field_name, value in values.items():
+        setattr(job, field_name, value)
+    return job, name
+
+
+def _process_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    if pid == os.getpid():
+        return True
+    if os.name == "nt":
+        import ctypes
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)  # query limited information
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def find_unsaved(journal_dir: str = DEFAULT_JOURNAL_DIR) -> List[str]:
+    """Journals left behind by a GUI that did not close normally"""
+    if not os.path.isdir(journal_dir):
+        return []
+    found = []
+    for entry in sorted(os.scandir(journal_dir), key=lambda e: e.stat().st_mtime):
+        if not entry.is_dir():
+            continue
+        try:
+            with open(os.path.join(entry.path, "meta.json"), encoding="utf-8") as f:
+                pid = int(json.load(f).get("pid", 0))
+        except (OSError, ValueError):
+            pid = 0
+        if not os.path.exists(os.path.join(entry.path, "snapshot.json")):
+            continue
+        if not _process_alive(pid):
+            found.append(entry.path)
+    return found
+
+
+def remove_journal(directory: str):
+    shutil.rmtree(directory, ignore_errors=True)
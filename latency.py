@@ -0,0 +1,182 @@
+"""
+Owen Moloney
+GUI Responsiveness Monitor
+Finds out when and why the GUI "hangs". A heartbeat scheduled with after()
+measures how late the Tk event loop runs it (event-loop lag), and every Tk
+callback - button commands, key bindings, after() jobs, dialog handlers -
+is timed. Stalls over a threshold are written to a log file naming the
+handler responsible, and recent lag is kept as a rolling histogram.
+"""
+
+import logging
+import os
+import time
+import tkinter
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+
+DEFAULT_LOG_PATH = os.path.join(os.path.expanduser("~"), ".flooring_latency.log")
+HEARTBEAT_MS = 100
+STALL_MS = 200
+
+# Histogram bucket upper bounds (ms); the last bucket is open-ended
+LAG_BUCKETS = (5, 10, 20, 50, 100, 200, 500, 1000)
+
+# Heartbeats kept for the rolling histogram (5 minutes at 100 ms)
+WINDOW = 3000
+
+
+class HandlerStats:
+    """Timing totals for one handler"""
+    __slots__ = ("calls", "total_ms", "max_ms", "stalls")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.stalls = 0
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+
+def handler_name(func: Callable) -> str:
+    """Readable name: 'update_cost_summary', 'add_room_dialog.save_room'"""
+    name = getattr(func, "__qualname__", None) or getattr(func, "__name__", None) or type(func).__name__
+    if "callit" in name:  # after() wraps the real function
+        name = getattr(func, "__name__", name)
+    parts = [part for part in name.split(".") if part != "<locals>"]
+    if len(parts) == 2 and parts[0][:1].isupper():
+        return parts[1]  # plain method: drop the class name
+    return ".".join(parts[-2:])
+
+
+class LatencyMonitor:
+    """Heartbeat, handler timings and stall log for one Tk root"""
+
+    def __init__(self, root, heartbeat_ms: int = HEARTBEAT_MS, stall_ms: float = STALL_MS,
+                 log_path: Optional[str] = DEFAULT_LOG_PATH):
+        self.root = root
+        self.heartbeat_ms = heartbeat_ms
+        self.stall_ms = stall_ms
+        self.lags: Deque[float] = deque(maxlen=WINDOW)
+        self.handlers: Dict[str, HandlerStats] = {}
+        self.stalls: Deque[Tuple[float, str, float]] = deque(maxlen=100)  # (time, what, ms)
+        self._slowest_since_beat: Tuple[str, float] = ("", 0.0)
+        self._expected = None
+
+        self.log = logging.getLogger("flooring.latency")
+        if log_path and not self.log.handlers:
+            try:
+                handler = logging.FileHandler(log_path, encoding="utf-8")
+            except OSError:
+                handler = None
+            if handler:
+                handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                self.log.addHandler(handler)
+                self.log.setLevel(logging.INFO)
+                self.log.propagate = False
+
+    # --- handler timing ---
+
+    def record(self, name: str, elapsed_ms: float):
+        stats = self.handlers.get(name)
+        if stats is None:
+            stats = self.handlers[name] = HandlerStats()
+        stats.calls += 1
+        stats.total_ms += elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
+        if elapsed_ms > self._slowest_since_beat[1]:
+            self._slowest_since_beat = (name, elapsed_ms)
+        if elapsed_ms >= self.stall_ms:
+            stats.stalls += 1
+            self._stall(f"handler {name}", elapsed_ms)
+
+    def timed(self, name: str, func: Callable) -> Callable:
+        """func wrapped so each call is recorded under name"""
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, (time.perf_counter() - start) * 1000)
+        wrapper.__name__ = getattr(func, "__name__", name)
+        wrapper.__qualname__ = getattr(func, "__qualname__", name)
+        wrapper.timed_by_monitor = True  # already recorded; the Tk wrapper skips it
+        return wrapper
+
+    def instrument(self, obj, names: List[str]):
+        """Time methods that are also called directly, not only from Tk"""
+        for name in names:
+            setattr(obj, name, self.timed(name, getattr(obj, name)))
+
+    def install(self):
+        """
+        Time every Tk callback created from now on. Must be called before
+        the widgets are built, since Tk keeps the wrapper it was given.
+        """
+        monitor = self
+
+        class TimedCallWrapper(_ORIGINAL_CALL_WRAPPER):
+            def __call__(self, *args):
+                if getattr(self.func, "__name__", "") == "_beat" or hasattr(self.func, "timed_by_monitor"):
+                    return super().__call__(*args)
+                start = time.perf_counter()
+                try:
+                    return super().__call__(*args)
+                finally:
+                    monitor.record(handler_name(self.func), (time.perf_counter() - start) * 1000)
+
+        tkinter.CallWrapper = TimedCallWrapper
+        self._expected = time.perf_counter() + self.heartbeat_ms / 1000
+        self.root.after(self.heartbeat_ms, self._beat)
+
+    def uninstall(self):
+        tkinter.CallWrapper = _ORIGINAL_CALL_WRAPPER
+
+    # --- event-loop lag ---
+
+    def _beat(self):
+        now = time.perf_counter()
+        lag_ms = max(0.0, (now - self._expected) * 1000)
+        self.lags.append(lag_ms)
+        if lag_ms >= self.stall_ms:
+            culprit, took = self._slowest_since_beat
+            blame = f" (slowest handler: {culprit}, {took:.0f} ms)" if culprit else ""
+            self._stall(f"event loop lag{blame}", lag_ms)
+        self._slowest_since_beat = ("", 0.0)
+        self._expected = now + self.heartbeat_ms / 1000
+        self.root.after(self.heartbeat_ms, self._beat)
+
+    def _stall(self, what: str, ms: float):
+        self.stalls.append((time.time(), what, ms))
+        self.log.info(f"STALL {ms:.0f} ms: {what}")
+
+    # --- reporting ---
+
+    def histogram(self) -> List[Tuple[str, int]]:
+        """(bucket label, heartbeat count) over the rolling window"""
+        counts = [0] * (len(LAG_BUCKETS) + 1)
+        for lag in self.lags:
+            for i, bound in enumerate(LAG_BUCKETS):
+                if lag < bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+        labels = [f"<{bound} ms" for bound in LAG_BUCKETS] + [f"≥{LAG_BUCKETS[-1]} ms"]
+        return list(zip(labels, counts))
+
+    def percentile(self, p: float) -> float:
+        if not self.lags:
+            return 0.0
+        ordered = sorted(self.lags)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    def slowest_handlers(self, limit: int = 15) -> List[Tuple[str, HandlerStats]]:
+        return sorted(self.handlers.items(), key=lambda item: item[1].max_ms, reverse=True)[:limit]
+
+
+_ORIGINAL_CALL_WRAPPER = tkinter.CallWrapper
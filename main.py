@@ -9,8 +9,24 @@ Calculates total cost for hardwood floor installation including:
 - Pickup fees
 """
 
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Dict, List, Optional
+import json
+import os
+
+from catalogue import load_default_catalogue, prompt_material_cost
+
+
+# Extra material ordered for cutouts and mistakes (10%)
+WASTE_FACTOR = 1.10
+
+# Length of a work day used for labor costs
+HOURS_PER_DAY = 8
+
+# Saved jobs are JSON files with this extension
+JOB_FILE_EXTENSION = ".job.json"
+JOB_FILE_VERSION = 1
 
 
 @dataclass
@@ -26,6 +42,7 @@ class Room:
     name: str
     total_area_sqft: float
     obstacles: List[Obstacle] = field(default_factory=list)
+    location: str = ""  # e.g. "Tower A / Level 3 / Unit 301" (see hierarchy.py)
     
     def get_usable_area(self) -> float:
         """Calculate usable floor space excluding obstacles"""
@@ -33,6 +50,97 @@ class Room:
         return self.total_area_sqft - obstacle_area
 
 
+@dataclass
+class UnitPrototype:
+    """A unit plan (its rooms) entered once and placed many times"""
+    name: str
+    rooms: List[Room] = field(default_factory=list)
+    
+    def get_total_area(self) -> float:
+        return sum(room.total_area_sqft for room in self.rooms)
+    
+    def get_usable_area(self) -> float:
+        return sum(room.get_usable_area() for room in self.rooms)
+
+
+@dataclass
+class UnitOverride:
+    """How one placed copy differs from its prototype"""
+    instance: int  # copy number, from 1
+    # Prototype room name -> the room this copy has instead (None: left out).
+    # The name must belong to exactly one room of the plan (checked by UnitPlacement).
+    rooms: Dict[str, Optional[Room]] = field(default_factory=dict)
+    extra_rooms: List[Room] = field(default_factory=list)
+    
+    def delta(self, prototype: UnitPrototype, measure) -> float:
+        """Change in measure (a Room -> number function) against the prototype"""
+        by_name = {room.name: room for room in prototype.rooms}
+        change = sum(measure(room) for room in self.extra_rooms)
+        for name, room in self.rooms.items():
+            if name in by_name:
+                change -= measure(by_name[name])
+            if room is not None:
+                change += measure(room)
+        return change
+
+
+@dataclass
+class UnitPlacement:
+    """
+    count copies of a prototype at one location. Areas are worked out once
+    per prototype and multiplied, so 500 copies cost no more than one.
+    """
+    prototype: UnitPrototype
+    count: int
+    location: str = ""
+    overrides: List[UnitOverride] = field(default_factory=list)
+    
+    def __post_init__(self):
+        """Reject overrides that expand() could not apply the way the area sums count them"""
+        names = Counter(room.name for room in self.prototype.rooms)
+        instances = set()
+        for override in self.overrides:
+            if not 1 <= override.instance <= self.count:
+                raise ValueError(f"{self.prototype.name} override for copy {override.instance}, "
+                                 f"but there are {self.count} copies")
+            if override.instance in instances:
+                raise ValueError(f"{self.prototype.name} copy {override.instance} has more than one override")
+            instances.add(override.instance)
+            for name in override.rooms:
+                if names[name] != 1:
+                    problem = "has no room" if not names[name] else f"has {names[name]} rooms"
+                    raise ValueError(f"Plan {self.prototype.name} {problem} named '{name}' "
+                                     "(an override must name exactly one of its rooms)")
+    
+    def get_total_area(self) -> float:
+        return (self.prototype.get_total_area() * self.count
+                + sum(o.delta(self.prototype, lambda r: r.total_area_sqft) for o in self.overrides))
+    
+    def get_usable_area(self) -> float:
+        return (self.prototype.get_usable_area() * self.count
+                + sum(o.delta(self.prototype, Room.get_usable_area) for o in self.overrides))
+    
+    def room_count(self) -> int:
+        return (len(self.prototype.rooms) * self.count
+                + sum(o.delta(self.prototype, lambda r: 1) for o in self.overrides))
+    
+    def expand(self):
+        """Every copy's rooms as ordinary Rooms (only for when each copy is needed)"""
+        overrides = {o.instance: o for o in self.overrides}
+        for instance in range(1, self.count + 1):
+            unit = f"{self.prototype.name} {instance}"
+            location = f"{self.location} / {unit}" if self.location else unit
+            override = overrides.get(instance)
+            for room in self.prototype.rooms:
+                if override and room.name in override.rooms:
+                    room = override.rooms[room.name]
+                    if room is None:
+                        continue
+                yield Room(room.name, room.total_area_sqft, room.obstacles, location)
+            for room in override.extra_rooms if override else []:
+                yield Room(room.name, room.total_area_sqft, room.obstacles, location)
+
+
 @dataclass
 class Employee:
     """Represents an employee with their hourly rate"""
@@ -53,9 +161,20 @@ class FlooringJob:
     customer_provides_wood: bool = True
     pickup_fee: float = 0.0
     
+    # Job details used only by pricing rules (e.g. stair_treads, pattern)
+    extras: Dict[str, object] = field(default_factory=dict)
+    
+    # Repeated unit plans (apartments, hotel rooms) placed many times
+    units: List[UnitPlacement] = field(default_factory=list)
+    
     def get_total_floor_space(self) -> float:
         """Calculate total usable floor space across all rooms"""
-        return sum(room.get_usable_area() for room in self.rooms)
+        return (sum(room.get_usable_area() for room in self.rooms)
+                + sum(placement.get_usable_area() for placement in self.units))
+    
+    def room_count(self) -> int:
+        """Rooms entered one by one plus every room of every placed unit"""
+        return len(self.rooms) + sum(placement.room_count() for placement in self.units)
     
     def calculate_material_cost(self) -> float:
         """Calculate material cost including waste factor"""
@@ -64,7 +183,7 @@ class FlooringJob:
         
         usable_area = self.get_total_floor_space()
         # Add 10% waste factor for cutouts and mistakes
-        material_needed = usable_area * 1.10
+        material_needed = usable_area * WASTE_FACTOR
         
         material_cost = material_needed * self.material_cost_per_sqft
         
@@ -76,8 +195,7 @@ class FlooringJob:
     
     def calculate_labor_cost(self) -> float:
         """Calculate total labor cost for all employees"""
-        hours_per_day = 8
-        total_hours = self.days_required * hours_per_day
+        total_hours = self.days_required * HOURS_PER_DAY
         
         total_labor_cost = 0.0
         for employee in self.employees:
@@ -111,6 +229,131 @@ class FlooringJob:
         }
 
 
+def room_to_dict(room: Room) -> dict:
+    data = {
+        "name": room.name,
+        "total_area_sqft": room.total_area_sqft,
+        "obstacles": [{"name": o.name, "area_sqft": o.area_sqft} for o in room.obstacles],
+    }
+    if room.location:
+        data["location"] = room.location
+    return data
+
+
+def room_from_dict(data: dict) -> Room:
+    return Room(data["name"], float(data["total_area_sqft"]),
+                [Obstacle(o["name"], float(o["area_sqft"])) for o in data.get("obstacles", [])],
+                data.get("location", ""))
+
+
+def employee_to_dict(employee: Employee) -> dict:
+    return {"name": employee.name, "hourly_rate": employee.hourly_rate}
+
+
+def employee_from_dict(data: dict) -> Employee:
+    return Employee(data["name"], float(data["hourly_rate"]))
+
+
+def units_to_dict(units: List[UnitPlacement]) -> dict:
+    """
+    Placements, with each prototype written once however often it is placed.
+    Prototypes are told apart by identity, not name (two plans may both be
+    called "Type A"), and placements refer to them by id.
+    """
+    ids = {}
+    prototypes = []
+    for placement in units:
+        if id(placement.prototype) not in ids:
+            ids[id(placement.prototype)] = len(prototypes)
+            prototypes.append(placement.prototype)
+    return {
+        "prototypes": [{"id": i, "name": p.name, "rooms": [room_to_dict(r) for r in p.rooms]}
+                       for i, p in enumerate(prototypes)],
+        "units": [
+            {
+                "prototype": placement.prototype.name,
+                "prototype_id": ids[id(placement.prototype)],
+                "count": placement.count,
+                "location": placement.location,
+                "overrides": [
+                    {
+                        "instance": o.instance,
+                        "rooms": {name: room_to_dict(room) if room else None for name, room in o.rooms.items()},
+                        "extra_rooms": [room_to_dict(room) for room in o.extra_rooms],
+                    }
+                    for o in placement.overrides
+                ],
+            }
+            for placement in units
+        ],
+    }
+
+
+def units_from_dict(data: dict) -> List[UnitPlacement]:
+    # Files written before prototype ids refer to prototypes by name
+    prototypes = {p.get("id", p["name"]): UnitPrototype(p["name"], [room_from_dict(r) for r in p.get("rooms", [])])
+                  for p in data.get("prototypes", [])}
+    return [
+        UnitPlacement(
+            prototypes[u.get("prototype_id", u["prototype"])], int(u["count"]), u.get("location", ""),
+            [UnitOverride(int(o["instance"]),
+                          {name: room_from_dict(room) if room else None for name, room in o.get("rooms", {}).items()},
+                          [room_from_dict(room) for room in o.get("extra_rooms", [])])
+             for o in u.get("overrides", [])])
+        for u in data.get("units", [])
+    ]
+
+
+def job_to_dict(job: FlooringJob) -> dict:
+    """Plain-data form of a job (for saving as JSON)"""
+    data = {
+        "version": JOB_FILE_VERSION,
+        "rooms": [room_to_dict(room) for room in job.rooms],
+        "employees": [employee_to_dict(e) for e in job.employees],
+        "days_required": job.days_required,
+        "sanding_cost_per_sqft": job.sanding_cost_per_sqft,
+        "material_cost_per_sqft": job.material_cost_per_sqft,
+        "customer_provides_wood": job.customer_provides_wood,
+        "pickup_fee": job.pickup_fee,
+        "extras": dict(job.extras),
+    }
+    if job.units:
+        data.update(units_to_dict(job.units))
+    return data
+
+
+def job_from_dict(data: dict) -> FlooringJob:
+    """Rebuild a job saved with job_to_dict; raises ValueError on bad data"""
+    try:
+        return FlooringJob(
+            rooms=[room_from_dict(r) for r in data.get("rooms", [])],
+            employees=[employee_from_dict(e) for e in data.get("employees", [])],
+            days_required=int(data.get("days_required", 0)),
+            sanding_cost_per_sqft=float(data.get("sanding_cost_per_sqft", 0.0)),
+            material_cost_per_sqft=float(data.get("material_cost_per_sqft", 0.0)),
+            customer_provides_wood=bool(data.get("customer_provides_wood", True)),
+            pickup_fee=float(data.get("pickup_fee", 0.0)),
+            extras=dict(data.get("extras", {})),
+            units=units_from_dict(data),
+        )
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Invalid job data: {e}")
+
+
+def save_job(job: FlooringJob, path: str):
+    """Write a job file (atomically, so a crash never leaves half a file)"""
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(job_to_dict(job), f, indent=2)
+    os.replace(temp_path, path)
+
+
+def load_job(path: str) -> FlooringJob:
+    """Read a job file written by save_job"""
+    with open(path, encoding="utf-8") as f:
+        return job_from_dict(json.load(f))
+
+
 def print_cost_report(job: FlooringJob):
     """Print a formatted cost report"""
     breakdown = job.get_cost_breakdown()
@@ -131,6 +374,13 @@ def print_cost_report(job: FlooringJob):
             if obstacle_area > 0:
                 print(f"     (Excluding {obstacle_area:.2f} sq ft of obstacles)")
     
+    if job.units:
+        print(f"\n   Repeated Units:")
+        for placement in job.units:
+            where = f" ({placement.location})" if placement.location else ""
+            print(f"   {placement.prototype.name} × {placement.count}{where}: "
+                  f"{placement.get_usable_area():.2f} sq ft usable")
+    
     print(f"\nCOST BREAKDOWN:")
     print(f"   Sanding Cost:        ${breakdown['sanding_cost']:,.2f}")
     print(f"     ({breakdown['total_floor_space_sqft']:.2f} sq ft × ${breakdown['sanding_cost_per_sqft']:.2f}/sq ft)")
@@ -143,16 +393,44 @@ def print_cost_report(job: FlooringJob):
     
     print(f"\n{'─'*60}")
     print(f"   TOTAL PROJECT COST:  ${breakdown['total_cost']:,.2f}")
+    
+    # Surcharges/discounts from pricing_rules.json, if the business has one
+    from pricing_rules import load_default_rules, print_rule_adjustments
+    rules = load_default_rules()
+    if rules:
+        print_rule_adjustments(rules.price(job))
     print("="*60 + "\n")
 
 
+def offer_risk_report(job: FlooringJob):
+    """Optionally show the Monte Carlo cost range (P50/P90) after the estimate"""
+    choice = input("Show risk range (P50/P90 quote)? (yes/no): ").strip().lower()
+    if choice not in ['yes', 'y']:
+        return
+    
+    try:
+        from risk import simulate_job, print_risk_report
+    except ImportError:
+        print("\nNumPy not installed for risk pricing.")
+        print("Install with: pip install numpy")
+        return
+    
+    print_risk_report(simulate_job(job))
+
+
 def get_room_input() -> List[Room]:
     """Get room and obstacle information from user"""
+    from quick_entry import looks_like_room_line, get_rooms_from_block
+    
     rooms = []
     
     print("\n" + "="*60)
     print("ROOM INFORMATION")
     print("="*60)
+    print("Tip: type or paste many rooms at once, e.g.")
+    print("   Kitchen 12'6x14 -island 3x6 -pantry 4x4")
+    print("   Living Room 300sf -fireplace 20")
+    print("(finish the block with an empty line)")
     
     while True:
         room_name = input("\nEnter room name (or 'done' to finish): ").strip()
@@ -162,6 +440,13 @@ def get_room_input() -> List[Room]:
             print("Please enter a room name.")
             continue
         
+        if looks_like_room_line(room_name):
+            added = get_rooms_from_block(room_name)
+            rooms.extend(added)
+            if added:
+                print(f"\nAdded {len(added)} rooms")
+            continue
+        
         try:
             total_area = float(input(f"Enter total area for {room_name} (sq ft): "))
         except ValueError:
@@ -200,6 +485,12 @@ def get_employee_input() -> List[Employee]:
     print("EMPLOYEE INFORMATION")
     print("="*60)
     
+    # Imported here because the roster module builds on this one
+    from roster import Roster, choose_crew_preset, prompt_rate, offer_save_crew
+    roster = Roster()
+    employees = choose_crew_preset(roster)
+    preset = list(employees)
+    
     while True:
         name = input("\nEnter employee name (or 'done' to finish): ").strip()
         if name.lower() == 'done':
@@ -208,18 +499,21 @@ def get_employee_input() -> List[Employee]:
             print("Please enter a name.")
             continue
         
+        name = roster.display_name(name)
         try:
-            hourly_rate = float(input(f"Enter hourly rate for {name} ($): "))
+            hourly_rate = prompt_rate(roster, name, f"Enter hourly rate for {name} ($): ")
             employees.append(Employee(name, hourly_rate))
             print(f"Added {name}: ${hourly_rate:.2f}/hour")
         except ValueError:
             print("Invalid input. Please enter a number.")
     
+    if employees != preset:
+        offer_save_crew(roster, employees)
     return employees
 
 
-def get_job_input() -> dict:
-    """Get job parameters from user"""
+def get_job_input(suggested_days: Optional[int] = None) -> dict:
+    """Get job parameters from user (Enter accepts suggested_days, when there is one)"""
     print("\n" + "="*60)
     print("JOB PARAMETERS")
     print("="*60)
@@ -227,9 +521,11 @@ def get_job_input() -> dict:
     params = {}
     
     # Days required
+    hint = f" [suggested {suggested_days}, Enter to accept]" if suggested_days else ""
     while True:
         try:
-            params['days'] = int(input("\nHow many 8-hour days will the job take? "))
+            answer = input(f"\nHow many 8-hour days will the job take?{hint} ").strip()
+            params['days'] = suggested_days if not answer and suggested_days else int(answer)
             break
         except ValueError:
             print("Invalid input. Please enter a whole number.")
@@ -253,9 +549,12 @@ def get_job_input() -> dict:
             break
         elif provides in ['no', 'n']:
             params['customer_provides_wood'] = False
+            catalogue = load_default_catalogue()
+            if catalogue:
+                print(f"({len(catalogue)} catalogue items: type a number, or a product name to look it up)")
             while True:
                 try:
-                    params['material_cost'] = float(input("Enter material cost per sq ft ($): "))
+                    params['material_cost'] = prompt_material_cost("Enter material cost per sq ft ($): ", catalogue)
                     break
                 except ValueError:
                     print("Invalid input. Please enter a number.")
@@ -269,6 +568,12 @@ def get_job_input() -> dict:
         else:
             print("Please enter 'yes' or 'no'.")
     
+    # Details the pricing rules need (stairs, pattern, ...)
+    from pricing_rules import load_default_rules, prompt_rule_inputs
+    rules = load_default_rules()
+    if rules:
+        params['extras'] = prompt_rule_inputs(rules)
+    
     return params
 
 
@@ -288,8 +593,18 @@ def create_job_from_input() -> FlooringJob:
         print("\nNo employees added. Exiting.")
         return None
     
-    # Get job parameters
-    params = get_job_input()
+    # Get job parameters, suggesting the days from finished jobs when there are enough
+    suggested_days = None
+    try:
+        from days_predictor import DaysPredictor
+        suggestion = DaysPredictor().suggest(FlooringJob(rooms, employees))
+        if suggestion:
+            print(f"\nFinished jobs ({suggestion.basis}) suggest {suggestion.days} day(s) "
+                  f"({suggestion.crew_hours:.0f} crew hours).")
+            suggested_days = suggestion.days
+    except ImportError:
+        pass
+    params = get_job_input(suggested_days)
     
     # Create job
     job = FlooringJob()
@@ -300,6 +615,7 @@ def create_job_from_input() -> FlooringJob:
     job.customer_provides_wood = params['customer_provides_wood']
     job.material_cost_per_sqft = params.get('material_cost', 0.0)
     job.pickup_fee = params.get('pickup_fee', 0.0)
+    job.extras = params.get('extras', {})
     
     return job
 
@@ -316,6 +632,7 @@ if __name__ == "__main__":
     if job:
         # Display results
         print_cost_report(job)
+        offer_risk_report(job)
         
         # Ask if they want to run another calculation
         while True:
@@ -325,6 +642,7 @@ if __name__ == "__main__":
                 job = create_job_from_input()
                 if job:
                     print_cost_report(job)
+                    offer_risk_report(job)
             elif again in ['no', 'n']:
                 print("\nThank you.")
                 break
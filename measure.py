@@ -0,0 +1,137 @@
+"""
+Owen Moloney
+Blueprint Measuring
+Geometry behind the blueprint viewer's measure tool: corner points taken from
+a PDF's vector drawing, a grid index so clicks snap to the nearest corner
+instantly even on drawings with 100k+ segments, and traced-polygon areas.
+Coordinates are PDF points (or image pixels for scanned blueprints).
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+Point = Tuple[float, float]
+
+
+def polygon_area(points: List[Point]) -> float:
+    """Area enclosed by a closed polygon (shoelace formula)"""
+    if len(points) < 3:
+        return 0.0
+    total = 0.0
+    for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]):
+        total += x1 * y2 - x2 * y1
+    return abs(total) / 2
+
+
+def distance(a: Point, b: Point) -> float:
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+class SnapIndex:
+    """
+    Uniform grid over the snap points: each point lives in one cell, and a
+    query only looks at the cells the search radius can reach, so a lookup
+    costs the same on a 50-line sketch and a 100k-segment plan set.
+    """
+
+    def __init__(self, points: List[Point], cell_size: float):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[Point]] = {}
+        for x, y in points:
+            self.cells.setdefault((int(x // cell_size), int(y // cell_size)), []).append((x, y))
+
+    def __len__(self) -> int:
+        return sum(len(points) for points in self.cells.values())
+
+    def nearest(self, x: float, y: float, radius: float) -> Optional[Point]:
+        """Closest point within radius of (x, y), or None"""
+        reach = max(1, math.ceil(radius / self.cell_size))
+        cx, cy = int(x // self.cell_size), int(y // self.cell_size)
+        best = None
+        best_distance = radius
+        for i in range(cx - reach, cx + reach + 1):
+            for j in range(cy - reach, cy + reach + 1):
+                for point in self.cells.get((i, j), ()):
+                    d = math.hypot(point[0] - x, point[1] - y)
+                    if d <= best_distance:
+                        best, best_distance = point, d
+        return best
+
+
+@dataclass
+class PageGeometry:
+    """Size of a blueprint page and the corners clicks can snap to"""
+    width: float
+    height: float
+    snap_points: List[Point] = field(default_factory=list)
+
+
+def pdf_snap_points(page) -> List[Point]:
+    """Endpoints and corners of every line, rectangle and curve on a PDF page"""
+    points = set()
+    for drawing in page.get_drawings():
+        for item in drawing["items"]:
+            kind = item[0]
+            if kind == "l":
+                corners = item[1:3]
+            elif kind == "c":
+                corners = (item[1], item[4])  # curve ends, not control points
+            elif kind == "re":
+                rect = item[1]
+                corners = (rect.tl, rect.tr, rect.br, rect.bl)
+            elif kind == "qu":
+                quad = item[1]
+                corners = (quad.ul, quad.ur, quad.lr, quad.ll)
+            else:
+                continue
+            # Rounding merges the shared ends of joined segments
+            points.update((round(p.x, 2), round(p.y, 2)) for p in corners)
+    return list(points)
+
+
+def load_page_geometry(path: str, page_number: int = 0) -> PageGeometry:
+    """
+    Page size and snap points for a blueprint.
+    PDFs need PyMuPDF; images (and PDFs without it) get no snap points and
+    are measured in pixels.
+    """
+    if path.lower().endswith('.pdf'):
+        import fitz  # PyMuPDF
+
+        pdf_doc = fitz.open(path)
+        try:
+            page = pdf_doc[page_number]
+            return PageGeometry(page.rect.width, page.rect.height, pdf_snap_points(page))
+        finally:
+            pdf_doc.close()
+
+    from PIL import Image
+    with Image.open(path) as img:
+        return PageGeometry(float(img.size[0]), float(img.size[1]))
+
+
+@dataclass
+class Trace:
+    """Corners clicked so far, in page units"""
+    points: List[Point] = field(default_factory=list)
+    closed: bool = False
+
+    def add(self, point: Point, close_distance: float) -> bool:
+        """Add a corner; clicking back on the first corner closes the trace (returns True)"""
+        if self.closed:
+            return True
+        if len(self.points) >= 3 and distance(point, self.points[0]) <= close_distance:
+            self.closed = True
+            return True
+        self.points.append(point)
+        return False
+
+    def undo(self):
+        if self.closed:
+            self.closed = False
+        elif self.points:
+            self.points.pop()
+
+    def area_sqft(self, feet_per_unit: float) -> float:
+        return polygon_area(self.points) * feet_per_unit ** 2
@@ -0,0 +1,267 @@
+"""
+Owen Moloney
+Plan Set Processing
+Runs per-page blueprint analysis (preview rendering, text/room extraction,
+vector counts) over whole plan sets using a process pool. Every worker opens
+its own PyMuPDF document handles, results stream back as pages finish, and
+only a bounded number of pages are in flight at once.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from blueprint_text import extract_lines, candidates_from_lines
+
+
+# Same zoom as display_blueprint uses for the terminal preview
+PREVIEW_ZOOM = 2.0
+
+# Open documents kept per worker process (path -> fitz.Document)
+_WORKER_DOC_LIMIT = 4
+_worker_docs = OrderedDict()
+
+
+@dataclass
+class PageResult:
+    """Outcome of analysing one page"""
+    path: str
+    page: int  # -1 when the whole file could not be opened
+    worker: int
+    seconds: float
+    results: dict = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+def _worker_document(path: str):
+    """This worker's handle for path (opened once, least recently used closed)"""
+    import fitz  # PyMuPDF
+
+    doc = _worker_docs.pop(path, None)
+    if doc is None:
+        doc = fitz.open(path)
+        while len(_worker_docs) >= _WORKER_DOC_LIMIT:
+            _, oldest = _worker_docs.popitem(last=False)
+            oldest.close()
+    _worker_docs[path] = doc
+    return doc
+
+
+def _render_preview(page, path: str, page_number: int, preview_dir: Optional[str]) -> dict:
+    import fitz  # PyMuPDF
+
+    pix = page.get_pixmap(matrix=fitz.Matrix(PREVIEW_ZOOM, PREVIEW_ZOOM))
+    result = {"width": pix.width, "height": pix.height}
+    if preview_dir:
+        name = f"{os.path.splitext(os.path.basename(path))[0]}_p{page_number + 1:04d}.png"
+        out_path = os.path.join(preview_dir, name)
+        pix.save(out_path)
+        result["file"] = out_path
+    return result
+
+
+def _extract_text(page, path: str, page_number: int, preview_dir: Optional[str]) -> dict:
+    candidates = candidates_from_lines(extract_lines(page), page_number)
+    return {"rooms": [(c.name, c.length_ft, c.width_ft) for c in candidates]}
+
+
+def _extract_vectors(page, path: str, page_number: int, preview_dir: Optional[str]) -> dict:
+    segments = 0
+    for drawing in page.get_drawings():
+        for item in drawing["items"]:
+            if item[0] == "l":
+                segments += 1
+            elif item[0] == "re":
+                segments += 4
+            elif item[0] == "qu":
+                segments += 4
+    return {"segments": segments}
+
+
+ANALYSES = {
+    "preview": _render_preview,
+    "text": _extract_text,
+    "vectors": _extract_vectors,
+}
+
+
+def analyse_page(path: str, page_number: int, analyses: Tuple[str, ...],
+                 preview_dir: Optional[str] = None) -> PageResult:
+    """Run the requested analyses on one page (executes inside a worker)"""
+    start = time.perf_counter()
+    result = PageResult(path, page_number, os.getpid(), 0.0)
+    try:
+        page = _worker_document(path)[page_number]
+        for name in analyses:
+            result.results[name] = ANALYSES[name](page, path, page_number, preview_dir)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def list_pages(paths: Iterable[str], unreadable: Optional[List[PageResult]] = None) -> Iterator[Tuple[str, int]]:
+    """
+    (path, page number) for every page of every PDF. A file that cannot be
+    opened (corrupt, encrypted, missing) is skipped and, if unreadable is
+    given, added to it as a PageResult with the error.
+    """
+    import fitz  # PyMuPDF
+
+    for path in paths:
+        try:
+            with fitz.open(path) as doc:
+                if doc.needs_pass:
+                    raise ValueError("the PDF is password protected")
+                count = len(doc)
+        except Exception as e:
+            if unreadable is not None:
+                unreadable.append(PageResult(path, -1, os.getpid(), 0.0, error=f"{type(e).__name__}: {e}"))
+            continue
+        for page_number in range(count):
+            yield path, page_number
+
+
+def find_pdfs(paths: Iterable[str]) -> List[str]:
+    """Expand folders into the PDFs they contain"""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith('.pdf'):
+                    found.append(os.path.join(path, name))
+        else:
+            found.append(path)
+    return found
+
+
+@dataclass
+class ThroughputReport:
+    """Pages per second overall and per worker core"""
+    pages: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+    workers: int = 1
+    per_worker: Counter = field(default_factory=Counter)
+    busy_seconds: float = 0.0
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def pages_per_second_per_core(self) -> float:
+        return self.pages_per_second / self.workers
+
+    def summary(self) -> str:
+        lines = [
+            f"Pages processed:   {self.pages} ({self.errors} errors)",
+            f"Elapsed:           {self.elapsed:.2f} s",
+            f"Throughput:        {self.pages_per_second:.1f} pages/sec",
+            f"Per core:          {self.pages_per_second_per_core:.1f} pages/sec ({self.workers} workers)",
+        ]
+        if self.elapsed:
+            utilisation = self.busy_seconds / (self.elapsed * self.workers) * 100
+            lines.append(f"Worker utilisation: {utilisation:.0f}%")
+        return "\n".join(lines)
+
+
+def process_plan_set(paths: Iterable[str], analyses: Tuple[str, ...] = ("text",),
+                     workers: Optional[int] = None, max_in_flight: Optional[int] = None,
+                     preview_dir: Optional[str] = None,
+                     report: Optional[ThroughputReport] = None) -> Iterator[PageResult]:
+    """
+    Analyse every page of the given PDFs in parallel.
+    Yields PageResults in completion order. At most max_in_flight pages
+    (default 2 per worker) are queued at once, so memory stays bounded
+    regardless of the size of the plan set. Pass a ThroughputReport to have
+    it filled in as results arrive.
+    """
+    for name in analyses:
+        if name not in ANALYSES:
+            raise ValueError(f"Unknown analysis '{name}' (choose from {', '.join(ANALYSES)})")
+    if preview_dir:
+        os.makedirs(preview_dir, exist_ok=True)
+
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 2
+    report = report if report is not None else ThroughputReport()
+    report.workers = workers
+
+    unreadable: List[PageResult] = []
+    pages = list_pages(find_pdfs(paths), unreadable)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            # Top up the queue without ever holding more than max_in_flight pages
+            while not exhausted and len(pending) < max_in_flight:
+                try:
+                    path, page_number = next(pages)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending.add(pool.submit(analyse_page, path, page_number, tuple(analyses), preview_dir))
+            # Files that would not open are reported, not fatal
+            while unreadable:
+                report.errors += 1
+                yield unreadable.pop(0)
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                report.pages += 1
+                report.errors += result.error is not None
+                report.per_worker[result.worker] += 1
+                report.busy_seconds += result.seconds
+                report.elapsed = time.perf_counter() - start
+                yield result
+    report.elapsed = time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyse every page of a blueprint plan set in parallel")
+    parser.add_argument("paths", nargs="+", help="PDF files or folders of PDFs")
+    parser.add_argument("--analysis", default="text",
+                        help=f"comma-separated analyses to run ({', '.join(ANALYSES)})")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--preview-dir", default=None, help="folder to write page previews to")
+    args = parser.parse_args()
+
+    analyses = tuple(name.strip() for name in args.analysis.split(",") if name.strip())
+    if "preview" in analyses and not args.preview_dir:
+        print("Note: previews are rendered but not saved (use --preview-dir to keep them).")
+
+    report = ThroughputReport()
+    try:
+        for result in process_plan_set(args.paths, analyses, args.workers,
+                                       preview_dir=args.preview_dir, report=report):
+            label = os.path.basename(result.path) + (f" p{result.page + 1}" if result.page >= 0 else "")
+            if result.error:
+                print(f"   {label}: ERROR {result.error}")
+                continue
+            details = []
+            if "text" in result.results:
+                details.append(f"{len(result.results['text']['rooms'])} rooms")
+            if "vectors" in result.results:
+                details.append(f"{result.results['vectors']['segments']} segments")
+            if "preview" in result.results:
+                preview = result.results["preview"]
+                details.append(f"{preview['width']}×{preview['height']} preview")
+            print(f"   {label}: {', '.join(details)} ({result.seconds:.2f} s)")
+    except ImportError:
+        print("\nPyMuPDF not installed for PDF support.")
+        print("Install with: pip install pymupdf")
+        sys.exit(1)
+
+    print("\n" + "="*60)
+    print(report.summary())
+    print("="*60)
@@ -0,0 +1,350 @@
+"""
+Owen Moloney
+Pricing Rules
+Surcharges, premiums, discounts and minimum charges on top of the calculated
+job cost, declared in a JSON rules file instead of code:
+
+    [
+      {"name": "Stairs", "type": "per_unit", "quantity": "stair_treads", "rate": 45},
+      {"name": "Herringbone premium", "type": "percent", "of": "labor_cost", "percent": 20,
+       "when": {"pattern": "herringbone"}},
+      {"name": "Volume discount", "type": "tiered_percent", "measure": "usable_sqft",
+       "tiers": [[1000, -3], [2500, -5], [5000, -8]]},
+      {"name": "Minimum job charge", "type": "minimum", "amount": 1500}
+    ]
+
+Rules apply in order to a running subtotal. Each rule is compiled once into a
+plain function for single jobs and a NumPy function for whole batches, so a
+batch is re-priced with one array operation per rule rather than per job.
+Names a rule uses that are not job costs (stair_treads, pattern) are job
+extras the user is asked for.
+"""
+
+import json
+import operator
+import os
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from main import FlooringJob
+
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pricing_rules.json")
+
+# Values every job provides; anything else a rule refers to is a job extra
+JOB_MEASURES = ("usable_sqft", "rooms", "employees", "days_required",
+                "material_cost", "labor_cost", "sanding_cost", "total_cost")
+
+RULE_TYPES = ("fixed", "per_unit", "percent", "tiered_percent", "minimum")
+
+_COMPARISONS = {
+    "==": operator.eq, "!=": operator.ne,
+    ">": operator.gt, ">=": operator.ge,
+    "<": operator.lt, "<=": operator.le,
+}
+
+
+def job_measures(job: FlooringJob, breakdown: Optional[dict] = None) -> dict:
+    """The values rules can refer to for one job (from breakdown when already computed)"""
+    if breakdown is None:
+        breakdown = {"total_floor_space_sqft": job.get_total_floor_space(),
+                     "material_cost": job.calculate_material_cost(),
+                     "labor_cost": job.calculate_labor_cost(),
+                     "sanding_cost": job.calculate_sanding_cost()}
+    material = breakdown["material_cost"]
+    labor = breakdown["labor_cost"]
+    sanding = breakdown["sanding_cost"]
+    values = {
+        "usable_sqft": breakdown["total_floor_space_sqft"],
+        "rooms": job.room_count(),
+        "employees": len(job.employees),
+        "days_required": job.days_required,
+        "material_cost": material,
+        "labor_cost": labor,
+        "sanding_cost": sanding,
+        "total_cost": material + labor + sanding,
+    }
+    values.update(job.extras)
+    return values
+
+
+@dataclass
+class CompiledRule:
+    """One rule as ready-to-call functions"""
+    name: str
+    # (values, subtotal) -> adjustment
+    apply: Callable[[dict, float], float]
+    # (columns, subtotal array) -> adjustment array
+    apply_batch: Callable
+
+
+@dataclass
+class RuledQuote:
+    """Calculated cost plus the rule adjustments"""
+    base_total: float
+    adjustments: List[Tuple[str, float]]
+    total: float
+
+
+@dataclass
+class RuleSet:
+    """Compiled rules and the job extras they need"""
+    rules: List[CompiledRule]
+    # extra name -> "number" or "text"
+    inputs: Dict[str, str] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def price(self, job: FlooringJob, breakdown: Optional[dict] = None) -> RuledQuote:
+        values = job_measures(job, breakdown)
+        for name, kind in self.inputs.items():
+            values.setdefault(name, 0.0 if kind == "number" else "")
+        subtotal = values["total_cost"]
+        adjustments = []
+        for rule in self.rules:
+            amount = rule.apply(values, subtotal)
+            if amount:
+                adjustments.append((rule.name, amount))
+                subtotal += amount
+        return RuledQuote(values["total_cost"], adjustments, subtotal)
+
+    def batch_columns(self, jobs: List[FlooringJob]) -> dict:
+        """
+        NumPy column per value the rules use, for price_columns. Build this
+        once per batch; re-pricing after a rule change only needs the rules.
+        """
+        import numpy as np
+
+        rows = [job_measures(job) for job in jobs]
+        columns = {name: np.array([row[name] for row in rows], dtype=float) for name in JOB_MEASURES}
+        for name, kind in self.inputs.items():
+            if kind == "number":
+                columns[name] = np.array([float(row.get(name) or 0.0) for row in rows])
+            else:
+                # Normalised here once, the way conditions compare text
+                columns[name] = np.array([str(row.get(name, "")).strip().lower() for row in rows], dtype=object)
+        return columns
+
+    def price_batch(self, jobs: List[FlooringJob]) -> dict:
+        """
+        Price many jobs at once. Returns NumPy arrays: 'base_total', 'total'
+        and one array of adjustments per rule name.
+        """
+        return self.price_columns(self.batch_columns(jobs))
+
+    def price_columns(self, columns: dict) -> dict:
+        """price_batch for columns already built by batch_columns"""
+        import numpy as np
+
+        subtotal = columns["total_cost"].copy()
+        result = {"base_total": columns["total_cost"]}
+        for rule in self.rules:
+            amount = np.broadcast_to(rule.apply_batch(columns, subtotal), subtotal.shape)
+            result[rule.name] = amount
+            subtotal = subtotal + amount
+        result["total"] = subtotal
+        return result
+
+
+def _require(spec: dict, key: str, number: bool = False):
+    if key not in spec:
+        raise ValueError(f"Rule '{spec.get('name', '?')}' needs '{key}'")
+    value = spec[key]
+    if number:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Rule '{spec.get('name', '?')}': '{key}' must be a number")
+    return value
+
+
+def _base(spec: dict, name: str) -> str:
+    """What a percentage is taken of: the running subtotal or a job measure"""
+    base = spec.get("of", "subtotal")
+    if base != "subtotal" and base not in JOB_MEASURES:
+        raise ValueError(f"Rule '{name}': 'of' must be subtotal or one of {', '.join(JOB_MEASURES)}")
+    return base
+
+
+def _tiers(spec: dict, name: str) -> List[Tuple[float, float]]:
+    """[[from, percent], ...] as sorted (threshold, fraction) pairs"""
+    tiers = _require(spec, "tiers")
+    try:
+        return sorted((float(low), float(percent) / 100) for low, percent in tiers)
+    except (TypeError, ValueError):
+        raise ValueError(f"Rule '{name}': 'tiers' must be a list of [from, percent] number pairs")
+
+
+def _compile_condition(spec: dict, inputs: Dict[str, str]):
+    """(single, batch) predicates for a rule's 'when', or (None, None)"""
+    when = spec.get("when")
+    if not when:
+        return None, None
+    tests = []
+    for name, expected in when.items():
+        if isinstance(expected, dict):
+            for symbol, value in expected.items():
+                if symbol not in _COMPARISONS:
+                    raise ValueError(f"Rule '{spec.get('name', '?')}': unknown comparison '{symbol}'")
+                tests.append((name, _COMPARISONS[symbol], value))
+        else:
+            tests.append((name, operator.eq, expected))
+    for name, _, value in tests:
+        if name not in JOB_MEASURES:
+            inputs.setdefault(name, "text" if isinstance(value, str) else "number")
+
+    def _normalise(value):
+        return value.strip().lower() if isinstance(value, str) else value
+
+    tests = [(name, compare, _normalise(value)) for name, compare, value in tests]
+
+    def single(values: dict) -> bool:
+        return all(compare(_normalise(values[name]), value) for name, compare, value in tests)
+
+    def batch(columns: dict):
+        mask = True
+        for name, compare, value in tests:
+            mask = mask & compare(columns[name], value)
+        return mask
+
+    return single, batch
+
+
+def compile_rule(spec: dict, inputs: Dict[str, str]) -> CompiledRule:
+    """Turn one rule spec into functions; raises ValueError for bad specs"""
+    name = spec.get("name") or spec.get("type", "Rule")
+    kind = spec.get("type")
+    if kind not in RULE_TYPES:
+        raise ValueError(f"Rule '{name}': type must be one of {', '.join(RULE_TYPES)}")
+
+    if kind == "fixed":
+        amount = _require(spec, "amount", number=True)
+        single = lambda values, subtotal: amount
+        batch = lambda columns, subtotal: amount
+
+    elif kind == "per_unit":
+        quantity = _require(spec, "quantity")
+        rate = _require(spec, "rate", number=True)
+        if quantity not in JOB_MEASURES:
+            inputs[quantity] = "number"
+        single = lambda values, subtotal: float(values[quantity] or 0.0) * rate
+        batch = lambda columns, subtotal: columns[quantity] * rate
+
+    elif kind == "percent":
+        base = _base(spec, name)
+        fraction = _require(spec, "percent", number=True) / 100
+        if base == "subtotal":
+            single = lambda values, subtotal: subtotal * fraction
+            batch = lambda columns, subtotal: subtotal * fraction
+        else:
+            single = lambda values, subtotal: values[base] * fraction
+            batch = lambda columns, subtotal: columns[base] * fraction
+
+    elif kind == "tiered_percent":
+        measure = spec.get("measure", "usable_sqft")
+        base = _base(spec, name)
+        tiers = _tiers(spec, name)
+        if measure not in JOB_MEASURES:
+            inputs[measure] = "number"
+        thresholds = [low for low, _ in tiers]
+        fractions = [0.0] + [fraction for _, fraction in tiers]
+
+        def fraction_for(value: float) -> float:
+            import bisect
+            return fractions[bisect.bisect_right(thresholds, value)]
+
+        def base_value(values, subtotal):
+            return subtotal if base == "subtotal" else values[base]
+
+        single = lambda values, subtotal: base_value(values, subtotal) * fraction_for(float(values[measure] or 0.0))
+
+        def batch(columns, subtotal):
+            import numpy as np
+            picked = np.asarray(fractions)[np.searchsorted(thresholds, columns[measure], side="right")]
+            return base_value(columns, subtotal) * picked
+
+    else:  # minimum
+        amount = _require(spec, "amount", number=True)
+        single = lambda values, subtotal: max(0.0, amount - subtotal)
+
+        def batch(columns, subtotal):
+            import numpy as np
+            return np.maximum(0.0, amount - subtotal)
+
+    condition, batch_condition = _compile_condition(spec, inputs)
+    if condition is not None:
+        unconditional, unconditional_batch = single, batch
+        single = lambda values, subtotal: unconditional(values, subtotal) if condition(values) else 0.0
+
+        def batch(columns, subtotal):
+            import numpy as np
+            return np.where(batch_condition(columns), unconditional_batch(columns, subtotal), 0.0)
+
+    return CompiledRule(name, single, batch)
+
+
+def compile_rules(specs: List[dict]) -> RuleSet:
+    """Compile a list of rule specs (in the order they apply)"""
+    inputs: Dict[str, str] = {}
+    rules = [compile_rule(spec, inputs) for spec in specs]
+    return RuleSet(rules, inputs)
+
+
+def load_rules(path: str = DEFAULT_RULES_PATH) -> RuleSet:
+    """Load and compile a rules file; raises ValueError for bad rules"""
+    with open(path, encoding="utf-8") as f:
+        try:
+            specs = json.load(f)
+        except ValueError as e:
+            raise ValueError(f"Not valid JSON: {e}")
+    if isinstance(specs, dict):
+        specs = specs.get("rules", [])
+    return compile_rules(specs)
+
+
+def load_default_rules() -> Optional[RuleSet]:
+    """The rules file next to the program, or None if there isn't a usable one"""
+    if not os.path.exists(DEFAULT_RULES_PATH):
+        return None
+    try:
+        return load_rules(DEFAULT_RULES_PATH)
+    except (OSError, ValueError) as e:
+        print(f"\nCould not load pricing rules: {e}")
+        return None
+
+
+def input_label(name: str) -> str:
+    """'stair_treads' -> 'Stair treads'"""
+    return name.replace("_", " ").capitalize()
+
+
+def prompt_rule_inputs(rules: RuleSet) -> dict:
+    """Terminal: ask for the job extras the rules refer to"""
+    if not rules.inputs:
+        return {}
+    print("\nPricing rule details (press Enter to skip):")
+    extras = {}
+    for name, kind in rules.inputs.items():
+        while True:
+            answer = input(f"   {input_label(name)}: ").strip()
+            if kind == "text" or not answer:
+                extras[name] = answer if kind == "text" else 0.0
+                break
+            try:
+                extras[name] = float(answer)
+                break
+            except ValueError:
+                print("Invalid input. Please enter a number.")
+    return extras
+
+
+def print_rule_adjustments(quote: RuledQuote):
+    """Report section listing the adjustments and the quoted price"""
+    print(f"\nPRICING RULES:")
+    if not quote.adjustments:
+        print("   (no rules apply to this job)")
+    for name, amount in quote.adjustments:
+        sign = "-" if amount < 0 else "+"
+        print(f"   {name + ':':<21}{sign}${abs(amount):,.2f}")
+    print(f"\n   QUOTED PRICE:        ${quote.total:,.2f}")
@@ -0,0 +1,143 @@
+"""
+Owen Moloney
+Quick Room Entry
+Compact one-line syntax for the terminal room prompts, so a whole block of
+rooms can be typed or pasted at once:
+
+    Kitchen 12'6x14 -island 3x6 -pantry 4x4
+    Living Room 20x12 -fireplace 20
+    Hall 180sf; Bath 8x10
+
+Room sizes are Length x Width or an area ending in sf / sq ft. Obstacles
+follow as -name size, where size may also be a plain number of sq ft.
+"""
+
+import re
+from typing import List, Tuple
+
+from main import Room, Obstacle
+from dimensions import parse_length
+
+
+_LENGTH = r"""\d[\d.'"-]*"""
+_SIZE = rf"""(?:(?P<length>{_LENGTH})\s*[xX×*]\s*(?P<width>{_LENGTH})|(?P<sqft>\d+(?:\.\d+)?)\s*(?:sf|sq\.?\s*ft|sqft))"""
+
+_ROOM = re.compile(rf"^(?P<name>.+?)\s+{_SIZE}(?P<obstacles>(?:\s+-.*)?)$", re.IGNORECASE)
+_OBSTACLE = re.compile(rf"^(?P<name>.+?)\s+(?:{_SIZE}|(?P<plain>\d+(?:\.\d+)?))$", re.IGNORECASE)
+_OBSTACLE_SPLIT = re.compile(r"\s+-(?=[^\d\s])")
+
+
+def _size_from(match) -> float:
+    """Area in sq ft from a match of _SIZE"""
+    if match.group("sqft") is not None:
+        return float(match.group("sqft"))
+    if "plain" in match.re.groupindex and match.group("plain") is not None:
+        return float(match.group("plain"))
+    return parse_length(match.group("length")) * parse_length(match.group("width"))
+
+
+def looks_like_room_line(text: str) -> bool:
+    """True if text is quick-entry syntax rather than a plain room name"""
+    return any(_ROOM.match(part.strip()) for part in text.split(";") if part.strip())
+
+
+def parse_obstacle(text: str) -> Obstacle:
+    """Parse one obstacle ('island 3x6', 'fireplace 20'); raises ValueError"""
+    match = _OBSTACLE.match(text.strip().lstrip("-").strip())
+    if not match:
+        raise ValueError(f"expected '-name size' for obstacle, got '-{text.strip()}'")
+    try:
+        return Obstacle(match.group("name").strip(), _size_from(match))
+    except ValueError:
+        raise ValueError(f"bad obstacle size in '-{text.strip()}'")
+
+
+def parse_room_line(text: str) -> Room:
+    """Parse one room; raises ValueError with a readable message"""
+    match = _ROOM.match(text.strip())
+    if not match:
+        raise ValueError(f"expected 'Name LxW' or 'Name 150sf', got '{text.strip()}'")
+    try:
+        room = Room(match.group("name").strip(), _size_from(match))
+    except ValueError:
+        raise ValueError(f"bad room size in '{text.strip()}'")
+
+    obstacle_text = match.group("obstacles").strip()
+    if obstacle_text:
+        for part in _OBSTACLE_SPLIT.split(" " + obstacle_text)[1:]:
+            room.obstacles.append(parse_obstacle(part))
+
+    if room.total_area_sqft <= 0:
+        raise ValueError(f"{room.name}: area must be positive")
+    if room.get_usable_area() < 0:
+        raise ValueError(f"{room.name}: obstacles are larger than the room")
+    return room
+
+
+def parse_room_block(text: str) -> Tuple[List[Room], List[str]]:
+    """
+    Parse every room in a block (one per line or separated by ';').
+    Returns (rooms, errors); all errors are collected, not just the first.
+    """
+    rooms = []
+    errors = []
+    for line_number, line in enumerate(text.splitlines(), 1):
+        for part in line.split(";"):
+            if not part.strip():
+                continue
+            try:
+                rooms.append(parse_room_line(part))
+            except ValueError as e:
+                errors.append(f"Line {line_number}: {e}")
+    return rooms, errors
+
+
+def read_block(first_line: str) -> str:
+    """Collect pasted lines after first_line until a blank line or 'done'"""
+    lines = [first_line]
+    while True:
+        try:
+            line = input()
+        except EOFError:
+            break
+        if not line.strip() or line.strip().lower() == 'done':
+            break
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def review_rooms(rooms: List[Room]) -> bool:
+    """One combined review screen for a block of rooms"""
+    print("\n" + "="*60)
+    print(f"REVIEW {len(rooms)} ROOMS")
+    print("="*60)
+    for i, room in enumerate(rooms, 1):
+        print(f"   {i}. {room.name}: {room.total_area_sqft:.2f} sq ft total, "
+              f"{room.get_usable_area():.2f} sq ft usable")
+        for obs in room.obstacles:
+            print(f"        - {obs.name}: {obs.area_sqft:.2f} sq ft")
+    total = sum(room.get_usable_area() for room in rooms)
+    print(f"\n   Total usable: {total:.2f} sq ft")
+
+    while True:
+        confirm = input("\nAdd these rooms? (yes/no): ").strip().lower()
+        if confirm in ['yes', 'y']:
+            return True
+        elif confirm in ['no', 'n']:
+            return False
+        else:
+            print("Please enter 'yes' or 'no'.")
+
+
+def get_rooms_from_block(first_line: str) -> List[Room]:
+    """Read, validate and review a pasted block; returns the accepted rooms"""
+    rooms, errors = parse_room_block(read_block(first_line))
+    if errors:
+        print(f"\n{len(errors)} problem(s) found, no rooms added:")
+        for message in errors:
+            print(f"   {message}")
+        print("Fix the lines above and paste the block again.")
+        return []
+    if not rooms or not review_rooms(rooms):
+        return []
+    return rooms
@@ -0,0 +1,277 @@
+"""
+Owen Moloney
+Quote Revision Diff
+Answers "what changed since the last quote?" by comparing two revisions of
+a FlooringJob: rooms, their obstacles and the crew are matched by name and
+every change is reported with its effect on the cost components.
+
+Only changed rooms are looked into. The GUI's "Last saved version"
+comparison diffs a tab against the snapshot it was opened or saved as,
+which shares the structure of its room list (see history.py), so
+splice_from finds the changed stretch without visiting the rest and only
+the rooms inside it are matched up: a diff of a 5,000-room job costs little
+more than the rooms that actually changed. Revisions with nothing in common
+(another tab, or two job files) are matched room by room, which takes tens
+of milliseconds for thousands of rooms.
+"""
+
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from main import FlooringJob, Room, WASTE_FACTOR, HOURS_PER_DAY, load_job
+from history import PersistentList
+
+
+@dataclass
+class ObstacleChange:
+    name: str
+    status: str  # added / removed / changed
+    old_area: float = 0.0
+    new_area: float = 0.0
+
+
+@dataclass
+class RoomChange:
+    name: str
+    status: str  # added / removed / changed
+    old_total: float = 0.0
+    new_total: float = 0.0
+    old_usable: float = 0.0
+    new_usable: float = 0.0
+    obstacles: List[ObstacleChange] = field(default_factory=list)
+
+    @property
+    def usable_delta(self) -> float:
+        return self.new_usable - self.old_usable
+
+
+@dataclass
+class CrewChange:
+    name: str
+    status: str  # added / removed / changed
+    old_rate: float = 0.0
+    new_rate: float = 0.0
+
+
+@dataclass
+class QuoteDiff:
+    """Everything that differs between two revisions"""
+    rooms: List[RoomChange] = field(default_factory=list)
+    crew: List[CrewChange] = field(default_factory=list)
+    # (label, old value, new value) for days, rates, fees and wood source
+    parameters: List[Tuple[str, object, object]] = field(default_factory=list)
+    # component -> (old cost, new cost) for material, labor, sanding and total
+    components: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.rooms or self.crew or self.parameters)
+
+
+def _key(item) -> Tuple[str, str]:
+    # Rooms are told apart by location too ("Kitchen" in every unit)
+    return getattr(item, "location", "").strip().lower(), item.name.strip().lower()
+
+
+def _group_by_name(items) -> Dict[Tuple[str, str], List[int]]:
+    groups: Dict[Tuple[str, str], List[int]] = {}
+    for i, item in enumerate(items):
+        groups.setdefault(_key(item), []).append(i)
+    return groups
+
+
+def _match(old_items, new_items):
+    """
+    Pair items by name and location (case-insensitive; repeated names pair
+    up in order). Returns (pairs of (old, new), unmatched old, unmatched new).
+    """
+    available = _group_by_name(old_items)
+    pairs = []
+    added = []
+    for item in new_items:
+        candidates = available.get(_key(item))
+        if candidates:
+            pairs.append((old_items[candidates.pop(0)], item))
+        else:
+            added.append(item)
+    removed = [old_items[i] for indices in available.values() for i in indices]
+    return pairs, removed, added
+
+
+def _diff_obstacles(old: Room, new: Room) -> List[ObstacleChange]:
+    pairs, removed, added = _match(old.obstacles, new.obstacles)
+    changes = [ObstacleChange(a.name, "changed", a.area_sqft, b.area_sqft)
+               for a, b in pairs if a.area_sqft != b.area_sqft]
+    changes += [ObstacleChange(o.name, "removed", old_area=o.area_sqft) for o in removed]
+    changes += [ObstacleChange(o.name, "added", new_area=o.area_sqft) for o in added]
+    return changes
+
+
+def _room_name(room: Room) -> str:
+    return f"{room.location} / {room.name}" if room.location else room.name
+
+
+def diff_rooms(old_rooms, new_rooms) -> List[RoomChange]:
+    if isinstance(old_rooms, PersistentList) and isinstance(new_rooms, PersistentList):
+        # Only the stretch between the shared start and end can differ
+        start, removed_count, inserted = new_rooms.splice_from(old_rooms)
+        old_rooms, new_rooms = old_rooms[start:start + removed_count], inserted
+    pairs, removed, added = _match(list(old_rooms), list(new_rooms))
+    changes = []
+    for old, new in pairs:
+        # Shared or equal rooms are unchanged; nothing below them is visited
+        if old is new or old == new:
+            continue
+        changes.append(RoomChange(_room_name(new), "changed", old.total_area_sqft, new.total_area_sqft,
+                                  old.get_usable_area(), new.get_usable_area(), _diff_obstacles(old, new)))
+    for room in removed:
+        changes.append(RoomChange(_room_name(room), "removed", old_total=room.total_area_sqft,
+                                  old_usable=room.get_usable_area()))
+    for room in added:
+        changes.append(RoomChange(_room_name(room), "added", new_total=room.total_area_sqft,
+                                  new_usable=room.get_usable_area(),
+                                  obstacles=[ObstacleChange(o.name, "added", new_area=o.area_sqft)
+                                             for o in room.obstacles]))
+    return changes
+
+
+def diff_crew(old_employees, new_employees) -> List[CrewChange]:
+    pairs, removed, added = _match(list(old_employees), list(new_employees))
+    changes = [CrewChange(b.name, "changed", a.hourly_rate, b.hourly_rate)
+               for a, b in pairs if a.hourly_rate != b.hourly_rate]
+    changes += [CrewChange(e.name, "removed", old_rate=e.hourly_rate) for e in removed]
+    changes += [CrewChange(e.name, "added", new_rate=e.hourly_rate) for e in added]
+    return changes
+
+
+PARAMETER_LABELS = (
+    ("days_required", "Days required"),
+    ("sanding_cost_per_sqft", "Sanding $/sq ft"),
+    ("material_cost_per_sqft", "Material $/sq ft"),
+    ("customer_provides_wood", "Customer provides wood"),
+    ("pickup_fee", "Pickup fee"),
+)
+
+
+def _components(job: FlooringJob, usable: float, hourly: float) -> Dict[str, float]:
+    """Cost components from pre-summed area and crew rate (same maths as FlooringJob)"""
+    material = 0.0
+    if not job.customer_provides_wood:
+        material = usable * WASTE_FACTOR * job.material_cost_per_sqft + job.pickup_fee
+    labor = hourly * job.days_required * HOURS_PER_DAY
+    sanding = usable * job.sanding_cost_per_sqft
+    return {"material": material, "labor": labor, "sanding": sanding, "total": material + labor + sanding}
+
+
+def describe_units(job: FlooringJob) -> str:
+    """'Type A × 120, Type B × 40' (or 'none')"""
+    return ", ".join(f"{p.prototype.name} × {p.count}" for p in job.units) or "none"
+
+
+def diff_jobs(old: FlooringJob, new: FlooringJob, old_usable: Optional[float] = None) -> QuoteDiff:
+    """
+    Compare two revisions. old_usable (e.g. from a cached cost summary)
+    saves re-summing the old revision's area; the new revision's area is
+    then worked out from the changed rooms alone.
+    """
+    diff = QuoteDiff()
+    diff.rooms = diff_rooms(old.rooms, new.rooms)
+    diff.crew = diff_crew(old.employees, new.employees)
+    diff.parameters = [(label, getattr(old, name), getattr(new, name))
+                       for name, label in PARAMETER_LABELS if getattr(old, name) != getattr(new, name)]
+    for name in sorted(set(old.extras) | set(new.extras)):
+        if old.extras.get(name) != new.extras.get(name):
+            diff.parameters.append((name.replace("_", " ").capitalize(), old.extras.get(name), new.extras.get(name)))
+
+    if old_usable is None:
+        old_usable = old.get_total_floor_space()
+    new_usable = old_usable + sum(change.usable_delta for change in diff.rooms)
+    if list(old.units) != list(new.units):
+        diff.parameters.append(("Repeated units", describe_units(old), describe_units(new)))
+        new_usable += (sum(p.get_usable_area() for p in new.units)
+                       - sum(p.get_usable_area() for p in old.units))
+    old_hourly = sum(e.hourly_rate for e in old.employees)
+    new_hourly = old_hourly + sum(change.new_rate - change.old_rate for change in diff.crew)
+
+    before = _components(old, old_usable, old_hourly)
+    after = _components(new, new_usable, new_hourly)
+    diff.components = {name: (before[name], after[name]) for name in before}
+    return diff
+
+
+def _money(delta: float) -> str:
+    return f"{'-' if delta < 0 else '+'}${abs(delta):,.2f}"
+
+
+def format_diff(diff: QuoteDiff) -> List[str]:
+    """Report lines for a diff"""
+    if not diff.has_changes:
+        return ["No changes between the two quotes."]
+
+    lines = ["COST CHANGES:"]
+    for name, (before, after) in diff.components.items():
+        if abs(after - before) > 0.005 or name == "total":
+            lines.append(f"   {name.capitalize() + ':':<11}${before:>12,.2f} -> ${after:>12,.2f}  ({_money(after - before)})")
+
+    if diff.parameters:
+        lines.append("")
+        lines.append("JOB PARAMETERS:")
+        for label, before, after in diff.parameters:
+            lines.append(f"   {label}: {before} -> {after}")
+
+    if diff.rooms:
+        lines.append("")
+        lines.append(f"ROOMS ({len(diff.rooms)} changed):")
+        for change in diff.rooms:
+            if change.status == "added":
+                lines.append(f"   + {change.name}: {change.new_usable:.2f} sq ft usable")
+            elif change.status == "removed":
+                lines.append(f"   - {change.name}: {change.old_usable:.2f} sq ft usable")
+            else:
+                area = ""
+                if change.old_total != change.new_total:
+                    area = f" (total {change.old_total:.2f} -> {change.new_total:.2f})"
+                lines.append(f"   ~ {change.name}: {change.old_usable:.2f} -> {change.new_usable:.2f} "
+                             f"sq ft usable{area}")
+            for obstacle in change.obstacles:
+                if obstacle.status == "added":
+                    lines.append(f"       + obstacle {obstacle.name}: {obstacle.new_area:.2f} sq ft")
+                elif obstacle.status == "removed":
+                    lines.append(f"       - obstacle {obstacle.name}: {obstacle.old_area:.2f} sq ft")
+                else:
+                    lines.append(f"       ~ obstacle {obstacle.name}: {obstacle.old_area:.2f} -> "
+                                 f"{obstacle.new_area:.2f} sq ft")
+
+    if diff.crew:
+        lines.append("")
+        lines.append("CREW:")
+        for change in diff.crew:
+            if change.status == "added":
+                lines.append(f"   + {change.name}: ${change.new_rate:.2f}/hour")
+            elif change.status == "removed":
+                lines.append(f"   - {change.name}: ${change.old_rate:.2f}/hour")
+            else:
+                lines.append(f"   ~ {change.name}: ${change.old_rate:.2f} -> ${change.new_rate:.2f}/hour")
+    return lines
+
+
+def print_quote_diff(diff: QuoteDiff):
+    print("\n" + "="*60)
+    print("           WHAT CHANGED SINCE THE LAST QUOTE")
+    print("="*60 + "\n")
+    for line in format_diff(diff):
+        print(line)
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python quote_diff.py old.job.json new.job.json")
+        sys.exit(1)
+    try:
+        old_job, new_job = load_job(sys.argv[1]), load_job(sys.argv[2])
+    except (OSError, ValueError) as e:
+        print(f"\nCould not load job: {e}")
+        sys.exit(1)
+    print_quote_diff(diff_jobs(old_job, new_job))
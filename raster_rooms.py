@@ -0,0 +1,268 @@
+"""
+Owen Moloney
+Scanned Blueprint Room Detection
+Finds the rooms on a scanned plan (PNG/JPG, no vector data) with NumPy:
+
+1. The scan is reduced to about one pixel per inch of floor (JPEGs are
+   decoded straight at that size), which keeps memory bounded.
+2. Dark ink is separated from paper with Otsu's threshold; thin ink (text,
+   dimension lines) is removed and door openings are closed by thickening
+   the walls.
+3. Enclosed regions are labelled with run-length connected components, then
+   grown back to the wall faces, and pixel counts become square feet using
+   the scale the user set.
+
+Regions touching the edge of the scan (the outside) and tiny regions are
+dropped; the rest come back as candidate rooms.
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+
+from main import Room
+
+
+# Working resolution: about one pixel per inch of floor
+TARGET_PIXELS_PER_FOOT = 12.0
+
+# Upper bound on the working image, whatever the scale
+MAX_WORK_PIXELS = 12_000_000
+
+DOOR_GAP_FT = 3.5        # openings up to this wide are closed
+MIN_WALL_INCHES = 3.0    # ink thinner than this is not a wall
+MIN_ROOM_SQFT = 20.0
+
+
+@dataclass
+class RegionCandidate:
+    """One enclosed region found on a scan"""
+    name: str
+    area_sqft: float
+    bbox: Tuple[int, int, int, int]  # x0, y0, x1, y1 in scan pixels
+
+    def to_room(self) -> Room:
+        return Room(self.name, round(self.area_sqft, 2))
+
+
+def format_region(candidate: RegionCandidate) -> str:
+    x0, y0, x1, y1 = candidate.bbox
+    return f"{candidate.name}: {candidate.area_sqft:.2f} sq ft (at {x0},{y0} - {x1},{y1})"
+
+
+def load_scan(path: str, feet_per_pixel: float) -> Tuple[np.ndarray, float]:
+    """
+    Greyscale working image and the scan pixels per working pixel.
+    Never holds more than the decoded scan plus the (much smaller) result.
+    """
+    from PIL import Image
+
+    img = Image.open(path)
+    width, height = img.size
+    pixels_per_foot = 1 / feet_per_pixel
+    factor = max(1, int(pixels_per_foot / TARGET_PIXELS_PER_FOOT))
+    while (width // factor) * (height // factor) > MAX_WORK_PIXELS:
+        factor += 1
+
+    if img.format == "JPEG" and factor > 1:
+        # Decode at 1/2, 1/4 or 1/8 size directly
+        img.draft("L", (width // factor, height // factor))
+    img = img.convert("L")
+    remaining = max(1, round(img.size[0] / (width / factor)))
+    if remaining > 1:
+        img = img.reduce(remaining)
+    return np.asarray(img), width / img.size[0]
+
+
+def otsu_threshold(gray: np.ndarray) -> int:
+    """Grey level that best separates ink from paper"""
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight_dark = np.cumsum(hist)
+    weight_light = weight_dark[-1] - weight_dark
+    sum_dark = np.cumsum(hist * levels)
+    mean_dark = sum_dark / np.maximum(weight_dark, 1)
+    mean_light = (sum_dark[-1] - sum_dark) / np.maximum(weight_light, 1)
+    between = weight_dark * weight_light * (mean_dark - mean_light) ** 2
+    return int(np.argmax(between))
+
+
+def _max_filter(mask: np.ndarray, radius: int, axis: int) -> np.ndarray:
+    """Boolean dilation by radius along one axis (window doubling: log2 passes)"""
+    if radius <= 0:
+        return mask
+    # Pad in front so out[i] ends up covering mask[i - r .. i + r]
+    pad = [(0, 0), (0, 0)]
+    pad[axis] = (radius, 0)
+    out = np.pad(mask, pad)
+    window = 1
+    length = 2 * radius + 1
+    while window < length:
+        step = min(window, length - window)
+        if axis == 1:
+            out[:, :-step] |= out[:, step:]
+        else:
+            out[:-step] |= out[step:]
+        window += step
+    return out[:, :mask.shape[1]] if axis == 1 else out[:mask.shape[0]]
+
+
+def dilate(mask: np.ndarray, radius: int) -> np.ndarray:
+    """Square dilation (separable)"""
+    return _max_filter(_max_filter(mask, radius, 1), radius, 0)
+
+
+def erode(mask: np.ndarray, radius: int) -> np.ndarray:
+    return ~dilate(~mask, radius)
+
+
+def label_regions(free: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    4-connected labelling of True pixels (labels 1..count, 0 elsewhere).
+    Works on horizontal runs: runs in neighbouring rows that overlap are
+    joined with a vectorised union-find, so the cost follows the number of
+    runs, not pixels.
+    """
+    height, width = free.shape
+    padded = np.zeros((height, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = free
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)  # row-major order pairs ends with starts
+    n = len(rows)
+    labels = np.zeros((height, width), dtype=np.int32)
+    if n == 0:
+        return labels, 0
+
+    # Runs in the row above that overlap each run
+    stride = width + 1
+    start_keys = rows.astype(np.int64) * stride + starts
+    end_keys = rows.astype(np.int64) * stride + ends
+    above = (rows.astype(np.int64) - 1) * stride
+    lo = np.searchsorted(end_keys, above + starts, side="right")
+    hi = np.searchsorted(start_keys, above + ends, side="left")
+    counts = np.maximum(hi - lo, 0)
+    run_b = np.repeat(np.arange(n), counts)
+    run_a = np.repeat(lo, counts) + (np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts))
+
+    # Union-find: hook roots onto the smaller root, then jump pointers
+    parent = np.arange(n)
+    while len(run_a):
+        root_a, root_b = parent[run_a], parent[run_b]
+        differ = root_a != root_b
+        if not differ.any():
+            break
+        np.minimum.at(parent, np.maximum(root_a, root_b)[differ], np.minimum(root_a, root_b)[differ])
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+    _, component = np.unique(parent, return_inverse=True)
+    lengths = ends - starts
+    flat_starts = rows.astype(np.int64) * width + starts
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    labels.ravel()[np.repeat(flat_starts, lengths) + offsets] = np.repeat(component + 1, lengths)
+    return labels, int(component.max()) + 1
+
+
+def grow_labels(labels: np.ndarray, allowed: np.ndarray, steps: int) -> np.ndarray:
+    """Spread labels into unlabelled allowed pixels, one pixel per step"""
+    for _ in range(steps):
+        grew = False
+        # (target, source) slices for each of the 4 neighbours
+        for target, source in (((slice(1, None),), (slice(None, -1),)),
+                               ((slice(None, -1),), (slice(1, None),)),
+                               ((slice(None), slice(1, None)), (slice(None), slice(None, -1))),
+                               ((slice(None), slice(None, -1)), (slice(None), slice(1, None)))):
+            here = labels[target]
+            neighbour = labels[source]
+            take = (here == 0) & allowed[target] & (neighbour > 0)
+            if take.any():
+                here[take] = neighbour[take]
+                grew = True
+        if not grew:
+            break
+    return labels
+
+
+def segment_scan(path: str, feet_per_pixel: float, door_gap_ft: float = DOOR_GAP_FT,
+                 min_wall_inches: float = MIN_WALL_INCHES,
+                 min_room_sqft: float = MIN_ROOM_SQFT) -> List[RegionCandidate]:
+    """Candidate rooms on a scanned plan; feet_per_pixel is the scan's scale"""
+    if feet_per_pixel <= 0:
+        raise ValueError("Scale must be positive")
+    gray, factor = load_scan(path, feet_per_pixel)
+    feet_per_work_pixel = feet_per_pixel * factor
+
+    ink = gray < otsu_threshold(gray)
+    thin_radius = max(0, int(min_wall_inches / 12 / feet_per_work_pixel / 2))
+    door_radius = max(1, int(door_gap_ft / feet_per_work_pixel / 2) + 1)
+
+    walls = dilate(erode(ink, thin_radius), thin_radius) if thin_radius else ink
+    del ink
+    closed = dilate(walls, door_radius)
+    labels, count = label_regions(~closed)
+    del closed
+    labels = grow_labels(labels, ~walls, door_radius + 1)
+
+    # The outside of the building touches the edge of the scan
+    border = np.unique(np.concatenate([labels[0], labels[-1], labels[:, 0], labels[:, -1]]))
+    pixel_counts = np.bincount(labels.ravel(), minlength=count + 1)
+    ys, xs = np.nonzero(labels)
+    region_of = labels[ys, xs]
+    x_min = np.full(count + 1, labels.shape[1])
+    y_min = np.full(count + 1, labels.shape[0])
+    x_max = np.zeros(count + 1, dtype=np.int64)
+    y_max = np.zeros(count + 1, dtype=np.int64)
+    np.minimum.at(x_min, region_of, xs)
+    np.minimum.at(y_min, region_of, ys)
+    np.maximum.at(x_max, region_of, xs)
+    np.maximum.at(y_max, region_of, ys)
+
+    candidates = []
+    for region in range(1, count + 1):
+        if region in border:
+            continue
+        area = pixel_counts[region] * feet_per_work_pixel ** 2
+        if area < min_room_sqft:
+            continue
+        bbox = (int(x_min[region] * factor), int(y_min[region] * factor),
+                int((x_max[region] + 1) * factor), int((y_max[region] + 1) * factor))
+        candidates.append(RegionCandidate("", float(area), bbox))
+
+    # Reading order: top to bottom, then left to right
+    candidates.sort(key=lambda c: (c.bbox[1] // 50, c.bbox[0]))
+    for i, candidate in enumerate(candidates, 1):
+        candidate.name = f"Room {i}"
+    return candidates
+
+
+def feet_per_pixel_from(dpi: float, inches_per_foot: float) -> float:
+    """Scale of a scan: dpi of the scan and the drawing scale (0.25 for 1/4\" = 1')"""
+    return 1 / (dpi * inches_per_foot)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find rooms on a scanned blueprint")
+    parser.add_argument("scan", help="PNG or JPG scan")
+    parser.add_argument("--feet-per-pixel", type=float, help="scale of the scan")
+    parser.add_argument("--dpi", type=float, default=300, help="scan resolution (default 300)")
+    parser.add_argument("--drawing-scale", type=float, default=0.25,
+                        help="inches on paper per foot (default 0.25, i.e. 1/4\" = 1')")
+    parser.add_argument("--door-gap", type=float, default=DOOR_GAP_FT, help="widest opening to close (ft)")
+    args = parser.parse_args()
+
+    scale = args.feet_per_pixel or feet_per_pixel_from(args.dpi, args.drawing_scale)
+    try:
+        regions = segment_scan(args.scan, scale, door_gap_ft=args.door_gap)
+    except (OSError, ValueError) as e:
+        print(f"\nCould not process scan: {e}")
+        sys.exit(1)
+    for region in regions:
+        print(f"   {format_region(region)}")
+    print(f"\n{len(regions)} rooms, {sum(r.area_sqft for r in regions):.2f} sq ft")
@@ -0,0 +1,178 @@
+"""
+Owen Moloney
+Monte Carlo Risk Pricing
+Turns a single FlooringJob estimate into a cost range (P50/P80/P90) by
+sampling the uncertain inputs: days required, waste factor and the per sq ft
+sanding and material rates. All samples are priced at once with NumPy, so a
+million-sample run takes a fraction of a second.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from main import FlooringJob, WASTE_FACTOR, HOURS_PER_DAY
+
+
+DEFAULT_SAMPLES = 1_000_000
+REPORT_PERCENTILES = (10, 50, 80, 90)
+
+# Samples priced per NumPy pass (keeps memory flat for very large runs)
+_CHUNK = 1_000_000
+
+
+@dataclass
+class Fixed:
+    """No uncertainty"""
+    value: float
+
+    def sample(self, rng, n: int):
+        return np.full(n, float(self.value))
+
+
+@dataclass
+class Uniform:
+    """Anything between low and high is equally likely"""
+    low: float
+    high: float
+
+    def sample(self, rng, n: int):
+        return rng.uniform(self.low, self.high, n)
+
+
+@dataclass
+class Triangular:
+    """Best guess (mode) with a pessimistic and optimistic bound"""
+    low: float
+    mode: float
+    high: float
+
+    def sample(self, rng, n: int):
+        if self.low == self.high:
+            return np.full(n, float(self.mode))
+        return rng.triangular(self.low, self.mode, self.high, n)
+
+
+@dataclass
+class Normal:
+    """Bell curve, clipped at low (default 0) so costs never go negative"""
+    mean: float
+    std: float
+    low: float = 0.0
+
+    def sample(self, rng, n: int):
+        return np.maximum(rng.normal(self.mean, self.std, n), self.low)
+
+
+@dataclass
+class Uncertainty:
+    """Distributions for the job inputs that are not known exactly"""
+    days: object
+    waste_factor: object
+    sanding_cost_per_sqft: object
+    material_cost_per_sqft: object
+    whole_days: bool = True
+
+
+def default_uncertainty(job: FlooringJob) -> Uncertainty:
+    """
+    Typical spreads around the job's own numbers: jobs run over far more
+    often than they finish early, waste runs 5-20%, and rates move ±10-15%.
+    """
+    days = job.days_required
+    sanding = job.sanding_cost_per_sqft
+    material = job.material_cost_per_sqft
+    return Uncertainty(
+        days=Triangular(days * 0.9, days, days * 1.5),
+        waste_factor=Triangular(1.05, WASTE_FACTOR, 1.20),
+        sanding_cost_per_sqft=Triangular(sanding * 0.9, sanding, sanding * 1.1),
+        material_cost_per_sqft=Triangular(material * 0.85, material, material * 1.15),
+    )
+
+
+@dataclass
+class RiskQuote:
+    """Result of a simulation"""
+    samples: int
+    base_cost: float
+    mean: float
+    std: float
+    percentiles: Dict[int, float]
+    # Share of simulated outcomes that cost more than the single estimate
+    probability_over_base: float = 0.0
+    histogram_counts: List[int] = field(default_factory=list)
+    histogram_edges: List[float] = field(default_factory=list)
+
+
+def simulate_costs(job: FlooringJob, uncertainty: Optional[Uncertainty] = None,
+                   samples: int = DEFAULT_SAMPLES, seed: Optional[int] = None):
+    """Array of simulated total costs for the job"""
+    uncertainty = uncertainty or default_uncertainty(job)
+    rng = np.random.default_rng(seed)
+
+    # Inputs that do not vary are reduced to scalars once
+    usable_area = job.get_total_floor_space()
+    hourly_total = sum(employee.hourly_rate for employee in job.employees)
+
+    totals = np.empty(samples)
+    for start in range(0, samples, _CHUNK):
+        n = min(_CHUNK, samples - start)
+        days = uncertainty.days.sample(rng, n)
+        if uncertainty.whole_days:
+            days = np.ceil(days - 1e-9)
+        cost = days * (HOURS_PER_DAY * hourly_total)
+        cost += usable_area * uncertainty.sanding_cost_per_sqft.sample(rng, n)
+        if not job.customer_provides_wood:
+            waste = uncertainty.waste_factor.sample(rng, n)
+            material = uncertainty.material_cost_per_sqft.sample(rng, n)
+            cost += usable_area * waste * material + job.pickup_fee
+        totals[start:start + n] = cost
+    return totals
+
+
+def simulate_job(job: FlooringJob, uncertainty: Optional[Uncertainty] = None,
+                 samples: int = DEFAULT_SAMPLES, bins: int = 40,
+                 seed: Optional[int] = None) -> RiskQuote:
+    """Simulate the job and summarise the cost distribution"""
+    if samples <= 0:
+        raise ValueError("samples must be positive")
+    totals = simulate_costs(job, uncertainty, samples, seed)
+    values = np.percentile(totals, REPORT_PERCENTILES)
+    counts, edges = np.histogram(totals, bins=bins)
+
+    base_cost = job.calculate_total_cost()
+    return RiskQuote(
+        samples=samples,
+        base_cost=base_cost,
+        mean=float(totals.mean()),
+        std=float(totals.std()),
+        percentiles={p: float(v) for p, v in zip(REPORT_PERCENTILES, values)},
+        probability_over_base=float(np.count_nonzero(totals > base_cost + 1e-6) / samples),
+        histogram_counts=counts.tolist(),
+        histogram_edges=edges.tolist(),
+    )
+
+
+def print_risk_report(quote: RiskQuote, width: int = 40):
+    """Print percentiles and a text histogram"""
+    print("\n" + "="*60)
+    print("           COST RISK RANGE (MONTE CARLO)")
+    print("="*60)
+    print(f"\n   Single estimate:     ${quote.base_cost:,.2f}")
+    print(f"   Simulated mean:      ${quote.mean:,.2f}")
+    for p, value in quote.percentiles.items():
+        print(f"   P{p:<2} quote:           ${value:,.2f}")
+    print(f"   Chance of exceeding the single estimate: {quote.probability_over_base * 100:.0f}%")
+
+    counts = quote.histogram_counts
+    edges = quote.histogram_edges
+    peak = max(counts) if counts else 0
+    if peak:
+        print(f"\n   Distribution ({quote.samples:,} samples):")
+        # Merge bins in pairs so the text chart stays short
+        for i in range(0, len(counts), 2):
+            count = sum(counts[i:i + 2])
+            bar = "█" * round(count / (peak * 2) * width)
+            print(f"   ${edges[i]:>12,.0f}  {bar}")
+    print("="*60 + "\n")
@@ -0,0 +1,520 @@
+"""
+Owen Moloney
+Room Grid
+Spreadsheet-style room editor for the GUI: rooms are rows, their obstacles
+are indented rows underneath, and cells are edited in place. One Entry is
+created once and moved over whichever cell is being edited.
+
+Keys: Enter/F2 (or just start typing) edits, Tab/Shift-Tab move across
+cells, Enter commits and moves down, Up/Down commit and move, Esc cancels.
+The blank row at the bottom adds a room, so rooms can be typed one after
+another without the mouse. Insert adds a room, Ctrl+O an obstacle and
+Delete removes the selected rows.
+
+The grid follows the job's PersistentList: after an edit only the rows of
+the rooms that changed are replaced (PersistentList.splice_from).
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from dataclasses import replace
+from typing import Callable, List, Optional
+
+from main import Room, Obstacle
+from history import PersistentList
+from dimensions import parse_area
+from hierarchy import parse_location, format_location
+from quick_entry import looks_like_room_line, parse_room_block
+
+
+# Editable cells per kind of row ("#0" is the Room / obstacle name column)
+EDITABLE = {"room": ["#0", "location", "area"], "obstacle": ["#0", "area"]}
+EDITABLE["draft"] = EDITABLE["room"]
+EDITABLE["draft_obstacle"] = EDITABLE["obstacle"]
+
+HINT = "Enter edit · Tab next cell · Insert new room · Ctrl+O obstacle · Delete remove · Esc cancel"
+
+
+def _area(value: float) -> str:
+    return f"{value:,.2f}"
+
+
+class RoomGrid:
+    """Rooms and obstacles as an editable grid"""
+
+    def __init__(self, parent, commit: Callable[..., None], edit_unit: Callable[[int], None],
+                 remove_unit: Callable[[int], None]):
+        """
+        commit(label, rooms=...) makes an edit (one undo step); edit_unit and
+        remove_unit(index) act on a placed unit line.
+        """
+        self.commit = commit
+        self.edit_unit = edit_unit
+        self.remove_unit = remove_unit
+        self.rooms = PersistentList()
+        self.units = ()
+        self._room_items: List[str] = []  # tree item of each room, in order
+        self._unit_items: List[str] = []
+        self._draft = None                # row being typed in: {"item", "kind", "values"}
+        self._editing = None              # (item, column) under the cell editor
+
+        self.frame = ttk.Frame(parent)
+        self.frame.columnconfigure(0, weight=1)
+        self.frame.rowconfigure(0, weight=1)
+
+        self.tree = ttk.Treeview(self.frame, columns=("location", "area", "obstacles", "usable"), height=8,
+                                 selectmode="extended")
+        for column, heading, width, anchor in [("#0", "Room / obstacle", 170, tk.W),
+                                               ("location", "Location", 110, tk.W),
+                                               ("area", "Area sq ft", 80, tk.E),
+                                               ("obstacles", "Obstacles", 70, tk.E),
+                                               ("usable", "Usable", 80, tk.E)]:
+            self.tree.heading(column, text=heading, anchor=anchor)
+            self.tree.column(column, width=width, minwidth=40, anchor=anchor, stretch=(column == "#0"))
+        self.tree.tag_configure("unit", foreground="#1f4e9c")
+        self.tree.tag_configure("draft", foreground="#808080")
+        self.tree.tag_configure("draft_obstacle", foreground="#808080")
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        scrollbar = ttk.Scrollbar(self.frame, command=self._scroll)
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.tree.config(yscrollcommand=scrollbar.set)
+
+        self.status = ttk.Label(self.frame, text=HINT, foreground="#606060")
+        self.status.grid(row=1, column=0, columnspan=2, sticky=tk.W)
+
+        # The one cell editor, placed over the cell being edited
+        self.editor_var = tk.StringVar()
+        self.editor = ttk.Entry(self.tree, textvariable=self.editor_var)
+        for sequence, handler in [("<Return>", lambda e: self._finish("down")),
+                                  ("<KP_Enter>", lambda e: self._finish("down")),
+                                  ("<Tab>", lambda e: self._finish("right")),
+                                  ("<Shift-Tab>", lambda e: self._finish("left")),
+                                  ("<ISO_Left_Tab>", lambda e: self._finish("left")),
+                                  ("<Down>", lambda e: self._finish("down")),
+                                  ("<Up>", lambda e: self._finish("up")),
+                                  ("<Escape>", lambda e: self._cancel_and_focus())]:
+            self.editor.bind(sequence, lambda e, handler=handler: handler(e) or "break")
+        self.editor.bind("<FocusOut>", lambda e: self._focus_lost())
+
+        for sequence, handler in [("<Return>", self._edit_selected), ("<KP_Enter>", self._edit_selected),
+                                  ("<F2>", self._edit_selected), ("<Insert>", lambda e: self.start_new_room()),
+                                  ("<Control-o>", lambda e: self.start_new_obstacle()),
+                                  ("<Delete>", lambda e: self.remove_selected()),
+                                  ("<Double-1>", self._edit_clicked)]:
+            self.tree.bind(sequence, lambda e, handler=handler: handler(e) or "break")
+        self.tree.bind("<Key>", self._type_to_edit)
+        self.tree.bind("<Configure>", lambda e: self.cancel_edit())
+
+    def grid(self, **options):
+        self.frame.grid(**options)
+
+    # --- showing the job ---
+
+    def refresh(self, rooms: PersistentList, units: tuple = ()):
+        """Bring the rows up to date; only rooms changed since the last refresh are redrawn"""
+        self.cancel_edit()
+        if self._draft is not None and self._draft["kind"] == "draft_obstacle":
+            self._discard_draft()
+        if not isinstance(rooms, PersistentList):
+            rooms = PersistentList(rooms)
+        start, removed, inserted = rooms.splice_from(self.rooms)
+        if removed or inserted:
+            for item in self._room_items[start:start + removed]:
+                self.tree.delete(item)
+            self._room_items[start:start + removed] = [self._insert_room(start + offset, room)
+                                                       for offset, room in enumerate(inserted)]
+        self.rooms = rooms
+
+        units = tuple(units)
+        if len(units) != len(self.units) or any(a is not b for a, b in zip(units, self.units)):
+            # Few unit lines (after the rooms); simply redrawn
+            for item in self._unit_items:
+                self.tree.delete(item)
+            self._unit_items = [
+                self.tree.insert("", len(self._room_items) + i, text=f"[{p.count} × {p.prototype.name}]",
+                                 values=(p.location, _area(p.get_total_area()), "", _area(p.get_usable_area())),
+                                 tags=("unit",))
+                for i, p in enumerate(units)]
+        self.units = units
+        if self._draft is None:
+            self._new_draft()
+
+    def _insert_room(self, index: int, room: Room) -> str:
+        obstacle_area = sum(o.area_sqft for o in room.obstacles)
+        item = self.tree.insert("", index, text=room.name, open=True, tags=("room",),
+                                values=(room.location, _area(room.total_area_sqft),
+                                        _area(obstacle_area) if room.obstacles else "",
+                                        _area(room.get_usable_area())))
+        for obstacle in room.obstacles:
+            self.tree.insert(item, tk.END, text=obstacle.name, tags=("obstacle",),
+                             values=("", _area(obstacle.area_sqft), "", ""))
+        return item
+
+    def _new_draft(self, kind: str = "draft", parent: str = "", values: Optional[dict] = None) -> str:
+        """The blank row new rooms (or a new obstacle) are typed into"""
+        if kind == "draft":
+            # New rooms usually go where the previous one went
+            values = values or {"location": self.rooms[-1].location if len(self.rooms) else ""}
+        item = self.tree.insert(parent, tk.END, tags=(kind,))
+        self._draft = {"item": item, "kind": kind, "values": dict(values or {})}
+        self._show_draft()
+        return item
+
+    def _show_draft(self):
+        draft = self._draft
+        values = draft["values"]
+        placeholder = "(new room)" if draft["kind"] == "draft" else "(new obstacle)"
+        self.tree.item(draft["item"], text=values.get("#0") or placeholder,
+                       values=(values.get("location", ""), values.get("area", ""), "", ""))
+
+    def _discard_draft(self):
+        if self._draft is not None:
+            self.tree.delete(self._draft["item"])
+            self._draft = None
+
+    # --- rows and cells ---
+
+    def _kind(self, item: str) -> str:
+        tags = self.tree.item(item, "tags")
+        return tags[0] if tags else ""
+
+    def _room_index(self, item: str) -> int:
+        """Room index of a room row or of an obstacle row's room"""
+        parent = self.tree.parent(item)
+        return self.tree.index(parent or item)
+
+    def _below(self, item: str) -> Optional[str]:
+        children = self.tree.get_children(item)
+        if children and self.tree.item(item, "open"):
+            return children[0]
+        while item:
+            following = self.tree.next(item)
+            if following:
+                return following
+            item = self.tree.parent(item)
+        return None
+
+    def _above(self, item: str) -> Optional[str]:
+        previous = self.tree.prev(item)
+        if not previous:
+            return self.tree.parent(item) or None
+        children = self.tree.get_children(previous)
+        while children and self.tree.item(previous, "open"):
+            previous = children[-1]
+            children = self.tree.get_children(previous)
+        return previous
+
+    def _cell_text(self, item: str, column: str) -> str:
+        kind = self._kind(item)
+        if kind in ("draft", "draft_obstacle"):
+            return self._draft["values"].get(column, "")
+        room = self.rooms[self._room_index(item)]
+        if kind == "obstacle":
+            obstacle = room.obstacles[self.tree.index(item)]
+            return obstacle.name if column == "#0" else f"{obstacle.area_sqft:g}"
+        if column == "#0":
+            return room.name
+        return room.location if column == "location" else f"{room.total_area_sqft:g}"
+
+    def select(self, item: str):
+        self.tree.selection_set(item)
+        self.tree.focus(item)
+        self.tree.see(item)
+
+    # --- editing ---
+
+    def edit(self, item: str, column: str, text: Optional[str] = None):
+        """Open the cell editor over a cell (text replaces the current value)"""
+        self.cancel_edit()
+        kind = self._kind(item)
+        if kind == "unit":
+            self.edit_unit(self.tree.index(item) - len(self._room_items))
+            return
+        if column not in EDITABLE.get(kind, []):
+            column = EDITABLE[kind][0]
+        self.select(item)
+        self.tree.update_idletasks()
+        box = self.tree.bbox(item, column)
+        if not box:
+            return
+        x, y, width, height = box
+        if column == "#0":
+            # Leave the tree's indent and open/close arrow visible
+            indent = 20 * (2 if self.tree.parent(item) else 1)
+            x, width = x + indent, max(40, width - indent)
+        self._editing = (item, column)
+        self.editor_var.set(self._cell_text(item, column) if text is None else text)
+        self.editor.place(x=x, y=y, width=width, height=height)
+        self.editor.focus_set()
+        if text is None:
+            self.editor.select_range(0, tk.END)
+        self.editor.icursor(tk.END)
+
+    def cancel_edit(self):
+        """Close the cell editor without changing anything"""
+        if self._editing is not None:
+            self._editing = None
+            self.editor.place_forget()
+
+    def _reset_draft(self):
+        """Back to a blank new-room row at the bottom"""
+        self._discard_draft()
+        self._new_draft()
+
+    def _cancel_and_focus(self):
+        item = self._editing[0] if self._editing else None
+        self.cancel_edit()
+        if item and self._kind(item) == "draft_obstacle":
+            item = self.tree.parent(item)
+            self._reset_draft()
+        self.status.config(text=HINT)
+        self.tree.focus_set()
+        if item and self.tree.exists(item):
+            self.select(item)
+
+    def _focus_lost(self):
+        # Clicking elsewhere keeps what was typed when it is valid
+        if self._editing is not None and self.frame.focus_get() is not self.editor:
+            self._finish(None)
+
+    def _finish(self, move: Optional[str]):
+        """Commit the open cell, then move the editor ('down', 'up', 'right', 'left' or None)"""
+        if self._editing is None:
+            return
+        item, column = self._editing
+        text = self.editor_var.get().strip()
+        kind = self._kind(item)
+        columns = EDITABLE[kind]
+        self.cancel_edit()
+        self.status.config(text=HINT)
+        try:
+            if kind in ("draft", "draft_obstacle"):
+                target = self._finish_draft(item, column, text, move)
+                if target is not None:
+                    self.edit(*target)
+                    return
+            else:
+                item = self._commit_cell(item, column, text)
+        except ValueError as e:
+            self.status.config(text=f"⚠ {e}")
+            if move is not None:
+                self.edit(item, column, text)
+            return
+        if move is None:
+            return
+        if move in ("right", "left"):
+            position = columns.index(column) + (1 if move == "right" else -1)
+            if 0 <= position < len(columns):
+                self.edit(item, columns[position])
+                return
+            item = self._below(item) if move == "right" else self._above(item)
+            column = None
+        else:
+            item = self._below(item) if move == "down" else self._above(item)
+        if item is None:
+            self.tree.focus_set()
+            return
+        if column is None:
+            kind = self._kind(item)
+            column = EDITABLE[kind][0] if move == "right" else EDITABLE.get(kind, ["#0"])[-1]
+        if self._kind(item) == "unit":
+            self.select(item)
+            self.tree.focus_set()
+        else:
+            self.edit(item, column)
+
+    def _commit_cell(self, item: str, column: str, text: str) -> str:
+        """Apply one edited cell of an existing room or obstacle; returns the row's item afterwards"""
+        index = self._room_index(item)
+        room = self.rooms[index]
+        value = self._parse(column, text)
+        position = self.tree.index(item) if self._kind(item) == "obstacle" else -1
+        if position >= 0:
+            obstacle = room.obstacles[position]
+            obstacle = replace(obstacle, name=value) if column == "#0" else replace(obstacle, area_sqft=value)
+            obstacles = list(room.obstacles)
+            obstacles[position] = obstacle
+            new_room = replace(room, obstacles=obstacles)
+        else:
+            field = {"#0": "name", "location": "location", "area": "total_area_sqft"}[column]
+            new_room = replace(room, **{field: value})
+        if new_room == room:
+            return item
+        if new_room.get_usable_area() < 0:
+            raise ValueError(f"{new_room.name}: obstacles are larger than the room")
+        self.commit(f"Edit room {new_room.name}", rooms=self.rooms.set(index, new_room))
+        # The room's row was replaced: carry on from the new one
+        room_item = self._room_items[index]
+        return self.tree.get_children(room_item)[position] if position >= 0 else room_item
+
+    def _finish_draft(self, item: str, column: str, text: str, move: Optional[str]):
+        """Keep a typed cell of the new row; add the room/obstacle once the row is done"""
+        draft = self._draft
+        columns = EDITABLE[draft["kind"]]
+        if draft["kind"] == "draft" and column == "#0" and looks_like_room_line(text):
+            # Quick entry typed straight into the name cell: "Kitchen 12x14 -island 3x6; Hall 180sf"
+            rooms, errors = parse_room_block(text)
+            if errors:
+                raise ValueError(errors[0])
+            location = draft["values"].get("location", "")
+            rooms = [replace(room, location=location) if location and not room.location else room
+                     for room in rooms]
+            updated = self.rooms
+            for room in rooms:
+                updated = updated.append(room)
+            self._discard_draft()
+            self.commit(f"Add room {rooms[0].name}" if len(rooms) == 1 else f"Add {len(rooms)} rooms",
+                        rooms=updated)
+            return self._draft["item"], "#0"
+        if text:
+            self._parse(column, text)  # report a bad value now, on its own cell
+        draft["values"][column] = text
+        self._show_draft()
+        leaving_row = move in ("down", "up") or (move == "right" and column == columns[-1])
+        if not leaving_row:
+            return None
+        if not any(draft["values"].get(c) for c in ("#0", "area")):
+            if draft["kind"] == "draft_obstacle":
+                # Nothing typed: stop adding obstacles and carry on below
+                below = self._below(item) if move != "up" else self.tree.parent(item)
+                self._reset_draft()
+                return (below or self._draft["item"]), "#0"
+            return None
+        missing = [c for c in ("#0", "area") if not draft["values"].get(c)]
+        if missing:
+            self.status.config(text=f"⚠ {'A name' if missing[0] == '#0' else 'An area'} is needed")
+            return item, missing[0]
+        return self._add_draft()
+
+    def _add_draft(self):
+        draft = self._draft
+        values = draft["values"]
+        name, area = self._parse("#0", values["#0"]), self._parse("area", values["area"])
+        if draft["kind"] == "draft_obstacle":
+            index = self.tree.index(self.tree.parent(draft["item"]))
+            room = self.rooms[index]
+            new_room = replace(room, obstacles=room.obstacles + [Obstacle(name, area)])
+            if new_room.get_usable_area() < 0:
+                raise ValueError(f"{room.name}: obstacles would be larger than the room")
+            self._discard_draft()
+            self.commit(f"Add obstacle {name}", rooms=self.rooms.set(index, new_room))
+            # Straight on to another obstacle in the same room (a blank row ends it)
+            self._discard_draft()
+            self._new_draft("draft_obstacle", self._room_items[index])
+            return self._draft["item"], "#0"
+        room = Room(name, area, location=self._parse("location", values.get("location", "")))
+        self._discard_draft()
+        self.commit(f"Add room {name}", rooms=self.rooms.append(room))
+        return self._draft["item"], "#0"
+
+    @staticmethod
+    def _parse(column: str, text: str):
+        if column == "location":
+            return format_location(parse_location(text))
+        if column == "#0":
+            if not text:
+                raise ValueError("A name is needed")
+            return text
+        try:
+            area = parse_area(text)
+        except ValueError:
+            raise ValueError(f"'{text}' is not an area (e.g. 180 or 12'6x14)")
+        if area < 0:
+            raise ValueError("Area cannot be negative")
+        return area
+
+    # --- keyboard and buttons ---
+
+    def _edit_selected(self, event=None):
+        item = self.tree.focus()
+        if item:
+            self.edit(item, "#0")
+
+    def _edit_clicked(self, event):
+        item = self.tree.identify_row(event.y)
+        if item:
+            column = self.tree.identify_column(event.x)
+            self.edit(item, column if column == "#0" else self.tree.column(column, "id"))
+
+    def _type_to_edit(self, event):
+        # Typing on a selected row starts editing its first cell, like a spreadsheet
+        if event.char and event.char.isprintable() and not event.state & 0x4:
+            item = self.tree.focus()
+            if item:
+                self.edit(item, "#0", event.char)
+                return "break"
+        return None
+
+    def _scroll(self, *args):
+        self.cancel_edit()
+        self.tree.yview(*args)
+
+    def start_new_room(self, name: str = "", area: Optional[float] = None):
+        """Put the cursor in the blank row (optionally with the name and area filled in)"""
+        if self._draft is None or self._draft["kind"] != "draft":
+            self._discard_draft()
+            self._new_draft()
+        if name:
+            self._draft["values"]["#0"] = name
+        if area is not None:
+            self._draft["values"]["area"] = f"{area:g}"
+        self._show_draft()
+        self.edit(self._draft["item"], "area" if name else "#0")
+
+    def start_new_obstacle(self):
+        """Add an obstacle row under the selected room"""
+        item = self.tree.focus()
+        if not item or self._kind(item) not in ("room", "obstacle"):
+            self.status.config(text="Select a room to add an obstacle to it.")
+            return
+        room_item = self.tree.parent(item) or item
+        self.cancel_edit()
+        self._discard_draft()
+        self.tree.item(room_item, open=True)
+        self.edit(self._new_draft("draft_obstacle", room_item), "#0")
+
+    def selected_rooms(self) -> List[int]:
+        """Indices of the selected room rows (obstacle rows count as their room)"""
+        return sorted({self._room_index(item) for item in self.tree.selection()
+                       if self._kind(item) in ("room", "obstacle")})
+
+    def selected_unit(self) -> Optional[int]:
+        for item in self.tree.selection():
+            if self._kind(item) == "unit":
+                return self.tree.index(item) - len(self._room_items)
+        return None
+
+    def remove_selected(self):
+        """Remove the selected rooms and obstacles as one edit (Undo brings them back)"""
+        selection = [item for item in self.tree.selection() if self._kind(item) in ("room", "obstacle")]
+        if not selection:
+            if self.selected_unit() is not None:
+                self.remove_unit(self.selected_unit())
+            return
+        rooms_removed = {self.tree.index(item) for item in selection if self._kind(item) == "room"}
+        obstacles_removed = {}
+        for item in selection:
+            if self._kind(item) == "obstacle":
+                index = self._room_index(item)
+                if index not in rooms_removed:
+                    obstacles_removed.setdefault(index, set()).add(self.tree.index(item))
+        rooms = self.rooms
+        for index, positions in obstacles_removed.items():
+            room = rooms[index]
+            rooms = rooms.set(index, replace(room, obstacles=[o for i, o in enumerate(room.obstacles)
+                                                              if i not in positions]))
+        for index in sorted(rooms_removed, reverse=True):
+            rooms = rooms.delete(index)
+        if rooms_removed:
+            first = min(rooms_removed)
+            label = (f"Remove room {self.rooms[first].name}" if len(rooms_removed) == 1
+                     else f"Remove {len(rooms_removed)} rooms")
+        else:
+            first = min(obstacles_removed)
+            label = "Remove obstacles" if sum(map(len, obstacles_removed.values())) > 1 else "Remove obstacle"
+        self.commit(label, rooms=rooms)
+        # Keep the cursor near where the rows were
+        if self._room_items:
+            self.select(self._room_items[min(first, len(self._room_items) - 1)])
+        self.tree.focus_set()
@@ -0,0 +1,151 @@
+"""
+Owen Moloney
+Employee Roster
+Stored list of employees and their hourly rates, plus named crew presets,
+so a crew is picked instead of retyped on every job.
+"""
+
+import json
+import os
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional
+
+from main import Employee
+
+
+DEFAULT_ROSTER_PATH = os.path.join(os.path.expanduser("~"), ".flooring_roster.json")
+
+
+class Roster:
+    """Employees by name (case-insensitive) and crew presets"""
+
+    def __init__(self, path: str = DEFAULT_ROSTER_PATH):
+        self.path = path
+        self.rates: Dict[str, float] = {}      # lower-case name -> hourly rate
+        self.names: Dict[str, str] = {}        # lower-case name -> display name
+        self._sorted: List[str] = []           # lower-case names, for prefix lookup
+        self.crews: Dict[str, List[str]] = {}  # crew name -> member display names
+        if os.path.exists(path):
+            self.load()
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        for entry in data.get("employees", []):
+            try:
+                self.set_rate(entry["name"], float(entry["hourly_rate"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+        self.crews = {name: list(members) for name, members in data.get("crews", {}).items()}
+
+    def save(self):
+        data = {
+            "employees": [{"name": self.names[key], "hourly_rate": self.rates[key]} for key in self._sorted],
+            "crews": self.crews,
+        }
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_path, self.path)
+
+    def set_rate(self, name: str, hourly_rate: float):
+        """Add an employee or update their rate"""
+        key = name.strip().lower()
+        if key not in self.rates:
+            insort(self._sorted, key)
+        self.rates[key] = hourly_rate
+        self.names[key] = name.strip()
+
+    def remove(self, name: str):
+        key = name.strip().lower()
+        if key in self.rates:
+            del self.rates[key]
+            del self.names[key]
+            self._sorted.pop(bisect_left(self._sorted, key))
+
+    def rate_for(self, name: str) -> Optional[float]:
+        return self.rates.get(name.strip().lower())
+
+    def display_name(self, name: str) -> str:
+        """Name as stored in the roster ('john' -> 'John'), else as given"""
+        return self.names.get(name.strip().lower(), name.strip())
+
+    def find(self, prefix: str, limit: int = 10) -> List[str]:
+        """Display names starting with prefix (case-insensitive)"""
+        prefix = prefix.strip().lower()
+        i = bisect_left(self._sorted, prefix)
+        found = []
+        while i < len(self._sorted) and self._sorted[i].startswith(prefix) and len(found) < limit:
+            found.append(self.names[self._sorted[i]])
+            i += 1
+        return found
+
+    def all_names(self) -> List[str]:
+        return [self.names[key] for key in self._sorted]
+
+    def employee(self, name: str) -> Optional[Employee]:
+        """A new Employee for a roster member (None if unknown)"""
+        key = name.strip().lower()
+        if key not in self.rates:
+            return None
+        return Employee(self.names[key], self.rates[key])
+
+    def save_crew(self, crew_name: str, employees: List[Employee]):
+        """Store a crew preset, adding/updating its members' rates"""
+        for emp in employees:
+            self.set_rate(emp.name, emp.hourly_rate)
+        self.crews[crew_name.strip()] = [emp.name for emp in employees]
+
+    def crew(self, crew_name: str) -> List[Employee]:
+        """Employees for a preset, at their current roster rates"""
+        members = (self.employee(name) for name in self.crews.get(crew_name, []))
+        return [emp for emp in members if emp is not None]
+
+    def describe_crew(self, crew_name: str) -> str:
+        members = self.crew(crew_name)
+        hourly = sum(emp.hourly_rate for emp in members)
+        return f"{crew_name}: {', '.join(emp.name for emp in members)} (${hourly:.2f}/hour combined)"
+
+
+def choose_crew_preset(roster: Roster) -> List[Employee]:
+    """Terminal: offer saved crews; returns the chosen crew or []"""
+    if not roster.crews:
+        return []
+    crew_names = sorted(roster.crews)
+    print("\nSaved crews:")
+    for i, crew_name in enumerate(crew_names, 1):
+        print(f"   {i}. {roster.describe_crew(crew_name)}")
+    choice = input("Pick a crew number (or press Enter to enter people one by one): ").strip()
+    if choice.isdigit() and 1 <= int(choice) <= len(crew_names):
+        crew = roster.crew(crew_names[int(choice) - 1])
+        for emp in crew:
+            print(f"  Added {emp.name}: ${emp.hourly_rate:.2f}/hour")
+        return crew
+    return []
+
+
+def prompt_rate(roster: Roster, name: str, prompt: str) -> float:
+    """Terminal: hourly rate prompt that defaults to the roster rate"""
+    known = roster.rate_for(name)
+    if known is None:
+        return float(input(prompt))
+    answer = input(f"{prompt.rstrip(': ')} [{known:.2f}]: ").strip()
+    return known if not answer else float(answer)
+
+
+def offer_save_crew(roster: Roster, employees: List[Employee]):
+    """Terminal: remember the rates entered and optionally save a crew preset"""
+    if not employees:
+        return
+    for emp in employees:
+        roster.set_rate(emp.name, emp.hourly_rate)
+    crew_name = input("\nSave this crew for next time? Enter a crew name (or press Enter to skip): ").strip()
+    if crew_name:
+        roster.save_crew(crew_name, employees)
+    try:
+        roster.save()
+    except OSError as e:
+        print(f"Could not save roster: {e}")
@@ -0,0 +1,215 @@
+"""
+Owen Moloney
+Room Schedule Import
+Reads an architect's finish schedule (CSV) straight into Room/Obstacle objects.
+Rows are streamed into columns, validated in one vectorized pass and every
+problem is reported together instead of stopping at the first bad cell.
+"""
+
+import csv
+import sys
+from typing import List, Optional, Tuple
+
+from main import Room, Obstacle
+from dimensions import parse_length, parse_area
+from hierarchy import parse_location, format_location
+
+try:
+    import numpy as np
+except ImportError:  # validation falls back to a plain Python pass
+    np = None
+
+
+# Header names recognised for each field (compared lower-case, stripped)
+COLUMN_ALIASES = {
+    "room": ["room", "room name", "name", "space"],
+    "length": ["length", "len", "l", "length (ft)"],
+    "width": ["width", "w", "width (ft)"],
+    "area": ["area", "sq ft", "sqft", "area (sq ft)", "total area", "total sq ft"],
+    # Where the room is (see hierarchy.py): one Location column, or any of these
+    "location": ["location"],
+    "building": ["building", "bldg"],
+    "floor": ["floor", "level"],
+    "unit": ["unit", "apartment", "suite"],
+}
+
+LOCATION_FIELDS = ("building", "floor", "unit")
+
+# Any other header starting with this is an obstacle column, e.g. "Obstacle: Island"
+OBSTACLE_PREFIX = "obstacle"
+
+
+def map_columns(header: List[str], column_map: Optional[dict] = None) -> dict:
+    """
+    Work out which header index feeds which field.
+    column_map overrides auto-detection: {"room": "Space", "area": "SF",
+    "obstacles": {"Island": "Island SF"}}.
+    """
+    column_map = column_map or {}
+    lookup = {name.strip().lower(): i for i, name in enumerate(header)}
+    mapping = {"obstacles": {}}
+
+    for field_name, aliases in COLUMN_ALIASES.items():
+        if field_name in column_map:
+            wanted = column_map[field_name].strip().lower()
+            if wanted not in lookup:
+                raise ValueError(f"Column '{column_map[field_name]}' not found in schedule")
+            mapping[field_name] = lookup[wanted]
+            continue
+        for alias in aliases:
+            if alias in lookup:
+                mapping[field_name] = lookup[alias]
+                break
+
+    if "obstacles" in column_map:
+        for obstacle_name, column in column_map["obstacles"].items():
+            wanted = column.strip().lower()
+            if wanted not in lookup:
+                raise ValueError(f"Column '{column}' not found in schedule")
+            mapping["obstacles"][obstacle_name] = lookup[wanted]
+    else:
+        for i, name in enumerate(header):
+            label = name.strip()
+            if label.lower().startswith(OBSTACLE_PREFIX):
+                obstacle_name = label[len(OBSTACLE_PREFIX):].lstrip(" :-_").strip() or label
+                mapping["obstacles"][obstacle_name] = i
+
+    if "room" not in mapping:
+        raise ValueError("Schedule has no room name column")
+    if "area" not in mapping and not ("length" in mapping and "width" in mapping):
+        raise ValueError("Schedule needs an area column or both length and width columns")
+    return mapping
+
+
+def _parse_column(cells: List[str], parser, label: str, lines: List[int],
+                  errors: List[Tuple[int, str]]) -> List[float]:
+    """Parse one column of text; blank cells become NaN, bad cells are reported"""
+    values = []
+    append = values.append
+    for cell, line in zip(cells, lines):
+        cell = cell.strip()
+        if not cell:
+            append(float("nan"))
+            continue
+        try:
+            append(parser(cell))
+        except ValueError:
+            errors.append((line, f"{label} '{cell}' is not a valid measurement"))
+            append(float("nan"))
+    return values
+
+
+def _validate(names, totals, obstacle_sums, lines, errors):
+    """Cross-field checks over whole columns at once"""
+    if np is not None:
+        totals_arr = np.asarray(totals, dtype=float)
+        obstacles_arr = np.asarray(obstacle_sums, dtype=float)
+        missing_name = np.fromiter((not n for n in names), dtype=bool, count=len(names))
+        checks = [
+            (missing_name, "room name is missing"),
+            (np.isnan(totals_arr) & ~missing_name, "room has no area (give area or length and width)"),
+            (totals_arr <= 0, "room area must be positive"),
+            (obstacles_arr < 0, "obstacle area cannot be negative"),
+            (obstacles_arr > totals_arr, "obstacles are larger than the room"),
+        ]
+        for mask, message in checks:
+            for i in np.flatnonzero(mask):
+                errors.append((lines[i], message))
+        return
+
+    for name, total, obstacle_sum, line in zip(names, totals, obstacle_sums, lines):
+        if not name:
+            errors.append((line, "room name is missing"))
+        elif total != total:
+            errors.append((line, "room has no area (give area or length and width)"))
+        if total <= 0:
+            errors.append((line, "room area must be positive"))
+        if obstacle_sum < 0:
+            errors.append((line, "obstacle area cannot be negative"))
+        if obstacle_sum > total:
+            errors.append((line, "obstacles are larger than the room"))
+
+
+def read_room_schedule(path: str, column_map: Optional[dict] = None) -> Tuple[List[Room], List[str]]:
+    """
+    Import a CSV room schedule.
+    Returns (rooms, errors); rooms is empty whenever errors is not, so a
+    schedule is imported completely or not at all.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        try:
+            header = next(reader)
+        except StopIteration:
+            return [], ["Schedule is empty"]
+        mapping = map_columns(header, column_map)
+
+        # Stream rows into columns (only the mapped ones are kept)
+        wanted = {key: mapping[key] for key in ("room", "length", "width", "area", "location") + LOCATION_FIELDS
+                  if key in mapping}
+        wanted.update({("obstacle", name): i for name, i in mapping["obstacles"].items()})
+        columns = {key: [] for key in wanted}
+        lines = []
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            lines.append(reader.line_num)
+            width = len(row)
+            for key, i in wanted.items():
+                columns[key].append(row[i] if i < width else "")
+
+    errors = []
+    count = len(lines)
+    names = [name.strip() for name in columns["room"]]
+    nan_column = [float("nan")] * count
+
+    areas = _parse_column(columns["area"], parse_area, "area", lines, errors) if "area" in columns else nan_column
+    lengths = _parse_column(columns["length"], parse_length, "length", lines, errors) if "length" in columns else nan_column
+    widths = _parse_column(columns["width"], parse_length, "width", lines, errors) if "width" in columns else nan_column
+    # Area column wins; otherwise length × width (NaN if either is blank)
+    totals = [a if a == a else l * w for a, l, w in zip(areas, lengths, widths)]
+
+    obstacle_columns = {}
+    obstacle_sums = [0.0] * count
+    for key in wanted:
+        if isinstance(key, tuple):
+            values = _parse_column(columns[key], parse_area, f"obstacle '{key[1]}'", lines, errors)
+            obstacle_columns[key[1]] = values
+            obstacle_sums = [s + v if v == v else s for s, v in zip(obstacle_sums, values)]
+
+    _validate(names, totals, obstacle_sums, lines, errors)
+    if errors:
+        errors.sort(key=lambda error: error[0])
+        return [], [f"Line {line}: {message}" for line, message in errors]
+
+    if "location" in columns:
+        locations = [format_location(parse_location(text)) for text in columns["location"]]
+    else:
+        parts = [columns[key] for key in LOCATION_FIELDS if key in columns]
+        locations = [format_location(tuple(p.strip() for p in row if p.strip())) for row in zip(*parts)] \
+            if parts else [""] * count
+
+    rooms = []
+    for i in range(count):
+        room = Room(names[i], totals[i], location=locations[i])
+        for obstacle_name, values in obstacle_columns.items():
+            if values[i] == values[i] and values[i] > 0:
+                room.obstacles.append(Obstacle(obstacle_name, values[i]))
+        rooms.append(room)
+    return rooms, []
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python3 schedule_import.py <schedule.csv>")
+        sys.exit(1)
+
+    rooms, errors = read_room_schedule(sys.argv[1])
+    if errors:
+        print(f"\n{len(errors)} problem(s) found, nothing imported:")
+        for message in errors:
+            print(f"   {message}")
+        sys.exit(1)
+
+    total = sum(room.get_usable_area() for room in rooms)
+    print(f"\nImported {len(rooms)} rooms, {total:,.2f} sq ft usable")
@@ -0,0 +1,275 @@
+"""
+Owen Moloney
+Crew Scheduler
+Books crews onto calendar days across many jobs so nobody is on two jobs at
+once. Every job needs as many people as it lists employees, for its
+days_required working days (Monday to Friday). Jobs are booked in the order
+given, each as early as it can start:
+
+- The people the job lists are kept when they are free; anyone busy is
+  replaced by someone free from the roster.
+- Among free people, the one whose last booking ended closest before the
+  start is picked (best fit), so crews work back to back rather than
+  leaving gaps.
+
+Each person's bookings are an interval index (sorted start/end lists), so
+"when is this person next free for N days?" is a binary search. A season of
+500 jobs is replanned in well under a second.
+
+The chosen crew, at roster rates (or, for people not on the roster, the rate
+a loaded job lists them at), is written back into each job so its labor cost
+matches the schedule.
+"""
+
+import argparse
+import sys
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from main import Employee, FlooringJob, save_job
+from roster import Roster
+
+
+class Calendar:
+    """One person's bookings: non-overlapping [start, end) work-day intervals"""
+
+    def __init__(self):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+
+    def next_free(self, day: int, length: int) -> int:
+        """First day >= day that starts length free days in a row"""
+        i = bisect_right(self.starts, day) - 1
+        if i >= 0 and self.ends[i] > day:
+            day = self.ends[i]
+        i += 1
+        while i < len(self.starts) and self.starts[i] < day + length:
+            day = self.ends[i]
+            i += 1
+        return day
+
+    def free_since(self, day: int) -> int:
+        """Idle days before day since the previous booking ended (day itself if never booked)"""
+        i = bisect_right(self.ends, day) - 1
+        return day - self.ends[i] if i >= 0 else day
+
+    def book(self, start: int, end: int):
+        i = bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+
+    @property
+    def busy_days(self) -> int:
+        return sum(end - start for start, end in zip(self.starts, self.ends))
+
+
+@dataclass
+class Booking:
+    job_id: str
+    start: int  # work days from the season start
+    end: int    # exclusive
+    crew: List[str]
+    substitutes: List[Tuple[str, str]] = field(default_factory=list)  # (listed, booked instead)
+
+
+@dataclass
+class Schedule:
+    season_start: date
+    bookings: Dict[str, Booking] = field(default_factory=dict)
+    unscheduled: List[Tuple[str, str]] = field(default_factory=list)  # (job id, reason)
+    calendars: Dict[str, Calendar] = field(default_factory=dict)      # lower-case name -> calendar
+    names: Dict[str, str] = field(default_factory=dict)               # lower-case name -> display name
+    rates: Dict[str, float] = field(default_factory=dict)             # lower-case name -> hourly rate
+
+    def date_of(self, work_day: int) -> date:
+        return work_day_to_date(self.season_start, work_day)
+
+    def utilisation(self) -> List[Tuple[str, int, int]]:
+        """(name, busy days, idle days between their first and last booking)"""
+        rows = []
+        for name, calendar in self.calendars.items():
+            if calendar.starts:
+                busy = calendar.busy_days
+                rows.append((self.names.get(name, name), busy, calendar.ends[-1] - calendar.starts[0] - busy))
+        return rows
+
+
+def work_day_to_date(season_start: date, work_day: int) -> date:
+    """Date of the work_day-th weekday on or after season_start"""
+    day = season_start
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    weeks, extra = divmod(work_day, 5)
+    day += timedelta(weeks=weeks)
+    for _ in range(extra):
+        day += timedelta(days=3 if day.weekday() == 4 else 1)
+    return day
+
+
+def date_to_work_day(season_start: date, when: date) -> int:
+    """Work days from season_start to when (0 if when is earlier)"""
+    day = season_start
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    if when <= day:
+        return 0
+    days = (when - day).days
+    weeks, extra = divmod(days, 7)
+    count = weeks * 5
+    for offset in range(extra):
+        if (day.weekday() + offset) % 7 < 5:
+            count += 1
+    return count
+
+
+def _earliest(job: FlooringJob, season_start: date) -> int:
+    """Jobs may carry an 'earliest_start' extra (YYYY-MM-DD)"""
+    text = str(job.extras.get("earliest_start") or "").strip()
+    if not text:
+        return 0
+    try:
+        return date_to_work_day(season_start, date.fromisoformat(text))
+    except ValueError:
+        return 0
+
+
+def plan_season(jobs: Iterable[Tuple[str, FlooringJob]], roster: Roster,
+                season_start: date, keep_crews: bool = False) -> Schedule:
+    """
+    Book every job. With keep_crews, a job waits for its own listed crew
+    instead of taking substitutes.
+    """
+    schedule = Schedule(season_start)
+    calendars = schedule.calendars
+    display = schedule.names
+    rates = schedule.rates
+    for name in roster.all_names():
+        calendars[name.lower()] = Calendar()
+        display[name.lower()] = name
+        rates[name.lower()] = roster.rate_for(name)
+    pending = list(jobs)
+    for _, job in pending:
+        for employee in job.employees:
+            key = employee.name.strip().lower()
+            calendars.setdefault(key, Calendar())
+            display.setdefault(key, roster.display_name(employee.name))
+            rates.setdefault(key, employee.hourly_rate)
+
+    for job_id, job in pending:
+        size, length = len(job.employees), job.days_required
+        if size == 0 or length <= 0:
+            schedule.unscheduled.append((job_id, "no crew or no days required"))
+            continue
+        listed = list(dict.fromkeys(e.name.strip().lower() for e in job.employees))
+        pool = listed if keep_crews else list(calendars)
+        if len(pool) < size:
+            schedule.unscheduled.append((job_id, f"needs {size} people, only {len(pool)} available"))
+            continue
+
+        # Earliest day on which enough people are free: jump to the size-th
+        # soonest availability until that many are free on the same day
+        day = _earliest(job, season_start)
+        while True:
+            free_from = sorted(calendars[key].next_free(day, length) for key in pool)
+            candidate = free_from[size - 1]
+            if candidate == day:
+                break
+            day = candidate
+
+        free = [key for key in pool if calendars[key].next_free(day, length) == day]
+        crew = [key for key in listed if key in free]
+        if len(crew) < size:
+            # Best fit: whoever finished a booking most recently joins first
+            others = sorted((key for key in free if key not in crew), key=lambda k: calendars[k].free_since(day))
+            crew += others[:size - len(crew)]
+        crew = crew[:size]
+        for key in crew:
+            calendars[key].book(day, day + length)
+
+        missing = [key for key in listed if key not in crew]
+        added = [key for key in crew if key not in listed]
+        schedule.bookings[job_id] = Booking(
+            job_id, day, day + length, [display[key] for key in crew],
+            [(display[a], display[b]) for a, b in zip(missing, added)])
+    return schedule
+
+
+def apply_schedule(jobs: Iterable[Tuple[str, FlooringJob]], schedule: Schedule, roster: Roster):
+    """
+    Give each booked job its scheduled crew and dates. Rates come from the
+    roster, else the job's own listing, else the rate the person is listed
+    at on another loaded job. A job with someone whose rate is unknown is
+    moved to unscheduled rather than billed at $0.
+    """
+    for job_id, job in jobs:
+        booking = schedule.bookings.get(job_id)
+        if booking is None:
+            continue
+        listed_rates = {e.name.strip().lower(): e.hourly_rate for e in job.employees}
+        rates = {}
+        for name in booking.crew:
+            key = name.strip().lower()
+            rate = roster.rate_for(name)
+            rates[name] = rate if rate is not None else listed_rates.get(key, schedule.rates.get(key))
+        unknown = [name for name, rate in rates.items() if rate is None]
+        if unknown:
+            del schedule.bookings[job_id]
+            schedule.unscheduled.append((job_id, f"no hourly rate known for {', '.join(unknown)}"))
+            continue
+        job.employees = [Employee(name, rate) for name, rate in rates.items()]
+        job.extras["scheduled_start"] = schedule.date_of(booking.start).isoformat()
+        job.extras["scheduled_end"] = schedule.date_of(booking.end - 1).isoformat()
+
+def print_schedule(schedule: Schedule, labor_before: Dict[str, float], jobs: Dict[str, FlooringJob]):
+    print("\n" + "="*60)
+    print("                    CREW SCHEDULE")
+    print("="*60 + "\n")
+    for booking in sorted(schedule.bookings.values(), key=lambda b: b.start):
+        job = jobs[booking.job_id]
+        start, end = schedule.date_of(booking.start), schedule.date_of(booking.end - 1)
+        print(f"{booking.job_id}")
+        print(f"   {start:%a %d %b} - {end:%a %d %b}: {', '.join(booking.crew)}")
+        for listed, instead in booking.substitutes:
+            print(f"   ({instead} instead of {listed})")
+        before, after = labor_before[booking.job_id], job.calculate_labor_cost()
+        if abs(after - before) > 0.005:
+            print(f"   Labor: ${before:,.2f} -> ${after:,.2f}")
+    if schedule.unscheduled:
+        print("\nNOT SCHEDULED:")
+        for job_id, reason in schedule.unscheduled:
+            print(f"   {job_id}: {reason}")
+    print("\nCREW UTILISATION:")
+    for name, busy, idle in sorted(schedule.utilisation()):
+        print(f"   {name:<20}{busy:>4} days booked, {idle:>3} idle between jobs")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    from export import iter_job_files
+
+    parser = argparse.ArgumentParser(description="Schedule crews across many jobs without double-booking")
+    parser.add_argument("paths", nargs="+", help="job files or folders of job files, in priority order")
+    parser.add_argument("--start", help="first day of the season (YYYY-MM-DD, default today)")
+    parser.add_argument("--keep-crews", action="store_true", help="wait for each job's own crew, no substitutes")
+    parser.add_argument("--write", action="store_true", help="save the scheduled crew and dates back into the job files")
+    args = parser.parse_args()
+
+    try:
+        season_start = date.fromisoformat(args.start) if args.start else date.today()
+    except ValueError:
+        print("\nInvalid start date. Please use YYYY-MM-DD.")
+        sys.exit(1)
+    roster = Roster()
+    loaded = list(iter_job_files(args.paths))
+    jobs = dict(loaded)
+    labor_before = {job_id: job.calculate_labor_cost() for job_id, job in loaded}
+    schedule = plan_season(loaded, roster, season_start, args.keep_crews)
+    apply_schedule(loaded, schedule, roster)
+    print_schedule(schedule, labor_before, jobs)
+    if args.write:
+        for job_id, job in loaded:
+            if job_id in schedule.bookings:
+                save_job(job, job_id)
+        print(f"Updated {len(schedule.bookings)} job files.")
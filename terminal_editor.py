@@ -0,0 +1,628 @@
+"""
+Owen Moloney
+Full-Screen Terminal Editor
+Keyboard-driven editor for a job in a terminal (works over SSH): a grid of
+rooms with their obstacles underneath, inline cell editing and a totals pane
+that follows every edit.
+
+    python3 terminal_editor.py [job.job.json]
+
+Totals are kept incrementally (see hierarchy.ProjectTree): an edit only
+re-adds the rooms it changed, so the totals pane stays instant on jobs with
+thousands of rooms. Every edit is an undo step (history.py).
+
+Keys: arrows/Tab move, Enter edits a cell, a adds rooms (quick entry, e.g.
+"Kitchen 12'6x14 -island 3x6"), o adds an obstacle, d deletes, p job
+details, c crew, u/r undo/redo, s saves, q quits.
+"""
+
+import os
+import sys
+from dataclasses import replace
+from typing import List, Optional, Tuple
+
+from main import FlooringJob, Employee, JOB_FILE_EXTENSION, save_job, load_job
+from history import PersistentList, JobState, EditHistory
+from hierarchy import ProjectTree, node_costs, parse_location, format_location
+from dimensions import parse_area
+from quick_entry import parse_obstacle, parse_room_block
+from roster import Roster
+
+
+# (key, heading, width); the Room column takes any spare width
+GRID_COLUMNS = [("name", "Room / obstacle", 22), ("location", "Location", 18), ("area", "Area sq ft", 11),
+                ("obstacles", "Obstacles", 10), ("usable", "Usable", 10)]
+EDITABLE = {"room": [0, 1, 2], "obstacle": [0, 2]}
+TOTALS_WIDTH = 32
+
+HELP = "Enter edit  a add rooms  o obstacle  d delete  p job  c crew  u/r undo/redo  s save  q quit"
+
+# A position in the grid: (room index, obstacle index or -1 for the room row)
+Position = Tuple[int, int]
+
+
+class JobEditor:
+    """The editing model behind the screen (no curses here)"""
+
+    def __init__(self, job: Optional[FlooringJob] = None, path: Optional[str] = None):
+        self.job = job if job is not None else FlooringJob()
+        self.job.rooms = PersistentList(self.job.rooms)
+        self.job.employees = PersistentList(self.job.employees)
+        self.job.units = tuple(self.job.units)
+        self.history = EditHistory(JobState.from_job(self.job))
+        self.tree = ProjectTree()
+        self.tree.sync(self.job.rooms, self.job.units)
+        self.path = path
+        self.dirty = False
+
+    # --- edits (each one undo step) ---
+
+    def commit(self, label: str, **changes):
+        state = replace(self.history.current, **changes)
+        self.history.record(state, label)
+        self._show(state)
+        self.dirty = True
+
+    def _show(self, state: JobState):
+        state.apply_to(self.job)
+        # Only the rooms changed since the last edit are re-added
+        self.tree.sync(self.job.rooms, self.job.units)
+
+    def undo(self) -> Optional[str]:
+        label = self.history.undo_label()
+        state = self.history.undo()
+        if state is None:
+            return None
+        self._show(state)
+        self.dirty = True
+        return label
+
+    def redo(self) -> Optional[str]:
+        label = self.history.redo_label()
+        state = self.history.redo()
+        if state is None:
+            return None
+        self._show(state)
+        self.dirty = True
+        return label
+
+    def add_rooms(self, text: str, after: int) -> int:
+        """Insert quick-entry rooms after a room index; raises ValueError"""
+        rooms, errors = parse_room_block(text)
+        if errors:
+            raise ValueError(errors[0])
+        if not rooms:
+            raise ValueError("No rooms given")
+        updated = self.job.rooms
+        for offset, room in enumerate(rooms, 1):
+            updated = updated.insert(after + offset, room)
+        label = f"Add room {rooms[0].name}" if len(rooms) == 1 else f"Add {len(rooms)} rooms"
+        self.commit(label, rooms=updated)
+        return len(rooms)
+
+    def add_obstacle(self, room_index: int, text: str) -> int:
+        """Add an obstacle to a room; returns its index. Raises ValueError"""
+        obstacle = parse_obstacle(text)
+        room = self.job.rooms[room_index]
+        if room.get_usable_area() - obstacle.area_sqft < 0:
+            raise ValueError(f"{room.name}: obstacles would be larger than the room")
+        self.commit(f"Add obstacle {obstacle.name}",
+                    rooms=self.job.rooms.set(room_index, replace(room, obstacles=room.obstacles + [obstacle])))
+        return len(room.obstacles)
+
+    def delete(self, position: Position):
+        room_index, obstacle_index = position
+        room = self.job.rooms[room_index]
+        if obstacle_index < 0:
+            self.commit(f"Remove room {room.name}", rooms=self.job.rooms.delete(room_index))
+        else:
+            obstacles = room.obstacles[:obstacle_index] + room.obstacles[obstacle_index + 1:]
+            self.commit(f"Remove obstacle {room.obstacles[obstacle_index].name}",
+                        rooms=self.job.rooms.set(room_index, replace(room, obstacles=obstacles)))
+
+    def cell_text(self, position: Position, column: int) -> str:
+        room_index, obstacle_index = position
+        room = self.job.rooms[room_index]
+        key = GRID_COLUMNS[column][0]
+        if obstacle_index >= 0:
+            obstacle = room.obstacles[obstacle_index]
+            return obstacle.name if key == "name" else f"{obstacle.area_sqft:g}" if key == "area" else ""
+        if key == "name":
+            return room.name
+        if key == "location":
+            return room.location
+        return f"{room.total_area_sqft:g}" if key == "area" else ""
+
+    def set_cell(self, position: Position, column: int, text: str):
+        """Change one cell; raises ValueError for bad input"""
+        room_index, obstacle_index = position
+        room = self.job.rooms[room_index]
+        key = GRID_COLUMNS[column][0]
+        text = text.strip()
+        if key in ("name", "area") and not text:
+            raise ValueError("A value is required")
+        if key == "area":
+            try:
+                area = parse_area(text)
+            except ValueError:
+                raise ValueError(f"'{text}' is not an area (e.g. 180 or 12'6x14)")
+            if area <= 0:
+                raise ValueError("Area must be positive")
+
+        if obstacle_index >= 0:
+            obstacle = room.obstacles[obstacle_index]
+            obstacle = replace(obstacle, name=text) if key == "name" else replace(obstacle, area_sqft=area)
+            obstacles = list(room.obstacles)
+            obstacles[obstacle_index] = obstacle
+            new_room = replace(room, obstacles=obstacles)
+        elif key == "name":
+            new_room = replace(room, name=text)
+        elif key == "location":
+            new_room = replace(room, location=format_location(parse_location(text)))
+        else:
+            new_room = replace(room, total_area_sqft=area)
+        if new_room == room:
+            return
+        if new_room.get_usable_area() < 0:
+            raise ValueError(f"{new_room.name}: obstacles are larger than the room")
+        self.commit(f"Edit {new_room.name}", rooms=self.job.rooms.set(room_index, new_room))
+
+    def change_crew(self, text: str, roster: Roster) -> str:
+        """'Name 32.50' adds (rate defaults to the roster), '-Name' removes. Raises ValueError"""
+        text = text.strip()
+        if text.startswith("-"):
+            name = text[1:].strip().lower()
+            for i, employee in enumerate(self.job.employees):
+                if employee.name.lower() == name:
+                    self.commit(f"Remove employee {employee.name}", employees=self.job.employees.delete(i))
+                    return f"Removed {employee.name}"
+            raise ValueError(f"No employee named {text[1:].strip()}")
+        name, _, rate_text = text.rpartition(" ")
+        try:
+            rate = float(rate_text.lstrip("$"))
+        except ValueError:
+            name, rate = text, roster.rate_for(text)
+            if rate is None:
+                raise ValueError(f"{text} is not in the roster; give a rate too (e.g. '{text} 30')")
+        name = roster.display_name(name)
+        self.commit(f"Add employee {name}", employees=self.job.employees.append(Employee(name, rate)))
+        return f"Added {name} at ${rate:.2f}/hr"
+
+    # --- navigation over (room, obstacle) rows without flattening the grid ---
+
+    def next_row(self, position: Position) -> Optional[Position]:
+        room_index, obstacle_index = position
+        if obstacle_index + 1 < len(self.job.rooms[room_index].obstacles):
+            return room_index, obstacle_index + 1
+        if room_index + 1 < len(self.job.rooms):
+            return room_index + 1, -1
+        return None
+
+    def previous_row(self, position: Position) -> Optional[Position]:
+        room_index, obstacle_index = position
+        if obstacle_index >= 0:
+            return room_index, obstacle_index - 1
+        if room_index > 0:
+            return room_index - 1, len(self.job.rooms[room_index - 1].obstacles) - 1
+        return None
+
+    def clamp(self, position: Position) -> Position:
+        if not self.job.rooms:
+            return 0, -1
+        room_index = min(position[0], len(self.job.rooms) - 1)
+        return room_index, min(position[1], len(self.job.rooms[room_index].obstacles) - 1)
+
+    # --- totals ---
+
+    def totals(self) -> dict:
+        """
+        Current cost totals from the running area subtotal (no pass over the
+        rooms). The root node carries all of the labor and pickup fee, so these
+        match get_cost_breakdown() even before any room is entered.
+        """
+        usable = self.tree.root.usable_sqft
+        costs = node_costs(self.tree.root, self.job, usable)
+        costs["usable"] = usable
+        costs["rooms"] = self.tree.root.rooms
+        return costs
+
+    def save(self, path: str):
+        save_job(self.job, path)
+        self.path = path
+        self.dirty = False
+
+
+class EditorScreen:
+    """curses front end for a JobEditor"""
+
+    def __init__(self, screen, editor: JobEditor):
+        import curses
+        self.curses = curses
+        self.screen = screen
+        self.editor = editor
+        self.roster = Roster()
+        self.cursor: Position = (0, -1)
+        self.column = 0
+        self.top: Position = (0, -1)
+        self.message = HELP
+        curses.use_default_colors()
+        screen.keypad(True)
+
+    # --- drawing ---
+
+    def layout(self):
+        height, width = self.screen.getmaxyx()
+        grid_width = width - TOTALS_WIDTH - 1
+        name_width = max(12, grid_width - sum(w for _, _, w in GRID_COLUMNS[1:]) - len(GRID_COLUMNS))
+        widths = [name_width] + [w for _, _, w in GRID_COLUMNS[1:]]
+        return height, width, grid_width, widths
+
+    def column_x(self, widths: List[int], column: int) -> int:
+        return sum(widths[:column]) + column
+
+    def row_text(self, position: Position, widths: List[int]) -> List[str]:
+        room_index, obstacle_index = position
+        room = self.editor.job.rooms[room_index]
+        if obstacle_index >= 0:
+            obstacle = room.obstacles[obstacle_index]
+            return ["  - " + obstacle.name, "", f"{obstacle.area_sqft:,.2f}", "", ""]
+        obstacle_area = sum(o.area_sqft for o in room.obstacles)
+        return [room.name, room.location, f"{room.total_area_sqft:,.2f}",
+                f"{obstacle_area:,.2f}" if room.obstacles else "", f"{room.get_usable_area():,.2f}"]
+
+    def scroll_into_view(self, rows: int):
+        editor = self.editor
+        # Cursor above the view: it becomes the top row
+        position = self.top
+        if self.cursor < position:
+            self.top = self.cursor
+            return
+        for _ in range(rows - 1):
+            if position == self.cursor:
+                return
+            position = editor.next_row(position)
+            if position is None:
+                break
+        if position == self.cursor:
+            return
+        # Below the view: count back from the cursor
+        position = self.cursor
+        for _ in range(rows - 1):
+            previous = editor.previous_row(position)
+            if previous is None:
+                break
+            position = previous
+        self.top = position
+
+    def draw(self):
+        curses = self.curses
+        screen = self.screen
+        screen.erase()
+        height, width, grid_width, widths = self.layout()
+        if height < 10 or grid_width < 40:
+            screen.addnstr(0, 0, "Window too small for the editor", width - 1)
+            screen.refresh()
+            return
+        editor = self.editor
+        title = f" {os.path.basename(editor.path) if editor.path else 'New job'}{' *' if editor.dirty else ''}"
+        screen.addnstr(0, 0, title.ljust(width - 1), width - 1, curses.A_REVERSE)
+
+        header = " ".join(heading[:w].ljust(w) if i < 2 else heading[:w].rjust(w)
+                          for i, ((_, heading, _), w) in enumerate(zip(GRID_COLUMNS, widths)))
+        screen.addnstr(1, 0, header, grid_width, curses.A_BOLD | curses.A_UNDERLINE)
+
+        rows = height - 4
+        if editor.job.rooms:
+            self.scroll_into_view(rows)
+            position = self.top
+            for y in range(2, 2 + rows):
+                if position is None:
+                    break
+                cells = self.row_text(position, widths)
+                for column, (text, w) in enumerate(zip(cells, widths)):
+                    text = text[:w].ljust(w) if column < 2 else text[:w].rjust(w)
+                    attr = curses.A_NORMAL
+                    if position == self.cursor:
+                        attr = curses.A_REVERSE if column == self.current_column() else curses.A_BOLD
+                    screen.addnstr(y, self.column_x(widths, column), text, w, attr)
+                position = editor.next_row(position)
+        else:
+            screen.addnstr(3, 2, "No rooms yet. Press a to add rooms, e.g.  Kitchen 12'6x14 -island 3x6",
+                           grid_width - 2)
+
+        self.draw_totals(1, grid_width + 1, height - 3)
+        screen.addnstr(height - 1, 0, self.message[:width - 1], width - 1)
+        screen.refresh()
+
+    def draw_totals(self, y: int, x: int, rows: int):
+        curses = self.curses
+        editor = self.editor
+        job = editor.job
+        totals = editor.totals()
+        lines = [
+            ("TOTALS", curses.A_BOLD),
+            (f"Rooms: {totals['rooms']:,}", 0),
+            (f"Usable: {totals['usable']:,.2f} sq ft", 0),
+            ("", 0),
+            (f"Material: ${totals['material']:,.2f}", 0),
+            (f"Labor:    ${totals['labor']:,.2f}", 0),
+            (f"Sanding:  ${totals['sanding']:,.2f}", 0),
+            (f"TOTAL:    ${totals['total']:,.2f}", curses.A_BOLD),
+            ("", 0),
+            ("JOB (p)", curses.A_BOLD),
+            (f"Days: {job.days_required}", 0),
+            (f"Sanding: ${job.sanding_cost_per_sqft:.2f}/sq ft", 0),
+            ("Wood: customer" if job.customer_provides_wood
+             else f"Wood: ${job.material_cost_per_sqft:.2f}/sq ft +${job.pickup_fee:.2f}", 0),
+            ("", 0),
+            (f"CREW (c): {len(job.employees)}", curses.A_BOLD),
+        ]
+        lines += [(f"{e.name} ${e.hourly_rate:.2f}/hr", 0) for e in job.employees]
+        for i, (text, attr) in enumerate(lines[:rows]):
+            self.screen.addnstr(y + i, x, text, TOTALS_WIDTH - 1, attr)
+
+    def current_column(self) -> int:
+        editable = EDITABLE["obstacle" if self.cursor[1] >= 0 else "room"]
+        return self.column if self.column in editable else editable[0]
+
+    # --- input ---
+
+    def read_line(self, y: int, x: int, width: int, text: str = "") -> Tuple[Optional[str], str]:
+        """Line editor; returns (text or None if cancelled, key that ended it)"""
+        curses = self.curses
+        curses.curs_set(1)
+        pos = len(text)
+        try:
+            while True:
+                start = max(0, pos - width + 1)
+                self.screen.addnstr(y, x, text[start:start + width].ljust(width), width, curses.A_UNDERLINE)
+                self.screen.move(y, x + pos - start)
+                key = self.screen.get_wch()
+                if key in ("\n", "\r", curses.KEY_ENTER):
+                    return text, "enter"
+                if key == "\t":
+                    return text, "tab"
+                if key == curses.KEY_BTAB:
+                    return text, "backtab"
+                if key == "\x1b":
+                    return None, "escape"
+                if key in (curses.KEY_BACKSPACE, "\x7f", "\b"):
+                    if pos:
+                        text = text[:pos - 1] + text[pos:]
+                        pos -= 1
+                elif key == curses.KEY_DC:
+                    text = text[:pos] + text[pos + 1:]
+                elif key == curses.KEY_LEFT:
+                    pos = max(0, pos - 1)
+                elif key == curses.KEY_RIGHT:
+                    pos = min(len(text), pos + 1)
+                elif key in (curses.KEY_HOME, "\x01"):
+                    pos = 0
+                elif key in (curses.KEY_END, "\x05"):
+                    pos = len(text)
+                elif key == "\x15":  # Ctrl-U
+                    text, pos = "", 0
+                elif isinstance(key, str) and key.isprintable():
+                    text = text[:pos] + key + text[pos:]
+                    pos += 1
+        finally:
+            curses.curs_set(0)
+
+    def prompt(self, label: str, text: str = "") -> Optional[str]:
+        height, width = self.screen.getmaxyx()
+        self.screen.addnstr(height - 1, 0, label.ljust(width - 1), width - 1, self.curses.A_BOLD)
+        value, _ = self.read_line(height - 1, len(label), max(10, width - len(label) - 1), text)
+        return value
+
+    def edit_cell(self):
+        editor = self.editor
+        ending = "tab"  # Tab/Shift-Tab goes on to edit the next/previous cell
+        while ending in ("tab", "backtab"):
+            column = self.current_column()
+            _, _, _, widths = self.layout()
+            # Row on screen: count from the top of the view
+            y, position = 2, self.top
+            while position is not None and position != self.cursor:
+                position = editor.next_row(position)
+                y += 1
+            text, ending = self.read_line(y, self.column_x(widths, column), widths[column],
+                                          editor.cell_text(self.cursor, column))
+            if text is None:
+                self.message = "Edit cancelled"
+                return
+            try:
+                editor.set_cell(self.cursor, column, text)
+                self.message = HELP
+            except ValueError as e:
+                self.message = f"Error: {e}"
+                return
+            if ending in ("tab", "backtab"):
+                self.move_column(1 if ending == "tab" else -1)
+                self.draw()
+
+    def move_column(self, step: int):
+        editable = EDITABLE["obstacle" if self.cursor[1] >= 0 else "room"]
+        index = editable.index(self.current_column()) + step
+        if index >= len(editable):
+            following = self.editor.next_row(self.cursor)
+            if following is not None:
+                self.cursor, self.column = following, 0
+            return
+        if index < 0:
+            previous = self.editor.previous_row(self.cursor)
+            if previous is not None:
+                self.cursor = previous
+                self.column = EDITABLE["obstacle" if previous[1] >= 0 else "room"][-1]
+            return
+        self.column = editable[index]
+
+    def move_rows(self, count: int):
+        step = self.editor.next_row if count > 0 else self.editor.previous_row
+        for _ in range(abs(count)):
+            following = step(self.cursor)
+            if following is None:
+                break
+            self.cursor = following
+
+    def edit_job_details(self):
+        job = self.editor.job
+        answers = {}
+        for key, label, current in [("days_required", "Days required", str(job.days_required)),
+                                    ("sanding_cost_per_sqft", "Sanding $/sq ft", f"{job.sanding_cost_per_sqft:.2f}"),
+                                    ("customer_provides_wood", "Customer provides wood? (yes/no)",
+                                     "yes" if job.customer_provides_wood else "no")]:
+            value = self.prompt(f"{label}: ", current)
+            if value is None:
+                self.message = "Job details unchanged"
+                return
+            answers[key] = value.strip()
+        if answers["customer_provides_wood"].lower() not in ("yes", "y", "no", "n"):
+            self.message = "Error: please enter 'yes' or 'no'."
+            return
+        provides = answers["customer_provides_wood"].lower() in ("yes", "y")
+        changes = {"customer_provides_wood": provides}
+        if not provides:
+            for key, label, current in [("material_cost_per_sqft", "Material $/sq ft", job.material_cost_per_sqft),
+                                        ("pickup_fee", "Pickup fee $", job.pickup_fee)]:
+                value = self.prompt(f"{label}: ", f"{current:.2f}")
+                if value is None:
+                    self.message = "Job details unchanged"
+                    return
+                answers[key] = value.strip()
+        try:
+            changes["days_required"] = int(answers["days_required"])
+            changes["sanding_cost_per_sqft"] = float(answers["sanding_cost_per_sqft"])
+            if not provides:
+                changes["material_cost_per_sqft"] = float(answers["material_cost_per_sqft"])
+                changes["pickup_fee"] = float(answers["pickup_fee"])
+        except ValueError:
+            self.message = "Error: please enter valid numbers."
+            return
+        self.editor.commit("Edit job details", **changes)
+        self.message = "Job details updated"
+
+    def save(self) -> bool:
+        default = self.editor.path or f"job{JOB_FILE_EXTENSION}"
+        path = self.prompt("Save as: ", default)
+        if not path:
+            self.message = "Not saved"
+            return False
+        try:
+            self.editor.save(path.strip())
+        except OSError as e:
+            self.message = f"Error: could not save: {e}"
+            return False
+        self.message = f"Saved {path.strip()}"
+        return True
+
+    def handle(self, key) -> bool:
+        """Act on one key; False to quit"""
+        curses = self.curses
+        editor = self.editor
+        has_rooms = bool(editor.job.rooms)
+        if key in (curses.KEY_DOWN, "j"):
+            self.move_rows(1)
+        elif key in (curses.KEY_UP, "k"):
+            self.move_rows(-1)
+        elif key == curses.KEY_NPAGE:
+            self.move_rows(self.screen.getmaxyx()[0] - 5)
+        elif key == curses.KEY_PPAGE:
+            self.move_rows(-(self.screen.getmaxyx()[0] - 5))
+        elif key == curses.KEY_HOME:
+            self.cursor = (0, -1)
+        elif key == curses.KEY_END and has_rooms:
+            self.cursor = editor.clamp((len(editor.job.rooms) - 1, 10 ** 9))
+        elif key in (curses.KEY_RIGHT, "\t"):
+            self.move_column(1)
+        elif key in (curses.KEY_LEFT, curses.KEY_BTAB):
+            self.move_column(-1)
+        elif key in ("\n", "\r", curses.KEY_ENTER, curses.KEY_F2) and has_rooms:
+            self.edit_cell()
+        elif key == "a":
+            text = self.prompt("Add rooms (Kitchen 12'6x14 -island 3x6; Hall 180sf): ")
+            if text and text.strip():
+                after = self.cursor[0] if has_rooms else -1
+                try:
+                    count = editor.add_rooms(text, after)
+                    self.cursor = (after + count, -1)
+                    self.message = f"Added {count} room(s)"
+                except ValueError as e:
+                    self.message = f"Error: {e}"
+        elif key == "o" and has_rooms:
+            room = editor.job.rooms[self.cursor[0]]
+            text = self.prompt(f"Obstacle in {room.name} (island 3x6 / fireplace 20): ")
+            if text and text.strip():
+                try:
+                    index = editor.add_obstacle(self.cursor[0], text)
+                    self.cursor = (self.cursor[0], index)
+                    self.message = HELP
+                except ValueError as e:
+                    self.message = f"Error: {e}"
+        elif key in ("d", curses.KEY_DC) and has_rooms:
+            editor.delete(self.cursor)
+            self.cursor = editor.clamp(self.cursor)
+            self.message = "Deleted (u to undo)"
+        elif key in ("u", "\x1a"):
+            label = editor.undo()
+            self.cursor = editor.clamp(self.cursor)
+            self.message = f"Undid {label}" if label else "Nothing to undo"
+        elif key in ("r", "\x19"):
+            label = editor.redo()
+            self.cursor = editor.clamp(self.cursor)
+            self.message = f"Redid {label}" if label else "Nothing to redo"
+        elif key == "p":
+            self.edit_job_details()
+        elif key == "c":
+            text = self.prompt("Employee (Name rate, or -Name to remove): ")
+            if text and text.strip():
+                try:
+                    self.message = editor.change_crew(text, self.roster)
+                except ValueError as e:
+                    self.message = f"Error: {e}"
+        elif key == "s":
+            self.save()
+        elif key == "q":
+            if not editor.dirty:
+                return False
+            answer = self.prompt("Save changes before quitting? (yes/no/cancel): ")
+            answer = (answer or "cancel").strip().lower()
+            if answer in ("yes", "y"):
+                return not self.save()
+            if answer in ("no", "n"):
+                return False
+            self.message = HELP
+        elif key == "?":
+            self.message = HELP
+        return True
+
+    def run(self):
+        self.curses.curs_set(0)
+        while True:
+            self.draw()
+            if not self.handle(self.screen.get_wch()):
+                return
+
+
+def run_editor(job: Optional[FlooringJob] = None, path: Optional[str] = None) -> FlooringJob:
+    """Open the editor full screen; returns the job as left on quitting"""
+    try:
+        import curses
+    except ImportError:
+        print("\ncurses not available. Install with: pip install windows-curses")
+        sys.exit(1)
+    os.environ.setdefault("ESCDELAY", "25")  # Esc cancels an edit without a pause
+    editor = JobEditor(job, path)
+    curses.wrapper(lambda screen: EditorScreen(screen, editor).run())
+    return editor.job
+
+
+if __name__ == "__main__":
+    job_path = sys.argv[1] if len(sys.argv) > 1 else None
+    loaded = None
+    if job_path and os.path.exists(job_path):
+        try:
+            loaded = load_job(job_path)
+        except (OSError, ValueError) as e:
+            print(f"\nCould not open job: {e}")
+            sys.exit(1)
+    run_editor(loaded, job_path)
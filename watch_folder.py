@@ -0,0 +1,272 @@
+"""
+Owen Moloney
+Watch Folder Service
+Watches a shared folder and, in the background, pre-renders new blueprints
+(PDFs and images, same rendering as display_blueprint) and prices saved job
+files. Results go into a local cache keyed by file content hash, so unchanged
+files are skipped and the GUI opens cached previews instantly.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Deque, Dict, Optional, Tuple
+
+from main import JOB_FILE_EXTENSION, load_job
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".flooring_cache")
+BLUEPRINT_EXTENSIONS = ('.pdf', '.png', '.jpg', '.jpeg', '.gif', '.bmp')
+
+# Files modified more recently than this are probably still being copied in
+SETTLE_SECONDS = 2.0
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_kind(path: str) -> Optional[str]:
+    """'job', 'blueprint' or None for files the service ignores"""
+    lower = path.lower()
+    if lower.endswith(JOB_FILE_EXTENSION):
+        return "job"
+    if lower.endswith(BLUEPRINT_EXTENSIONS):
+        return "blueprint"
+    return None
+
+
+def _write_atomic(path: str, write):
+    temp_path = path + ".tmp"
+    write(temp_path)
+    os.replace(temp_path, path)
+
+
+def render_to_cache(path: str, out_path: str) -> dict:
+    """Rasterize a blueprint into the cache (runs in a worker process)"""
+    from PIL import Image
+    from blueprint_mode import render_pdf_page
+
+    if path.lower().endswith('.pdf'):
+        img, pages = render_pdf_page(path)
+    else:
+        img, pages = Image.open(path), 1
+    _write_atomic(out_path, lambda temp: img.save(temp, "PNG"))
+    return {"width": img.size[0], "height": img.size[1], "pages": pages}
+
+
+def price_to_cache(path: str, out_path: str) -> dict:
+    """Price a saved job into the cache (runs in a worker process)"""
+    job = load_job(path)
+    result = job.get_cost_breakdown()
+    result["rooms"] = job.room_count()
+
+    def write(temp):
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+    _write_atomic(out_path, write)
+    return result
+
+
+class RenderCache:
+    """Content-addressed cache of rendered previews and job pricing"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, "index.json")
+        # path -> [mtime_ns, size, digest]; avoids rehashing unchanged files
+        self.index: Dict[str, list] = {}
+        self._index_mtime = None
+        self.reload_index()
+
+    def reload_index(self):
+        """Pick up entries another process (the watcher) saved since the index was last read"""
+        try:
+            mtime = os.stat(self.index_path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._index_mtime:
+            return
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                self.index.update(json.load(f))
+        except (OSError, ValueError):
+            return
+        self._index_mtime = mtime
+
+    def output_path(self, kind: str, digest: str) -> str:
+        if kind == "blueprint":
+            return os.path.join(self.cache_dir, "previews", f"{digest}.png")
+        return os.path.join(self.cache_dir, "pricing", f"{digest}.json")
+
+    def digest_for(self, path: str, stat: Optional[os.stat_result] = None) -> str:
+        """Content hash of path, reusing the indexed one if the file is unchanged"""
+        path = os.path.abspath(path)
+        stat = stat or os.stat(path)
+        known = self.index.get(path)
+        if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+            return known[2]
+        digest = file_digest(path)
+        self.index[path] = [stat.st_mtime_ns, stat.st_size, digest]
+        return digest
+
+    def lookup(self, path: str) -> Optional[str]:
+        """Cached output for path (preview PNG or pricing JSON), or None"""
+        kind = file_kind(path)
+        if kind is None or not os.path.exists(path):
+            return None
+        cached = self.output_path(kind, self.digest_for(path))
+        return cached if os.path.exists(cached) else None
+
+    def indexed_lookup(self, path: str) -> Optional[str]:
+        """
+        Like lookup(), but only for files the index already holds unchanged:
+        it never hashes, so it is cheap enough for the GUI's event loop
+        """
+        kind = file_kind(path)
+        if kind is None:
+            return None
+        self.reload_index()
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        known = self.index.get(os.path.abspath(path))
+        if not known or known[0] != stat.st_mtime_ns or known[1] != stat.st_size:
+            return None
+        cached = self.output_path(kind, known[2])
+        return cached if os.path.exists(cached) else None
+
+    def save_index(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        def write(temp):
+            with open(temp, "w", encoding="utf-8") as f:
+                json.dump(self.index, f)
+
+        _write_atomic(self.index_path, write)
+
+
+class FolderWatcher:
+    """
+    Polls a folder and feeds changed files to a bounded worker pool.
+    At most max_pending files are being processed at once; anything else
+    waits in the backlog and the folder is not rescanned until the backlog
+    has drained, so a flood of new files never overwhelms the machine.
+    """
+
+    def __init__(self, folder: str, cache: RenderCache, workers: int = 2,
+                 max_pending: Optional[int] = None, interval: float = 5.0,
+                 settle: float = SETTLE_SECONDS):
+        self.folder = os.path.abspath(folder)
+        self.cache = cache
+        self.workers = workers
+        self.max_pending = max_pending or workers * 2
+        self.interval = interval
+        self.settle = settle
+        self.seen: Dict[str, Tuple[int, int]] = {}
+        self.backlog: Deque[Tuple[str, str, str]] = deque()
+
+    def scan(self) -> int:
+        """Queue new or changed files; returns how many were queued"""
+        queued = 0
+        queued_outputs = {out_path for _, _, out_path in self.backlog}
+        now = time.time()
+        for dirpath, dirnames, filenames in os.walk(self.folder):
+            # Never index our own cache if it lives inside the watched folder
+            dirnames[:] = [d for d in dirnames
+                           if os.path.abspath(os.path.join(dirpath, d)) != os.path.abspath(self.cache.cache_dir)]
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                kind = file_kind(path)
+                if kind is None:
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                signature = (stat.st_mtime_ns, stat.st_size)
+                if self.seen.get(path) == signature or now - stat.st_mtime < self.settle:
+                    continue
+                self.seen[path] = signature
+
+                digest = self.cache.digest_for(path, stat)
+                out_path = self.cache.output_path(kind, digest)
+                if out_path in queued_outputs or os.path.exists(out_path):
+                    continue  # same content already rendered/priced (or about to be)
+                queued_outputs.add(out_path)
+                self.backlog.append((path, kind, out_path))
+                queued += 1
+        return queued
+
+    def run(self, once: bool = False):
+        """Watch until interrupted (or process one scan's worth with once=True)"""
+        os.makedirs(os.path.join(self.cache.cache_dir, "previews"), exist_ok=True)
+        os.makedirs(os.path.join(self.cache.cache_dir, "pricing"), exist_ok=True)
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            pending = {}
+            while True:
+                if not self.backlog and not pending:
+                    if self.scan():
+                        self.cache.save_index()
+                    elif once:
+                        break
+                    else:
+                        time.sleep(self.interval)
+                        continue
+
+                while self.backlog and len(pending) < self.max_pending:
+                    path, kind, out_path = self.backlog.popleft()
+                    task = render_to_cache if kind == "blueprint" else price_to_cache
+                    pending[pool.submit(task, path, out_path)] = (path, kind, time.perf_counter())
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, kind, started = pending.pop(future)
+                    seconds = time.perf_counter() - started
+                    name = os.path.relpath(path, self.folder)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"   {name}: FAILED ({e})")
+                        continue
+                    if kind == "blueprint":
+                        print(f"   Rendered {name}: {result['width']} × {result['height']} ({seconds:.1f} s)")
+                    else:
+                        print(f"   Priced {name}: {result['rooms']} rooms, ${result['total_cost']:,.2f} ({seconds:.1f} s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-render blueprints and pre-price jobs dropped into a folder")
+    parser.add_argument("folder", help="folder to watch")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_DIR, help=f"cache folder (default {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1), help="worker processes")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between folder scans")
+    parser.add_argument("--once", action="store_true", help="process what is there now and exit")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.folder):
+        print(f"\nFolder not found: {args.folder}")
+        sys.exit(1)
+
+    print(f"\nWatching {args.folder} (cache: {args.cache}, {args.workers} workers)")
+    watcher = FolderWatcher(args.folder, RenderCache(args.cache), args.workers, interval=args.interval,
+                            settle=0.0 if args.once else SETTLE_SECONDS)
+    try:
+        watcher.run(once=args.once)
+    except KeyboardInterrupt:
+        print("\nStopped.")
+    finally:
+        watcher.cache.save_index()
@@ -0,0 +1,209 @@
+"""
+Owen Moloney
+Synthetic Workload Generator
+Realistic-looking FlooringJobs for benchmarks and load tests, so nobody has
+to share real customer jobs. Jobs range from a single kitchen to a
+20,000-room tower. Room sizes, obstacles, crew sizes, rates and material
+choices follow rough distributions taken from typical bids.
+
+Every job is built from its own random stream, seeded by (seed, job
+number), so a given seed always gives the same jobs, in any format. Any
+slice of a workload (--start) can also be regenerated without the jobs
+before it. Jobs are generated one at a time and streamed to the output,
+so memory stays flat for millions of jobs.
+
+    python3 workload.py --count 100000 --seed 7 --format npz --out bench/
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from main import FlooringJob, Room, Obstacle, Employee, JOB_FILE_EXTENSION, save_job
+
+
+# Room type -> (median sq ft, spread, [(obstacle, chance, smallest, largest sq ft)])
+ROOM_TYPES = {
+    "Kitchen": (150, 0.30, [("Island", 0.40, 15, 40), ("Pantry", 0.20, 10, 25)]),
+    "Living Room": (280, 0.35, [("Fireplace", 0.30, 12, 25), ("Built-in", 0.15, 6, 20)]),
+    "Dining Room": (170, 0.30, []),
+    "Bedroom": (160, 0.30, [("Closet", 0.60, 15, 40)]),
+    "Primary Bedroom": (240, 0.25, [("Walk-in Closet", 0.50, 30, 70)]),
+    "Bathroom": (55, 0.30, [("Vanity", 0.80, 6, 12), ("Tub", 0.50, 13, 17)]),
+    "Hallway": (70, 0.50, []),
+    "Office": (120, 0.30, [("Built-in", 0.20, 6, 20)]),
+    "Laundry": (50, 0.30, [("Appliances", 0.70, 10, 16)]),
+    "Open Office": (1200, 0.60, [("Column", 0.60, 4, 20), ("Server Closet", 0.20, 30, 80)]),
+    "Conference Room": (300, 0.40, []),
+    "Corridor": (400, 0.60, []),
+    "Lobby": (800, 0.50, [("Reception Desk", 0.60, 30, 90)]),
+    "Retail Floor": (1500, 0.60, [("Column", 0.50, 4, 20), ("Fitting Rooms", 0.30, 60, 150)]),
+}
+
+# Mixes of room types (type -> weight)
+HOUSE_ROOMS = {"Bedroom": 4, "Bathroom": 3, "Living Room": 1.5, "Kitchen": 1, "Dining Room": 1,
+               "Hallway": 2, "Office": 1, "Laundry": 1, "Primary Bedroom": 1}
+COMMERCIAL_ROOMS = {"Open Office": 4, "Conference Room": 3, "Corridor": 3, "Lobby": 1, "Retail Floor": 1,
+                    "Office": 4, "Bathroom": 2, "Kitchen": 1}
+UNIT_ROOMS = ["Living Room", "Kitchen", "Bathroom", "Bedroom", "Bedroom", "Hallway", "Primary Bedroom", "Laundry"]
+
+# Profile -> share of jobs in the default mix
+PROFILES = {"kitchen": 0.30, "residential": 0.55, "commercial": 0.145, "tower": 0.005}
+
+MAX_TOWER_ROOMS = 20_000
+
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Chris", "Pat", "Morgan", "Casey", "Jamie", "Taylor", "Robin",
+               "Drew", "Lee", "Kim", "Dana", "Jesse", "Sean", "Niamh", "Ciara", "Aoife", "Liam"]
+
+
+def _pick(rng: random.Random, weights: Dict[str, float]) -> str:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def make_room(rng: random.Random, kind: str, location: str = "") -> Room:
+    """One room of a type: lognormal size, plausible obstacles"""
+    median, spread, obstacle_types = ROOM_TYPES[kind]
+    area = round(median * rng.lognormvariate(0, spread), 2)
+    obstacles = []
+    budget = area * 0.4  # obstacles never take more than 40% of the floor
+    for name, chance, smallest, largest in obstacle_types:
+        if rng.random() < chance:
+            obstacle_area = round(min(rng.uniform(smallest, largest), budget), 2)
+            if obstacle_area > 0:
+                obstacles.append(Obstacle(name, obstacle_area))
+                budget -= obstacle_area
+    return Room(kind, area, obstacles, location)
+
+
+def _kitchen_rooms(rng: random.Random) -> List[Room]:
+    return [make_room(rng, "Kitchen")]
+
+
+def _residential_rooms(rng: random.Random) -> List[Room]:
+    count = max(2, min(25, round(rng.lognormvariate(math.log(7), 0.45))))
+    return [make_room(rng, _pick(rng, HOUSE_ROOMS)) for _ in range(count)]
+
+
+def _commercial_rooms(rng: random.Random) -> List[Room]:
+    count = max(5, min(400, round(rng.lognormvariate(math.log(40), 0.7))))
+    floors = max(1, count // 25)
+    return [make_room(rng, _pick(rng, COMMERCIAL_ROOMS), f"Level {rng.randint(1, floors)}")
+            for _ in range(count)]
+
+
+def _tower_rooms(rng: random.Random) -> List[Room]:
+    """Buildings of floors of apartments, up to MAX_TOWER_ROOMS rooms"""
+    buildings = rng.choice([1, 1, 1, 2, 2, 3])
+    floors = rng.randint(6, 60)
+    units_per_floor = rng.randint(4, 20)
+    rooms = []
+    for b in range(buildings):
+        building = f"Tower {chr(ord('A') + b)}"
+        for floor in range(1, floors + 1):
+            for unit in range(1, units_per_floor + 1):
+                location = f"{building} / Level {floor} / Unit {floor}{unit:02d}"
+                for kind in UNIT_ROOMS[:rng.randint(4, len(UNIT_ROOMS))]:
+                    rooms.append(make_room(rng, kind, location))
+                    if len(rooms) >= MAX_TOWER_ROOMS:
+                        return rooms
+    return rooms
+
+
+ROOM_BUILDERS = {"kitchen": _kitchen_rooms, "residential": _residential_rooms,
+                 "commercial": _commercial_rooms, "tower": _tower_rooms}
+
+
+def _crew(rng: random.Random, usable: float, profile: str) -> List[Employee]:
+    """Bigger floors get bigger crews; rates vary around $32/hr"""
+    largest = {"kitchen": 2, "residential": 5, "commercial": 12, "tower": 40}[profile]
+    size = max(1, min(largest, round(usable / 900) + rng.randint(0, 2)))
+    names = rng.sample(FIRST_NAMES, min(size, len(FIRST_NAMES)))
+    names += [f"Crew {i + 1}" for i in range(size - len(names))]
+    return [Employee(name, round(32 * rng.lognormvariate(0, 0.2) * 2) / 2) for name in names]
+
+
+def generate_job(seed: int, number: int, profile: Optional[str] = None) -> FlooringJob:
+    """Job number `number` of the workload for `seed` (the same job every time)"""
+    rng = random.Random(f"{seed}:{number}")
+    profile = profile or _pick(rng, PROFILES)
+    rooms = ROOM_BUILDERS[profile](rng)
+    usable = sum(room.get_usable_area() for room in rooms)
+    employees = _crew(rng, usable, profile)
+
+    # About 350 sq ft per person per day, give or take
+    rate = 350 * rng.lognormvariate(0, 0.25)
+    job = FlooringJob(rooms, employees, max(1, math.ceil(usable / (rate * len(employees)))))
+    job.sanding_cost_per_sqft = 0.0 if rng.random() < 0.2 else round(rng.uniform(0.75, 2.50), 2)
+    job.customer_provides_wood = rng.random() < 0.35
+    if not job.customer_provides_wood:
+        job.material_cost_per_sqft = round(min(15.0, max(3.0, 6.5 * rng.lognormvariate(0, 0.35))), 2)
+        job.pickup_fee = rng.choice([0.0, 50.0, 75.0, 100.0, 150.0])
+    job.extras["job_type"] = profile
+    if profile == "residential" and rng.random() < 0.3:
+        job.extras["stair_treads"] = rng.randint(8, 16)
+    return job
+
+
+def generate_jobs(count: int, seed: int = 0, profile: Optional[str] = None,
+                  start: int = 0) -> Iterator[Tuple[str, FlooringJob]]:
+    """(job id, job) for jobs start .. start + count - 1, one at a time"""
+    for number in range(start, start + count):
+        yield f"synthetic-{seed}-{number:08d}", generate_job(seed, number, profile)
+
+
+def write_job_files(jobs: Iterator[Tuple[str, FlooringJob]], out_dir: str, per_folder: int = 1000) -> int:
+    """Save each job as a job file, at most per_folder files per subfolder; returns the count"""
+    written = 0
+    for job_id, job in jobs:
+        folder = os.path.join(out_dir, f"{written // per_folder:05d}")
+        if written % per_folder == 0:
+            os.makedirs(folder, exist_ok=True)
+        save_job(job, os.path.join(folder, job_id + JOB_FILE_EXTENSION))
+        written += 1
+    return written
+
+
+def _progress(jobs: Iterator[Tuple[str, FlooringJob]], count: int, totals: dict) -> Iterator[Tuple[str, FlooringJob]]:
+    """Pass jobs through, counting rooms and printing progress now and then"""
+    started = time.perf_counter()
+    step = max(1, count // 20)
+    for done, (job_id, job) in enumerate(jobs, 1):
+        totals["jobs"] = done
+        totals["rooms"] += len(job.rooms)
+        yield job_id, job
+        if done % step == 0 or done == count:
+            elapsed = time.perf_counter() - started
+            print(f"   {done:,}/{count:,} jobs, {totals['rooms']:,} rooms ({done / elapsed:,.0f} jobs/sec)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate realistic synthetic flooring jobs for benchmarks")
+    parser.add_argument("--count", type=int, default=1000, help="number of jobs (default 1000)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed; the same seed gives the same jobs")
+    parser.add_argument("--start", type=int, default=0, help="first job number (to regenerate a slice)")
+    parser.add_argument("--profile", choices=sorted(PROFILES), help="only this kind of job (default: a mix)")
+    parser.add_argument("--format", choices=["job", "parquet", "npz"], default="job",
+                        help="job files, or priced tables as written by export.py")
+    parser.add_argument("--out", default="synthetic_jobs", help="output folder (default synthetic_jobs)")
+    args = parser.parse_args()
+
+    totals = {"jobs": 0, "rooms": 0}
+    jobs = _progress(generate_jobs(args.count, args.seed, args.profile, args.start), args.count, totals)
+    started = time.perf_counter()
+    print(f"\nGenerating {args.count:,} jobs (seed {args.seed}) into {args.out}...")
+    if args.format == "job":
+        write_job_files(jobs, args.out)
+    else:
+        from export import export_jobs
+        try:
+            export_jobs(jobs, args.out, args.format)
+        except ImportError as e:
+            print(f"\n{e.name or 'A required package'} not installed. "
+                  "Install with: pip install pyarrow (or pip install numpy for the .npz format)")
+            sys.exit(1)
+    elapsed = time.perf_counter() - started
+    print(f"\nWrote {totals['jobs']:,} jobs and {totals['rooms']:,} rooms in {elapsed:.1f}s")
@@ -0,0 +1,139 @@
+"""
+Owen Moloney
+Multi-Job Workspace
+Model side of the GUI's job tabs. An inactive tab keeps only its FlooringJob,
+undo history and entry-field text; the GUI's panels are rebuilt from it when
+the tab is activated. Cost summaries are computed lazily and cached until the
+job changes, so background tabs cost nothing while another job is edited.
+"""
+
+from typing import Dict, List, Optional
+
+from main import FlooringJob
+from history import PersistentList, JobState, EditHistory
+from hierarchy import ProjectTree, node_costs
+
+
+# Entry-field text for a brand new job (matches the GUI defaults)
+DEFAULT_FIELDS = {
+    "days": "0",
+    "sanding": "0.00",
+    "material_source": "customer",
+    "material_cost": "0.00",
+    "pickup_fee": "0.00",
+}
+
+
+class JobWorkspace:
+    """One open job in the GUI"""
+
+    def __init__(self, name: str, job: Optional[FlooringJob] = None):
+        self.name = name
+        self.job = job if job is not None else FlooringJob()
+        if not isinstance(self.job.rooms, PersistentList):
+            self.job.rooms = PersistentList(self.job.rooms)
+        if not isinstance(self.job.employees, PersistentList):
+            self.job.employees = PersistentList(self.job.employees)
+        self.job.units = tuple(self.job.units)
+        self.history = EditHistory(JobState.from_job(self.job))
+        self.saved = self.history.current  # as opened or last saved, for comparing quotes
+        self.blueprint_path = None
+        self.journal = None  # autosave journal, set by the GUI
+        self.fields = self._fields_from_job(self.job) if job is not None else dict(DEFAULT_FIELDS)
+
+        # Lazily computed cost summary, valid while _summary_version == version
+        self.version = 0
+        self._summary = None
+        self._summary_version = -1
+        self._tree = None
+
+    @staticmethod
+    def _fields_from_job(job: FlooringJob) -> Dict[str, str]:
+        return {
+            "days": str(job.days_required),
+            "sanding": f"{job.sanding_cost_per_sqft:.2f}",
+            "material_source": "customer" if job.customer_provides_wood else "company",
+            "material_cost": f"{job.material_cost_per_sqft:.2f}",
+            "pickup_fee": f"{job.pickup_fee:.2f}",
+        }
+
+    def mark_changed(self):
+        """Invalidate the cached cost summary (after an edit or a changed job field)"""
+        self.version += 1
+
+    def store_summary(self, breakdown: dict):
+        """Cache a breakdown the GUI already computed for the current version"""
+        self._summary = breakdown
+        self._summary_version = self.version
+
+    def cost_summary(self) -> dict:
+        """Cost breakdown for this job, computed only if the job changed"""
+        if self._summary_version != self.version:
+            self.store_summary(self.live_breakdown())
+        return self._summary
+
+    def live_breakdown(self) -> dict:
+        """
+        Same as job.get_cost_breakdown(), but the usable area comes from the
+        running subtotals of location_tree(), so after an edit only the
+        changed rooms are visited.
+        """
+        tree = self.location_tree()
+        usable = tree.root.usable_sqft
+        costs = node_costs(tree.root, self.job, usable)
+        return {
+            "total_floor_space_sqft": usable,
+            "material_cost": costs["material"],
+            "labor_cost": costs["labor"],
+            "sanding_cost": costs["sanding"],
+            "total_cost": costs["total"],
+            "customer_provides_wood": self.job.customer_provides_wood,
+            "sanding_cost_per_sqft": self.job.sanding_cost_per_sqft,
+        }
+
+    def location_tree(self) -> ProjectTree:
+        """Rooms by building/floor/unit; brought up to date from the rooms changed since last time"""
+        if self._tree is None:
+            self._tree = ProjectTree(self.name)
+        self._tree.sync(self.job.rooms, self.job.units)
+        return self._tree
+
+    def tab_title(self) -> str:
+        """Tab caption; uses the cached total when one is available"""
+        if self._summary_version == self.version and self._summary is not None:
+            return f"{self.name}  ${self._summary['total_cost']:,.0f}"
+        return self.name
+
+
+class Workspace:
+    """Ordered set of open jobs with one active job"""
+
+    def __init__(self):
+        self.jobs: List[JobWorkspace] = []
+        self.active_index = -1
+        self._counter = 0
+
+    @property
+    def active(self) -> Optional[JobWorkspace]:
+        return self.jobs[self.active_index] if self.jobs else None
+
+    def new_job(self, job: Optional[FlooringJob] = None, name: Optional[str] = None) -> JobWorkspace:
+        """Open a job in a new (inactive) tab and return it"""
+        self._counter += 1
+        workspace = JobWorkspace(name or f"Job {self._counter}", job)
+        self.jobs.append(workspace)
+        if self.active_index < 0:
+            self.active_index = 0
+        return workspace
+
+    def close(self, index: int) -> JobWorkspace:
+        """Close the job at index; the neighbouring tab becomes active"""
+        closed = self.jobs.pop(index)
+        if index < self.active_index or self.active_index >= len(self.jobs):
+            self.active_index -= 1
+        return closed
+
+    def grand_total(self) -> float:
+        """Total of every open job (computes only stale summaries)"""
+        return sum(ws.cost_summary()["total_cost"] for ws in self.jobs)
+